@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+关键词匹配基准测试
+比较原有的逐个关键词子串查找与 Aho-Corasick 关键词索引在不同关键词数量下的耗时
+
+用法: python bench_keyword_matcher.py
+标题取自 samples/forum_page.html 中的帖子
+"""
+
+import os
+import random
+import time
+
+from unikorn.keyword_index import KeywordIndex
+from unikorn.nuxt_payload import extract_posts
+
+SAMPLE_PAGE = os.path.join(os.path.dirname(__file__), 'samples', 'forum_page.html')
+KEYWORD_COUNTS = [10, 100, 1000, 5000]
+ROUNDS = 20
+
+
+def load_titles():
+    with open(SAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        return [post['title'] for post in extract_posts(f.read())]
+
+
+def random_keywords(count, rng):
+    """生成不会命中样例标题的随机中英文关键词，模拟最坏情况下的全量扫描"""
+    chars = [chr(c) for c in range(0x4e00, 0x4e00 + 3000)] + list('qwxzjv')
+    return [''.join(rng.choice(chars) for _ in range(rng.randint(2, 6))) for _ in range(count)]
+
+
+def legacy_loop(titles, keywords):
+    """原 _is_button_text 中的关键词循环"""
+    hits = 0
+    for title in titles:
+        text_lower = title.lower()
+        for keyword in keywords:
+            if keyword.lower() in text_lower:
+                hits += 1
+                break
+    return hits
+
+
+def keyword_index(titles, index):
+    return sum(1 for title in titles if title in index)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = func(*args)
+    return (time.perf_counter() - start) * 1000 / ROUNDS, result
+
+
+def main():
+    rng = random.Random(0)
+    titles = load_titles()
+    print(f"=== 关键词匹配基准测试（{len(titles)} 个标题，每项 {ROUNDS} 轮）===\n")
+    print(f"{'关键词数':>8}{'原循环(ms)':>14}{'AC索引(ms)':>14}{'构建索引(ms)':>16}")
+    print("-" * 54)
+
+    for count in KEYWORD_COUNTS:
+        keywords = random_keywords(count, rng)
+
+        start = time.perf_counter()
+        index = KeywordIndex.from_keywords(keywords)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        legacy_ms, legacy_hits = timed(legacy_loop, titles, keywords)
+        index_ms, index_hits = timed(keyword_index, titles, index)
+        assert legacy_hits == index_hits
+
+        print(f"{count:>8}{legacy_ms:>14.3f}{index_ms:>14.3f}{build_ms:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+HTML解析后端基准测试
+对录制的论坛页面分别用各个解析后端执行“解析 + 链接提取”以及完整的DOM提取流水线，比较耗时
+
+用法: python bench_parsers.py [页面1.html 页面2.html ...]
+默认使用 samples/ 目录下录制的页面
+"""
+
+import glob
+import os
+import sys
+import time
+
+from unikorn.extraction import extract_forum_posts
+from unikorn.parsers import BACKENDS, available_backends
+
+ROUNDS = 20
+
+
+def parse_and_extract(backend, html):
+    """解析页面并提取所有链接的 href 和文本"""
+    document = backend.parse(html)
+    return [(link.get('href'), link.get_text(strip=True)) for link in backend.links(document)]
+
+
+def bench_page(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    print(f"\n📄 {os.path.basename(path)} ({len(html)} 字符)")
+    print(f"{'后端':<14}{'链接数':>8}{'平均耗时(ms)':>16}{'最快(ms)':>12}{'完整提取(ms)':>16}{'帖子数':>8}")
+    print("-" * 74)
+
+    for name in BACKENDS:
+        if name not in available_backends():
+            print(f"{name:<14}{'不可用':>8}")
+            continue
+
+        backend = BACKENDS[name]
+        timings = []
+        links = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            links = parse_and_extract(backend, html)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        # 完整的DOM提取流水线（不使用Nuxt负载）
+        options = {'extraction_mode': 'dom', 'html_parser': name}
+        pipeline_timings = []
+        posts = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            posts = extract_forum_posts(html, options)['posts']
+            pipeline_timings.append((time.perf_counter() - start) * 1000)
+
+        print(f"{name:<14}{len(links):>8}{sum(timings) / len(timings):>16.2f}{min(timings):>12.2f}"
+              f"{sum(pipeline_timings) / len(pipeline_timings):>16.2f}{len(posts):>8}")
+
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'samples', '*.html')))
+    if not paths:
+        print("未找到录制的论坛页面")
+        return
+
+    print(f"=== 解析后端基准测试（每个后端 {ROUNDS} 轮）===")
+    for path in paths:
+        bench_page(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 import asyncio
+import contextlib
+import hashlib
 import json
 import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Optional, Tuple
 import aiohttp
 from bs4 import BeautifulSoup
 
@@ -12,6 +16,27 @@ from astrbot.api.star import Context, Star, register
 from astrbot.api import logger, AstrBotConfig
 import astrbot.api.message_components as Comp
 
+from .unikorn.extraction import (
+    DEFAULT_OPTIONS, deduplicate_posts, detect_spa, extract_forum_posts, find_post_containers, get_filter_engine,
+    looks_like_post_link, measure_parse, slice_posts_region,
+)
+from .unikorn.cache import ResultCache
+from .unikorn.crawl import crawl_pages
+from .unikorn.dispatch import FanOutDispatcher, SendResult
+from .unikorn.notifications import FORUM_NAME, FORUM_URL, Notification, parse_group_modes, plan_notifications
+from .unikorn.outbox import Outbox
+from .unikorn.parsers import ParserBackend, get_backend
+from .unikorn.scheduler import DeadlineScheduler
+from .unikorn.polling import AdaptivePollingPolicy, PollingDecision
+from .unikorn.persistence import DebouncedWriter, atomic_write, atomic_write_json
+from .unikorn.bloom import ScalableBloomFilter
+from .unikorn.hash_store import HashSeenStore
+from .unikorn.seen_store import EVICTION_POLICIES, SeenStore, post_hash
+from .unikorn.sources import PRIMARY_SOURCE, SourceState, parse_sources
+from .unikorn.sqlite_store import SQLiteSeenStore
+from .unikorn.streaming import iter_streamed_posts
+from .unikorn.worker_pool import ParsePool, ParseTimeoutError
+
 @register("unikorn_news", "Assistant", "监听Unikorn论坛更新，自动推送新帖子到QQ群", "1.0.0", "https://github.com/Soulter/astrbot_plugin_unikorn_news")
 class UnikornNewsPlugin(Star):
     def __init__(self, context: Context, config: AstrBotConfig):
@@ -19,11 +44,92 @@ class UnikornNewsPlugin(Star):
         self.config = config
         self.forum_url = "https://unikorn.axfff.com/forum"
         self.check_task = None
-        self.known_posts: Set[str] = set()
+        self.scheduler: Optional[DeadlineScheduler] = None
         # 数据文件存储在data目录下，避免插件更新时被覆盖
         data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data")
         os.makedirs(data_dir, exist_ok=True)
+        self.data_dir = data_dir
         self.data_file = os.path.join(data_dir, "unikorn_news_data.json")
+        self.db_file = os.path.join(data_dir, "unikorn_news_posts.db")
+        self.hash_file = os.path.join(data_dir, "unikorn_news_posts.hashes")
+        # 主论坛和额外来源使用同一套校验过的容量、保留时间和淘汰策略
+        self.seen_store_limits = self._seen_store_limits()
+        self.known_posts = self._create_seen_store(self.seen_store_limits)
+        # 数据库和哈希文件的读写在一个专用线程中执行，不阻塞事件循环；
+        # SQLite 连接只能在创建它的线程中使用，因此只用一个线程
+        self._store_executor: Optional[ThreadPoolExecutor] = None
+        if not isinstance(self.known_posts, SeenStore):
+            self._store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="unikorn-store")
+        # 已知帖子前面的布隆过滤器，每种存储方式各自对应一个文件
+        self.bloom_file = os.path.join(
+            data_dir, f"unikorn_news_posts_{self.config.get('known_posts_backend', 'json')}.bloom")
+        self.bloom: Optional[ScalableBloomFilter] = None
+        self.bloom_stats = {'negatives': 0, 'confirmed': 0, 'false_positives': 0}
+        # 已知帖子和HTTP缓存的合并延迟写入
+        self._known_posts_writer = self._create_writer(self._write_known_posts, "已知帖子")
+        self._http_cache_writer = self._create_writer(self._write_http_cache, "HTTP缓存")
+        self._dispatcher: Optional[FanOutDispatcher] = None
+        # 合并转发节点中显示的机器人QQ号，首次合并转发时获取
+        self._forward_uin: Optional[str] = None
+        # 持久化的推送发件箱及其后台任务
+        self.outbox_file = os.path.join(data_dir, "unikorn_news_outbox.json")
+        self.outbox = Outbox(
+            max_attempts=self.config.get("outbox_max_attempts", 8),
+            base_delay=self.config.get("outbox_retry_base_seconds", 30),
+            max_delay=self.config.get("outbox_retry_max_seconds", 3600),
+        )
+        self._outbox_writer = self._create_writer(self._write_outbox, "发件箱")
+        self._outbox_task: Optional[asyncio.Task] = None
+        self._outbox_event = asyncio.Event()
+        self._outbox_stopping = False
+        # 自适应检查间隔：统计新帖子的到达速度
+        self.polling_file = os.path.join(data_dir, "unikorn_news_polling.json")
+        self.polling: Optional[AdaptivePollingPolicy] = None
+        if self.config.get("adaptive_polling", False):
+            self.polling = AdaptivePollingPolicy(
+                default_interval=self.config.get("check_interval", 5) * 60,
+                min_interval=self.config.get("min_check_interval", 1) * 60,
+                max_interval=self.config.get("max_check_interval", 30) * 60,
+                target_posts=self.config.get("posts_per_check_target", 0.5),
+                jitter=self.config.get("check_interval_jitter", 0.1),
+            )
+        self.polling_decision: Optional[PollingDecision] = None
+        self._polling_writer = self._create_writer(self._write_polling, "检查间隔统计")
+        # HTTP缓存验证器（ETag/Last-Modified）及对应的帖子快照，用于条件请求
+        self.http_cache_file = os.path.join(data_dir, "unikorn_news_http_cache.json")
+        self.http_validators: Dict[str, str] = {}
+        self.last_posts: List[Dict] = []
+        # 查询指令使用的结果缓存，由监控循环的抓取结果更新
+        self.read_cache = ResultCache(
+            ttl=self.config.get("read_cache_ttl", 60),
+            stale_ttl=self.config.get("read_cache_stale_seconds", 600),
+        )
+        # 页面指纹缓存：内容未变化时跳过解析
+        self.page_fingerprint: Optional[str] = None
+        # 生成当前快照时的提取配置哈希
+        self.snapshot_key: Optional[str] = None
+        self._fingerprint_regex: Optional[re.Pattern] = None
+        self.fingerprint_hits = 0
+        self.fingerprint_misses = 0
+        self._parser_fallback: Optional[tuple] = None
+        self._parse_pool: Optional[ParsePool] = None
+        # 最近一次容器识别中每条规则的命中数
+        self.container_rule_hits: Dict[str, int] = {}
+        # 最近一次局部解析的统计（仅调试模式下记录）
+        self.partial_parse_stats: Dict[str, int] = {}
+        # 最近一次流式解析的统计
+        self.streaming_stats: Dict = {}
+        # 流式解析中已知帖子的查询结果，供本次检查复用
+        self._stream_lookups: Dict[str, bool] = {}
+        # 额外的监控来源，每个来源的已知帖子单独保存
+        self.sources: Dict[str, SourceState] = {}
+        self._source_writers: Dict[str, DebouncedWriter] = {}
+        source_configs, self.source_errors = parse_sources(
+            self.config.get("sources", []), self.config.get("check_interval", 5) * 60)
+        for source in source_configs:
+            self.sources[source.name] = SourceState(source, SeenStore(**self.seen_store_limits))
+            self._source_writers[source.name] = self._create_writer(
+                lambda state=self.sources[source.name]: self._write_source(state), f"来源 {source.name} 的数据")
         self.session: Optional[aiohttp.ClientSession] = None
         
     async def initialize(self):
@@ -31,8 +137,10 @@ class UnikornNewsPlugin(Star):
         try:
             logger.info("Unikorn News Plugin 初始化中...")
             
-            # 创建HTTP会话
+            # 创建HTTP会话，所有来源共用一个连接池
             self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.config.get("http_max_connections", 10),
+                                               ttl_dns_cache=300),
                 timeout=aiohttp.ClientTimeout(total=30),
                 headers={
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -41,6 +149,12 @@ class UnikornNewsPlugin(Star):
             
             # 加载已知帖子
             await self.load_known_posts()
+            await self.load_http_cache()
+            await self.load_outbox()
+            await self.load_polling()
+            await self.load_sources()
+            if len(self.outbox):
+                self._start_outbox_worker()
             
             # 如果启用了通知功能，启动定时检查任务
             if self.config.get("enable_notification", True):
@@ -50,488 +164,864 @@ class UnikornNewsPlugin(Star):
         except Exception as e:
             logger.error(f"Unikorn News Plugin 初始化失败: {e}")
 
+    def _seen_store_limits(self) -> Dict:
+        """读取并校验已知帖子存储的容量、保留时间和淘汰策略"""
+        policy = self.config.get("known_posts_eviction", "lru")
+        if policy not in EVICTION_POLICIES:
+            logger.warning(f"未知的已知帖子淘汰策略 '{policy}'，已改用 lru")
+            policy = "lru"
+        return {
+            'max_size': self.config.get("known_posts_max_size", 5000),
+            'max_age': self.config.get("known_posts_max_age_days", 90) * 86400,
+            'policy': policy,
+        }
+
+    def _create_seen_store(self, limits: Dict):
+        """根据配置创建有界的已知帖子存储"""
+        backend = self.config.get("known_posts_backend", "json")
+        if backend == "sqlite":
+            return SQLiteSeenStore(self.db_file, **limits)
+        if backend == "hashfile":
+            return HashSeenStore(self.hash_file, **limits)
+        return SeenStore(**limits)
+
     async def load_known_posts(self):
         """加载已知的帖子ID"""
         try:
-            if os.path.exists(self.data_file):
+            imported = 0
+            if not isinstance(self.known_posts, SeenStore):
+                # 数据库和哈希文件按需查询，只需在首次使用时导入旧的JSON数据文件；
+                # 已经导入过时不再读取和解析该文件
+                if (os.path.exists(self.data_file)
+                        and await self._run_store(self.known_posts.needs_json_import)):
+                    with open(self.data_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    imported = await self._run_store(self.known_posts.import_json_data, data)
+                    if imported:
+                        logger.info(f"已从JSON数据文件导入 {imported} 个已知帖子")
+            elif os.path.exists(self.data_file):
                 with open(self.data_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    self.known_posts = set(data.get('known_posts', []))
+                migrated = self.known_posts.load_json_data(data)
                 logger.info(f"已加载 {len(self.known_posts)} 个已知帖子")
+                if self.known_posts.evicted:
+                    logger.info(f"已淘汰 {self.known_posts.evicted} 个旧的已知帖子")
+                if migrated:
+                    logger.info("已将旧版数据文件迁移为带时间戳的格式")
+                    await self.save_known_posts()
             else:
                 logger.info("数据文件不存在，将创建新的数据文件")
+            
+            await self._load_bloom_filter(rebuild=bool(imported))
         except Exception as e:
             logger.error(f"加载已知帖子失败: {e}")
 
-    async def save_known_posts(self):
-        """保存已知的帖子ID"""
+    async def _load_bloom_filter(self, rebuild: bool = False):
+        """加载布隆过滤器，文件不存在、已损坏或配置变化时从已知帖子重建"""
+        if not self.config.get("enable_bloom_filter", False):
+            # 关闭期间新增的帖子不会写入过滤器，删除旧文件以免重新开启后漏判
+            if os.path.exists(self.bloom_file):
+                os.remove(self.bloom_file)
+            self.bloom = None
+            return
+        
+        error_rate = self.config.get("bloom_false_positive_rate", 0.01)
+        bloom = None
+        if not rebuild and os.path.exists(self.bloom_file):
+            try:
+                with open(self.bloom_file, 'rb') as f:
+                    bloom = ScalableBloomFilter.from_bytes(f.read())
+                if bloom.error_rate != error_rate:
+                    bloom = None
+            except Exception as e:
+                logger.warning(f"布隆过滤器文件无效，将重新构建: {e}")
+                bloom = None
+        
+        self.bloom = bloom if bloom is not None else await self._rebuild_bloom_filter()
+
+    async def _rebuild_bloom_filter(self) -> ScalableBloomFilter:
+        """用当前的已知帖子构建新的布隆过滤器"""
+        bloom = ScalableBloomFilter(
+            error_rate=self.config.get("bloom_false_positive_rate", 0.01),
+            initial_capacity=self.config.get("bloom_initial_capacity", 1000),
+        )
+        await self._run_store(lambda: bloom.update(self.known_posts.hashes()))
+        bloom.dirty = True
+        logger.info(f"已用 {bloom.count} 个已知帖子构建布隆过滤器")
+        return bloom
+
+    async def _run_store(self, func, *args):
+        """执行已知帖子存储的操作；数据库和哈希文件在存储线程中执行"""
+        if self._store_executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._store_executor, func, *args)
+
+    async def _is_known_post(self, post_id: str) -> bool:
+        """判断帖子是否已知；过滤器判定不存在时无需查询存储"""
+        if self.bloom is None:
+            return await self._run_store(self.known_posts.__contains__, post_id)
+        if post_hash(post_id) not in self.bloom:
+            self.bloom_stats['negatives'] += 1
+            return False
+        known = await self._run_store(self.known_posts.__contains__, post_id)
+        self.bloom_stats['confirmed' if known else 'false_positives'] += 1
+        return known
+
+    def _record_posts(self, seen_ids: List[str], new_posts: List[Dict]):
+        """刷新仍在页面上的帖子、记录新帖子并淘汰旧记录，在存储线程中执行
+
+        先刷新再添加，添加新帖子时的淘汰不会误删仍在页面上的帖子。
+        """
+        for post_id in seen_ids:
+            self.known_posts.touch(post_id)
+        for post in new_posts:
+            self.known_posts.add(post['id'], record=post)
+        self.known_posts.prune()
+
+    def _create_writer(self, write, label: str) -> DebouncedWriter:
+        """创建合并延迟写入器"""
+        return DebouncedWriter(
+            write,
+            delay=self.config.get("persist_debounce_seconds", 5),
+            max_pending=self.config.get("persist_max_pending", 20),
+            on_error=lambda e: logger.error(f"保存{label}失败: {e}"),
+        )
+
+    async def save_known_posts(self, changes: int = 1):
+        """标记已知帖子需要保存，短时间内的多次改动合并为一次写入"""
+        self._known_posts_writer.mark_dirty(changes)
+
+    async def _write_known_posts(self):
+        """保存已知帖子；在事件循环中获取快照，在线程中原子写入文件"""
+        # 先保存过滤器：过滤器多出的帖子只会多一次确认，缺少帖子则会重复推送
+        if self.bloom is not None and self.bloom.dirty:
+            data = self.bloom.to_bytes()
+            self.bloom.dirty = False
+            try:
+                await asyncio.to_thread(atomic_write, self.bloom_file, data)
+            except Exception:
+                self.bloom.dirty = True
+                raise
+        
+        if not isinstance(self.known_posts, SeenStore):
+            # 只写入新增和变化的记录；合并哈希文件和提交事务都在存储线程中执行
+            await self._run_store(self.known_posts.flush)
+            return
+        
+        data = self.known_posts.to_json_data()
+        self.known_posts.dirty = False
         try:
-            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-            data = {
-                'known_posts': list(self.known_posts),
-                'last_update': datetime.now().isoformat()
-            }
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            await asyncio.to_thread(atomic_write_json, self.data_file, data)
+        except Exception:
+            self.known_posts.dirty = True
+            raise
+
+    async def load_http_cache(self):
+        """加载上次响应的缓存验证器和帖子快照"""
+        try:
+            if os.path.exists(self.http_cache_file):
+                with open(self.http_cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    self.http_validators = data.get('validators', {})
+                    self.last_posts = data.get('posts', [])
+                    self.page_fingerprint = data.get('fingerprint')
+                    self.snapshot_key = data.get('extraction_key')
+                logger.debug(f"已加载HTTP缓存验证器: {self.http_validators}")
         except Exception as e:
-            logger.error(f"保存已知帖子失败: {e}")
+            logger.error(f"加载HTTP缓存失败: {e}")
+            self.http_validators = {}
+            self.page_fingerprint = None
+            self.snapshot_key = None
+            self.last_posts = []
 
-    async def fetch_forum_posts(self) -> List[Dict]:
-        """获取论坛帖子列表"""
+    async def save_http_cache(self):
+        """标记HTTP缓存需要保存，重启后仍可发起条件请求"""
+        self._http_cache_writer.mark_dirty()
+
+    async def _write_http_cache(self):
+        """保存缓存验证器和帖子快照"""
+        data = {
+            'validators': self.http_validators,
+            'fingerprint': self.page_fingerprint,
+            'extraction_key': self.snapshot_key,
+            'posts': list(self.last_posts),
+            'last_update': datetime.now().isoformat()
+        }
+        await asyncio.to_thread(atomic_write_json, self.http_cache_file, data)
+
+    async def load_outbox(self):
+        """加载上次未推送完的发件箱"""
+        try:
+            if os.path.exists(self.outbox_file):
+                with open(self.outbox_file, 'r', encoding='utf-8') as f:
+                    uncertain = self.outbox.load_json_data(json.load(f))
+                if uncertain:
+                    logger.warning(f"有 {uncertain} 条消息在上次关闭时正在发送，无法确认是否送达，不再重发")
+                    self._outbox_writer.mark_dirty(uncertain)
+                if len(self.outbox):
+                    logger.info(f"发件箱中有 {len(self.outbox)} 条待推送的消息")
+        except Exception as e:
+            logger.error(f"加载发件箱失败: {e}")
+
+    async def _write_outbox(self):
+        """保存发件箱"""
+        data = self.outbox.to_json_data()
+        self.outbox.dirty = False
+        try:
+            await asyncio.to_thread(atomic_write_json, self.outbox_file, data)
+        except Exception:
+            self.outbox.dirty = True
+            raise
+
+    async def load_polling(self):
+        """加载新帖子到达速度的统计"""
+        if self.polling is None:
+            return
+        try:
+            if os.path.exists(self.polling_file):
+                with open(self.polling_file, 'r', encoding='utf-8') as f:
+                    self.polling.load_json_data(json.load(f))
+        except Exception as e:
+            logger.error(f"加载检查间隔统计失败: {e}")
+
+    async def _write_polling(self):
+        """保存新帖子到达速度的统计"""
+        data = self.polling.to_json_data()
+        self.polling.dirty = False
+        try:
+            await asyncio.to_thread(atomic_write_json, self.polling_file, data)
+        except Exception:
+            self.polling.dirty = True
+            raise
+
+    async def load_sources(self):
+        """加载额外来源的已知帖子"""
+        for error in self.source_errors:
+            logger.error(f"监控来源配置无效，已忽略 {error}")
+        for state in self.sources.values():
+            try:
+                path = self._source_file(state)
+                if os.path.exists(path):
+                    with open(path, 'r', encoding='utf-8') as f:
+                        state.load_json_data(json.load(f))
+            except Exception as e:
+                logger.error(f"加载来源 {state.name} 的数据失败: {e}")
+        if self.sources:
+            logger.info(f"已加载 {len(self.sources)} 个额外监控来源: {', '.join(self.sources)}")
+
+    def _source_file(self, state: SourceState) -> str:
+        return os.path.join(self.data_dir, f"unikorn_news_source_{state.name}.json")
+
+    async def _write_source(self, state: SourceState):
+        """保存一个来源的已知帖子和缓存验证器"""
+        data = state.to_json_data()
+        state.known_posts.dirty = False
+        try:
+            await asyncio.to_thread(atomic_write_json, self._source_file(state), data)
+        except Exception:
+            state.known_posts.dirty = True
+            raise
+
+    def _next_check_interval(self, interval: float) -> float:
+        """下一次检查的间隔（秒）：启用自适应时根据到达速度计算，否则使用固定间隔"""
+        if self.polling is None:
+            return interval
+        decision = self.polling.decide()
+        if self.polling_decision is None or abs(decision.base_interval - self.polling_decision.base_interval) >= 60:
+            logger.info(f"检查间隔调整为 {decision.base_interval / 60:.1f} 分钟: {decision.reason}")
+        self.polling_decision = decision
+        return decision.interval
+
+    def _conditional_headers(self, validators: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """根据上次响应的验证器构造条件请求头，默认使用论坛首页的验证器"""
+        headers = {}
+        if not self.config.get("enable_conditional_get", True):
+            return headers
+        if validators is None:
+            # 提取配置变化后需要重新获取并解析页面，不能用304复用旧的快照
+            if self.snapshot_key != self._extraction_key():
+                return headers
+            validators = self.http_validators
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    @staticmethod
+    def _response_validators(response_headers) -> Dict[str, str]:
+        """提取响应中的缓存验证器"""
+        validators = {}
+        if response_headers.get('ETag'):
+            validators['etag'] = response_headers['ETag']
+        if response_headers.get('Last-Modified'):
+            validators['last_modified'] = response_headers['Last-Modified']
+        return validators
+
+    async def _remember_snapshot(self, response_headers, fingerprint: Optional[str], posts: List[Dict]):
+        """记录本次响应的验证器、页面指纹和解析结果"""
+        if posts:
+            self.read_cache.put('posts', list(posts))
+        validators = self._response_validators(response_headers)
+        
+        if (validators == self.http_validators and fingerprint == self.page_fingerprint
+                and posts == self.last_posts and self.snapshot_key == self._extraction_key()):
+            return
+        
+        self.http_validators = validators
+        self.page_fingerprint = fingerprint
+        self.snapshot_key = self._extraction_key()
+        self.last_posts = posts
+        await self.save_http_cache()
+
+    def _page_fingerprint(self, html: str) -> str:
+        """计算页面指纹
+
+        配置了 fingerprint_region 时只对匹配到的稳定区域计算哈希，
+        避免页面中随请求变化的token导致指纹失效；未匹配到时退回整页。
+        """
+        region_pattern = self.config.get("fingerprint_region", "")
+        content = html
+        if region_pattern:
+            if self._fingerprint_regex is None or self._fingerprint_regex.pattern != region_pattern:
+                try:
+                    self._fingerprint_regex = re.compile(region_pattern, re.S | re.I)
+                except re.error as e:
+                    logger.error(f"fingerprint_region 正则无效: {e}")
+                    self._fingerprint_regex = None
+            if self._fingerprint_regex is not None:
+                regions = [m.group(1) if self._fingerprint_regex.groups else m.group(0)
+                           for m in self._fingerprint_regex.finditer(html)]
+                if regions:
+                    content = "\x00".join(regions)
+        
+        # 提取配置也参与指纹计算，修改配置后不会误用旧的解析结果
+        digest = hashlib.blake2b(content.encode('utf-8'), digest_size=16)
+        digest.update(self._extraction_key().encode('utf-8'))
+        return digest.hexdigest()
+
+    def _extraction_key(self) -> str:
+        """影响解析结果的配置的哈希，配置变化后缓存的帖子快照失效"""
+        options = self._extraction_options()
+        # 调试模式只影响统计信息，/unikorn debug 会临时开启
+        options.pop('debug_mode', None)
+        settings = json.dumps([
+            options,
+            self.config.get("strict_filtering", True),
+            self.config.get("enable_spa_detection", True),
+        ], ensure_ascii=False, sort_keys=True)
+        return hashlib.blake2b(settings.encode('utf-8'), digest_size=8).hexdigest()
+
+    async def fetch_forum_posts(self, stop_at_known: bool = False) -> List[Dict]:
+        """获取论坛帖子列表
+
+        stop_at_known 为 True 且启用了流式解析时，读到已知帖子后即停止
+        读取响应，返回的列表只包含到该位置为止的帖子。
+        """
         try:
             if not self.session:
                 logger.error("HTTP会话未初始化")
                 return []
                 
-            async with self.session.get(self.forum_url) as response:
+            async with self.session.get(self.forum_url, headers=self._conditional_headers()) as response:
+                # 页面未变化，直接复用上次的解析结果
+                if response.status == 304:
+                    logger.debug("论坛页面未变化 (304)，跳过解析")
+                    self.read_cache.renew('html')
+                    if self.last_posts:
+                        self.read_cache.put('posts', list(self.last_posts))
+                    return list(self.last_posts)
+                
                 if response.status != 200:
                     logger.error(f"获取论坛页面失败，状态码: {response.status}")
                     return []
                 
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                posts = []
-                
-                # 检查是否为Nuxt.js或类似的SPA应用
-                if self._is_spa_application(soup):
-                    logger.warning("检测到SPA应用，帖子内容可能通过JavaScript动态加载")
-                
-                # 首先检查帖子容器是否为空
-                if self._is_posts_container_empty(soup):
-                    logger.warning("帖子容器为空，可能没有帖子数据或需要JavaScript渲染")
-                    return []
-                
-                # 首先尝试识别常见的论坛结构
-                # 1. 尝试查找明确的帖子容器
-                post_containers = self._find_post_containers(soup)
+                if self.config.get("streaming_parse", False):
+                    return await self._stream_forum_posts(response, stop_at_known)
                 
-                if post_containers:
-                    logger.info(f"找到 {len(post_containers)} 个帖子容器")
-                    for container in post_containers:
-                        post_data = self._extract_post_from_container(container)
-                        if post_data and self._is_valid_post(post_data):
-                            posts.append(post_data)
-                
-                # 2. 如果没有找到明确的容器，使用改进的通用方法
-                if not posts:
-                    logger.info("未找到明确的帖子容器，使用通用方法")
-                    posts = self._extract_posts_generic(soup)
-                
-                # 3. 过滤和验证帖子
-                filtered_posts = []
-                for post in posts:
-                    if self._is_valid_post(post) and not self._is_excluded_content(post):
-                        filtered_posts.append(post)
+                html = await response.text()
+                self.read_cache.put('html', html)
                 
-                # 去重
-                unique_posts = self._deduplicate_posts(filtered_posts)
+                # 页面指纹与上次相同时跳过解析和过滤
+                fingerprint = self._page_fingerprint(html)
+                if fingerprint == self.page_fingerprint:
+                    self.fingerprint_hits += 1
+                    logger.debug("页面指纹未变化，复用上次的解析结果")
+                    await self._remember_snapshot(response.headers, fingerprint, self.last_posts)
+                    return list(self.last_posts)
+                self.fingerprint_misses += 1
                 
-                logger.info(f"获取到 {len(unique_posts)} 个有效帖子")
+                unique_posts = await self._parse_forum_html(html)
+                await self._remember_snapshot(response.headers, fingerprint, unique_posts)
                 return unique_posts
                 
+        except ParseTimeoutError:
+            # 解析失败时保留上次的快照，下次检查重新解析
+            return []
         except Exception as e:
             logger.error(f"获取论坛帖子失败: {e}")
             return []
 
-    def _is_spa_application(self, soup: BeautifulSoup) -> bool:
-        """检测是否为单页应用"""
-        # 查找常见的SPA框架标识
-        spa_indicators = [
-            'nuxt', 'vue', 'react', 'angular', '__NUXT_DATA__', 
-            'data-nuxt-', 'ng-app', 'reactroot'
-        ]
-        
-        html_content = str(soup).lower()
-        return any(indicator in html_content for indicator in spa_indicators)
-    
-    def _is_posts_container_empty(self, soup: BeautifulSoup) -> bool:
-        """检查帖子容器是否为空"""
-        # 查找帖子列表容器
-        posts_containers = soup.find_all(['div', 'ul', 'section'], 
-                                       class_=re.compile(r'(posts?[-_]?(list|container|wrapper)|forum[-_]?posts?|topic[-_]?list)', re.I))
-        
-        if not posts_containers:
-            return True
-        
-        for container in posts_containers:
-            # 获取容器内的文本内容（排除HTML标签）
-            text_content = container.get_text(strip=True)
-            
-            # 如果容器有意义的文本内容，说明不为空
-            if text_content and len(text_content) > 10:
-                # 但要排除只包含导航/按钮文字的情况
-                if not self._is_only_navigation_content(text_content):
-                    return False
-        
-        return True
-    
-    def _is_only_navigation_content(self, text: str) -> bool:
-        """检查文本是否只包含导航/按钮内容"""
-        navigation_patterns = [
-            r'^(上一页|下一页|首页|末页|第\s*\d+\s*页|共\s*\d+\s*页|页码|分页)+$',
-            r'^(发帖|我要发帖|新建|添加|创建|登录|注册|搜索|筛选|排序)+$',
-            r'^(加载中|loading|暂无数据|没有更多|到底了)+$'
-        ]
-        
-        text_clean = re.sub(r'\s+', '', text).lower()
-        return any(re.search(pattern, text, re.I) for pattern in navigation_patterns)
+    async def _refresh_cached_posts(self) -> Optional[List[Dict]]:
+        """刷新缓存的帖子列表，获取失败时返回None"""
+        posts = await self.fetch_forum_posts()
+        return posts or None
 
-    def _find_post_containers(self, soup: BeautifulSoup) -> List:
-        """查找帖子容器元素"""
-        containers = []
-        
-        # 常见的帖子容器选择器
-        selectors = [
-            # 基于类名的选择器
-            '[class*="post"]:not([class*="button"]):not([class*="btn"])',
-            '[class*="topic"]:not([class*="button"]):not([class*="btn"])',
-            '[class*="thread"]:not([class*="button"]):not([class*="btn"])',
-            '[class*="article"]:not([class*="button"]):not([class*="btn"])',
-            '[class*="item"]:not([class*="nav"]):not([class*="menu"])',
-            # 基于数据属性的选择器
-            '[data-post-id]',
-            '[data-topic-id]',
-            '[data-thread-id]',
-            # 结构化选择器
-            'article[id*="post"]',
-            'div[id*="post"]',
-            'li[id*="post"]',
-        ]
-        
-        for selector in selectors:
-            try:
-                elements = soup.select(selector)
-                if elements:
-                    logger.debug(f"选择器 '{selector}' 找到 {len(elements)} 个元素")
-                    containers.extend(elements)
-                    if len(containers) >= 10:  # 限制数量避免过多
-                        break
-            except Exception as e:
-                logger.debug(f"选择器 '{selector}' 执行失败: {e}")
-        
-        return containers
+    async def _refresh_cached_html(self) -> Optional[str]:
+        """刷新缓存的论坛页面HTML，获取失败时返回None"""
+        if not self.session:
+            logger.error("HTTP会话未初始化")
+            return None
+        async with self.session.get(self.forum_url) as response:
+            if response.status != 200:
+                logger.error(f"获取论坛页面失败，状态码: {response.status}")
+                return None
+            return await response.text()
 
-    def _extract_post_from_container(self, container) -> Optional[Dict]:
-        """从容器中提取帖子信息"""
+    async def _fetch_forum_page(self, page: int) -> List[Dict]:
+        """获取论坛第 page 页的帖子，失败时返回空列表"""
+        url = self.config.get("crawl_page_url", "https://unikorn.axfff.com/forum?page={page}").format(page=page)
         try:
-            # 查找标题链接
-            title_link = None
-            
-            # 优先查找明确的标题链接
-            title_selectors = [
-                'a[class*="title"]',
-                'a[class*="subject"]',
-                'a[class*="topic"]',
-                'h1 a', 'h2 a', 'h3 a', 'h4 a',
-                '.title a', '.subject a', '.topic a',
-            ]
-            
-            for selector in title_selectors:
-                try:
-                    link = container.select_one(selector)
-                    if link and link.get('href'):
-                        title_link = link
-                        break
-                except:
-                    continue
-            
-            # 如果没找到，查找第一个有效链接
-            if not title_link:
-                links = container.find_all('a', href=True)
-                for link in links:
-                    if self._looks_like_post_link(link):
-                        title_link = link
-                        break
-            
-            if not title_link:
-                return None
-            
-            title = title_link.get_text(strip=True)
-            href = title_link.get('href')
-            
-            # 标准化URL
-            if href.startswith('/'):
-                href = 'https://unikorn.axfff.com' + href
-            elif not href.startswith('http'):
-                href = 'https://unikorn.axfff.com/forum/' + href
-            
-            # 提取额外信息
-            post_data = {
-                'title': title,
-                'url': href,
-                'id': href,
-                'container_class': container.get('class', []),
-                'container_id': container.get('id', ''),
-            }
-            
-            # 尝试提取发布时间
-            time_element = container.select_one('[class*="time"], [class*="date"], time')
-            if time_element:
-                post_data['timestamp'] = time_element.get_text(strip=True)
-            
-            return post_data
-            
+            async with self.session.get(url) as response:
+                if response.status != 200:
+                    logger.warning(f"获取论坛第 {page} 页失败，状态码: {response.status}")
+                    return []
+                html = await response.text()
+            return await self._parse_forum_html(html)
         except Exception as e:
-            logger.debug(f"从容器提取帖子信息失败: {e}")
-            return None
+            logger.warning(f"获取论坛第 {page} 页失败: {e}")
+            return []
 
-    def _extract_posts_generic(self, soup: BeautifulSoup) -> List[Dict]:
-        """通用的帖子提取方法"""
-        posts = []
+    async def _crawl_more_pages(self, first_page: List[Dict]) -> List[Dict]:
+        """第一页全是新帖子时继续抓取后续页面，直到已知帖子边界或页数上限"""
+        max_pages = self.config.get("crawl_max_pages", 1)
+        # 还没有已知帖子时（首次运行）不翻页
+        if max_pages <= 1 or not self.session or not await self._run_store(len, self.known_posts):
+            return first_page
         
-        # 查找所有链接
-        all_links = soup.find_all('a', href=True)
-        
-        for link in all_links:
-            if self._looks_like_post_link(link):
-                href = link.get('href')
-                title = link.get_text(strip=True)
-                
-                # 标准化URL
-                if href.startswith('/'):
-                    href = 'https://unikorn.axfff.com' + href
-                elif not href.startswith('http'):
-                    href = 'https://unikorn.axfff.com/forum/' + href
-                
-                posts.append({
-                    'title': title,
-                    'url': href,
-                    'id': href,
-                    'link_class': link.get('class', []),
-                    'parent_class': link.parent.get('class', []) if link.parent else [],
-                })
-        
-        return posts
-
-    def _looks_like_post_link(self, link) -> bool:
-        """判断链接是否看起来像帖子链接"""
-        href = link.get('href', '')
-        title = link.get_text(strip=True)
-        
-        # URL模式检查
-        url_patterns = [
-            '/post/', '/topic/', '/thread/', '/discussion/',
-            '/p/', '/t/', '/d/', '/forum/',
-            r'/\d+/', r'id=\d+', r'tid=\d+', r'pid=\d+'
-        ]
-        
-        import re
-        url_matches = any(re.search(pattern, href) for pattern in url_patterns)
-        
-        # 标题检查
-        title_valid = (
-            title and 
-            len(title) > 5 and 
-            len(title) < 200 and
-            not self._is_button_text(title)
+        result = await crawl_pages(
+            first_page, self._fetch_forum_page,
+            lambda post_id: self._run_store(self.known_posts.__contains__, post_id),
+            max_pages=max_pages, concurrency=self.config.get("crawl_concurrency", 3),
         )
+        if result.pages_fetched > 1:
+            logger.info(f"新帖子超过一页，共抓取 {result.pages_fetched} 页，合并后 {len(result.posts)} 个帖子")
+        if result.exhausted:
+            logger.warning(f"已抓取 {max_pages} 页仍未遇到已知帖子，更早的新帖子可能被遗漏，"
+                           f"可调大 crawl_max_pages")
+        return result.posts
+
+    async def _stream_forum_posts(self, response: aiohttp.ClientResponse, stop_at_known: bool) -> List[Dict]:
+        """边接收响应边解析帖子，越过已知帖子边界后停止读取"""
+        started = time.perf_counter()
+        stop_after = max(1, self.config.get("streaming_stop_after_known", 3))
+        chunks = response.content.iter_chunked(self.config.get("streaming_chunk_size", 16384))
+        stats = {}
+        posts = []
+        known_streak = 0
+        stopped_early = False
+        # 记录查询结果，check_for_new_posts 直接复用，不再重复查询过滤器
+        self._stream_lookups = lookups = {}
         
-        return url_matches and title_valid
-
-    def _is_button_text(self, text: str) -> bool:
-        """判断文本是否为按钮文本"""
-        if not text or len(text.strip()) < 2:
-            return True
-            
-        # 获取用户配置的排除关键词
-        excluded_keywords = self.config.get("excluded_keywords", [])
-        
-        # 精确匹配的按钮文本模式（完全匹配）
-        exact_button_patterns = [
-            # 发帖相关
-            r'^我要发帖$', r'^发布帖子$', r'^新建帖子$', r'^创建帖子$', r'^写帖子$', r'^发帖$',
-            # 用户操作
-            r'^登录$', r'^注册$', r'^退出$', r'^登出$', r'^注销$',
-            # 导航按钮  
-            r'^首页$', r'^主页$', r'^返回$', r'^上一页$', r'^下一页$', r'^末页$', r'^尾页$',
-            # 分页相关
-            r'^第\s*\d+\s*页$', r'^共\s*\d+\s*页$', r'^页码\s*\d+$',
-            # 功能按钮
-            r'^搜索$', r'^查找$', r'^筛选$', r'^过滤$', r'^排序$', r'^切换$',
-            r'^展开$', r'^收起$', r'^更多$', r'^详情$', r'^查看$',
-            # 表单按钮
-            r'^提交$', r'^确定$', r'^取消$', r'^重置$', r'^保存$', r'^删除$',
-            r'^编辑$', r'^修改$', r'^添加$', r'^新增$',
-            # 英文按钮
-            r'^post$', r'^new post$', r'^create$', r'^login$', r'^register$',
-            r'^search$', r'^more$', r'^next$', r'^prev$', r'^home$',
-        ]
-        
-        # 默认包含关键词（更保守的策略，避免误判正常帖子）
-        default_button_keywords = [
-            '回复', '编辑', '删除', '举报', '点赞', '收藏',
-            '提交', '确定', '取消', '关闭',
-            'reply', 'edit', 'delete', 'report', 'like', 'save',
-            'submit', 'ok', 'cancel', 'close',
-        ]
-        
-        text_clean = text.strip()
-        
-        # 首先检查精确匹配模式
-        for pattern in exact_button_patterns:
-            if re.search(pattern, text_clean, re.IGNORECASE):
-                return True
-        
-        # 然后检查包含关键词
-        all_keywords = default_button_keywords + excluded_keywords
-        text_lower = text_clean.lower()
-        
-        for keyword in all_keywords:
-            if keyword.lower() in text_lower:
-                return True
-        
-        # 检查是否为纯数字、符号或单字符
-        if re.match(r'^[\d\s\-_\+\.]+$|^.$', text_clean):
-            return True
-        
-        return False
-
-    def _is_valid_post(self, post_data: Dict) -> bool:
-        """验证是否为有效帖子"""
-        if not post_data:
-            return False
+        async with contextlib.aclosing(
+                iter_streamed_posts(chunks, response.charset or 'utf-8', self._extraction_options(), stats)) as stream:
+            async for post in stream:
+                posts.append(post)
+                if not stop_at_known:
+                    continue
+                # 连续遇到多个已知帖子才停止，避免被置顶的旧帖提前截断
+                if post['id'] not in lookups:
+                    lookups[post['id']] = await self._is_known_post(post['id'])
+                known_streak = known_streak + 1 if lookups[post['id']] else 0
+                if known_streak >= stop_after:
+                    stopped_early = True
+                    break
         
-        title = post_data.get('title', '')
-        url = post_data.get('url', '')
+        unique_posts = deduplicate_posts(posts)
+        self.streaming_stats = {
+            'bytes_read': stats.get('bytes_read', 0),
+            'content_length': response.content_length,
+            'posts': len(unique_posts),
+            'stopped_early': stopped_early,
+            'elapsed_ms': (time.perf_counter() - started) * 1000,
+        }
         
-        # 基本检查
-        if not title or not url:
-            return False
+        if stopped_early:
+            # 不再读取剩余内容，直接关闭连接
+            response.close()
+            logger.info(f"流式解析在已知帖子处停止，读取 {stats.get('bytes_read', 0)} 字节，"
+                        f"获取到 {len(unique_posts)} 个帖子")
+        else:
+            # 只有完整读取的页面才能作为条件请求的快照
+            await self._remember_snapshot(response.headers, None, unique_posts)
+            logger.info(f"流式解析获取到 {len(unique_posts)} 个有效帖子，"
+                        f"耗时 {self.streaming_stats['elapsed_ms']:.1f} ms")
+        return unique_posts
+
+    def _get_parser_backend(self, require_tree: bool = False) -> ParserBackend:
+        """根据配置获取HTML解析后端，不可用时自动回退"""
+        requested = self.config.get("html_parser", "lxml")
+        backend = get_backend(requested, require_tree=require_tree)
+        self._warn_parser_fallback(requested, backend.name)
+        return backend
+
+    def _warn_parser_fallback(self, requested: str, actual: str):
+        """解析后端发生回退时输出一次警告"""
+        if actual != requested and self._parser_fallback != (requested, actual):
+            logger.warning(f"解析后端 '{requested}' 不可用，已回退到 '{actual}'")
+            self._parser_fallback = (requested, actual)
+
+    def _extraction_options(self) -> Dict:
+        """收集帖子提取流水线需要的配置，结果可直接传给子进程"""
+        return {key: self.config.get(key, default) for key, default in DEFAULT_OPTIONS.items()}
+
+    def _get_parse_pool(self) -> ParsePool:
+        """获取解析进程池，首次使用时创建"""
+        if self._parse_pool is None:
+            self._parse_pool = ParsePool(
+                workers=self.config.get("parse_workers", 1),
+                max_tasks_per_worker=self.config.get("parse_worker_max_tasks", 50),
+                timeout=self.config.get("parse_timeout", 30),
+                max_failures=self.config.get("parse_pool_max_failures", 3),
+                cooldown=self.config.get("parse_pool_cooldown", 600),
+            )
+        return self._parse_pool
+
+    def _detect_spa(self, html: str) -> Optional[str]:
+        """检测页面使用的单页应用框架；页面指纹未变化时不会重新解析，无需缓存"""
+        if not self.config.get("enable_spa_detection", True):
+            return None
+        return detect_spa(html)
+
+    async def _parse_forum_html(self, html: str, profile: Optional[Dict] = None,
+                                source_name: Optional[str] = None) -> List[Dict]:
+        """解析论坛页面HTML，返回过滤去重后的帖子列表
+
+        解析和过滤在子进程中执行，子进程不可用时退回到当前进程。
+        profile 覆盖部分提取配置，用于页面结构不同的来源；source_name 为额外
+        来源的名称，日志中会注明来源，统计信息不覆盖主论坛的记录。解析超时抛出
+        ParseTimeoutError，调用方不能把它当作页面上没有帖子。
+        """
+        prefix = f"来源 {source_name} " if source_name else ""
+        options = {**self._extraction_options(), **(profile or {})}
+        spa_framework = self._detect_spa(html)
+        result = None
         
-        # 使用配置的标题长度限制
-        min_length = self.config.get("min_title_length", 5)
-        max_length = self.config.get("max_title_length", 50) * 4  # 用于验证的最大长度比显示长度更长
+        pool = self._get_parse_pool() if self.config.get("parse_in_subprocess", True) else None
+        if pool is not None and pool.available():
+            try:
+                result = await pool.run(extract_forum_posts, html, options, spa_framework)
+            except ParseTimeoutError as e:
+                logger.error(f"{prefix}解析论坛页面超时，已终止解析进程: {e}")
+                raise
+            except Exception as e:
+                logger.warning(f"{prefix}子进程解析失败，改为在当前进程解析: {e}")
+                # 连续失败后暂停使用进程池，冷却期间不再每轮重建
+                if not pool.available():
+                    logger.warning(f"解析进程池连续失败 {pool.max_failures} 次，"
+                                   f"{pool.cooldown} 秒内直接在当前进程解析")
         
-        if len(title) < min_length or len(title) > max_length:
-            if self.config.get("debug_mode", False):
-                logger.debug(f"标题长度不符合要求: '{title}' (长度: {len(title)})")
-            return False
+        if result is None:
+            result = extract_forum_posts(html, options, spa_framework)
         
-        # URL有效性检查
-        if not url.startswith('http'):
-            return False
+        self._log_extraction_stats(options, result['stats'], source_name)
+        return result['posts']
+
+    def _log_extraction_stats(self, options: Dict, stats: Dict, source_name: Optional[str] = None):
+        """根据提取流水线返回的统计信息输出日志；额外来源的统计不覆盖主论坛的记录"""
+        prefix = f"来源 {source_name} " if source_name else ""
+        if stats.get('backend'):
+            self._warn_parser_fallback(options['html_parser'], stats['backend'])
+        if stats.get('rule_hits') is not None and not source_name:
+            self.container_rule_hits = stats['rule_hits']
+        partial = stats.get('partial_parse')
+        if partial:
+            if not source_name:
+                self.partial_parse_stats = partial
+            logger.debug(f"{prefix}局部解析: DOM节点 {partial['region_nodes']}/{partial['full_nodes']}，"
+                         f"解析内存峰值 {partial['region_bytes'] // 1024}/{partial['full_bytes'] // 1024} KB，"
+                         f"内容 {partial['region_chars']}/{partial['full_chars']} 字符")
         
-        return True
-
-    def _is_excluded_content(self, text: str) -> bool:
-        """检查内容是否应被排除（改进版）"""
-        if not text:
-            return True
-        
-        # 获取用户配置的排除关键词
-        user_excluded = self.config.get("excluded_keywords", [])
-        
-        # 严格匹配的排除模式（避免误判正常帖子）
-        strict_exclusion_patterns = [
-            # 导航类（完全匹配）
-            r'^(首页|主页|上一页|下一页|末页|尾页)$',
-            # 分页类
-            r'^(第\s*\d+\s*页|共\s*\d+\s*页|页码).*$',
-            # 功能类（完全匹配）
-            r'^(登录|注册|搜索|筛选|排序|设置|帮助|关于我们|联系我们)$',
-            r'^(排序方式|筛选条件|搜索结果).*$',
-            # 菜单类
-            r'^(菜单|导航|面包屑).*$',
-        ]
-        
-        text_clean = text.strip()
-        
-        # 检查严格匹配模式
-        for pattern in strict_exclusion_patterns:
-            if re.search(pattern, text_clean, re.IGNORECASE):
-                return True
-        
-        # 检查用户自定义的排除关键词（如果用户明确配置了）
-        if user_excluded:
-            text_lower = text_clean.lower()
-            for keyword in user_excluded:
-                if keyword.lower() in text_lower:
-                    return True
-        
-        return False
-
-    def _deduplicate_posts(self, posts: List[Dict]) -> List[Dict]:
-        """去重帖子列表"""
-        seen_urls = set()
-        seen_titles = set()
-        unique_posts = []
-        
-        for post in posts:
-            url = post['url']
-            title = post['title']
-            
-            # 基于URL去重
-            if url in seen_urls:
-                continue
-            
-            # 基于标题去重（处理相同标题不同URL的情况）
-            title_normalized = title.lower().strip()
-            if title_normalized in seen_titles:
-                continue
-            
-            seen_urls.add(url)
-            seen_titles.add(title_normalized)
-            unique_posts.append(post)
+        source = stats.get('source')
+        if source == 'nuxt':
+            logger.info(f"{prefix}从Nuxt负载中提取到 {stats['candidates']} 个帖子")
+        elif options['extraction_mode'] == 'nuxt':
+            logger.warning(f"{prefix}页面中没有可用的Nuxt负载")
+        if stats.get('spa') and source != 'nuxt':
+            logger.warning(f"{prefix}检测到SPA应用（{stats['spa']}），帖子内容可能通过JavaScript动态加载")
+        if stats.get('empty_container'):
+            logger.warning(f"{prefix}帖子容器为空，可能没有帖子数据或需要JavaScript渲染")
+        if stats.get('containers'):
+            logger.info(f"{prefix}找到 {stats['containers']} 个帖子容器")
+        if source == 'generic':
+            logger.info(f"{prefix}未找到明确的帖子容器，使用通用方法")
         
-        return unique_posts
+        logger.info(f"{prefix}获取到 {stats['posts']} 个有效帖子（候选 {stats['candidates']} 个），"
+                    f"解析耗时 {stats['elapsed_ms']:.1f} ms")
+
+    def _find_post_containers(self, soup: BeautifulSoup) -> List:
+        """查找帖子容器元素"""
+        containers, self.container_rule_hits = find_post_containers(soup)
+        for selector, count in self.container_rule_hits.items():
+            if count:
+                logger.debug(f"选择器 '{selector}' 找到 {count} 个元素")
+        return containers
+
+    def _looks_like_post_link(self, link) -> bool:
+        """判断链接是否看起来像帖子链接"""
+        return looks_like_post_link(link, get_filter_engine(self.config.get("excluded_keywords", [])))
 
     async def check_for_new_posts(self):
         """检查新帖子"""
         try:
-            posts = await self.fetch_forum_posts()
+            posts = await self.fetch_forum_posts(stop_at_known=True)
+            posts = await self._crawl_more_pages(posts)
             new_posts = []
+            seen_ids = []
+            lookups, self._stream_lookups = self._stream_lookups, {}
             
             for post in posts:
-                if post['id'] not in self.known_posts:
+                known = lookups.get(post['id'])
+                if known is None:
+                    known = await self._is_known_post(post['id'])
+                if not known:
                     new_posts.append(post)
-                    self.known_posts.add(post['id'])
+                else:
+                    # 仍在页面上的帖子不会被淘汰
+                    seen_ids.append(post['id'])
+            await self._run_store(self._record_posts, seen_ids, new_posts)
+            if self.bloom is not None:
+                for post in new_posts:
+                    self.bloom.add(post_hash(post['id']))
+            # 页面上没有帖子时视为获取失败，不计入到达速度的统计
+            if posts and self.polling is not None:
+                self.polling.observe(len(new_posts))
+                self._polling_writer.mark_dirty()
+            # 过滤器无法删除被淘汰的帖子，积累过多时重建
+            if self.bloom is not None:
+                known_count = await self._run_store(len, self.known_posts)
+                if self.bloom.count > 2 * max(known_count, self.bloom.initial_capacity):
+                    self.bloom = await self._rebuild_bloom_filter()
             
             if new_posts:
                 logger.info(f"发现 {len(new_posts)} 个新帖子")
                 await self.notify_new_posts(new_posts)
-                await self.save_known_posts()
+                await self.save_known_posts(len(new_posts))
             else:
                 logger.debug("没有发现新帖子")
+                if self.known_posts.dirty or (self.bloom is not None and self.bloom.dirty):
+                    await self.save_known_posts()
                 
         except Exception as e:
             logger.error(f"检查新帖子失败: {e}")
 
-    async def notify_new_posts(self, new_posts: List[Dict]):
-        """通知新帖子"""
+    async def notify_new_posts(self, new_posts: List[Dict], target_groups: Optional[List] = None):
+        """通知新帖子：加入发件箱并保存，由后台任务推送；默认推送到配置的目标群"""
         try:
-            target_groups = self.config.get("target_groups", [])
-            max_title_length = self.config.get("max_title_length", 50)
+            if target_groups is None:
+                target_groups = self.config.get("target_groups", [])
             
             if not target_groups:
                 logger.warning("未配置目标QQ群，无法推送新帖子")
                 return
             
-            for post in new_posts:
-                title = post['title']
-                if len(title) > max_title_length:
-                    title = title[:max_title_length] + "..."
-                
-                message = f"🆕 Unikorn论坛新帖子\n\n📝 {title}\n🔗 {post['url']}"
-                
-                # 发送到每个配置的群
-                for group_id in target_groups:
-                    try:
-                        # 构造消息链 - 使用正确的MessageChain方式
-                        message_chain = MessageChain().message(message)
-                        
-                        # 构造unified_msg_origin
-                        unified_msg_origin = f"qq_group_{group_id}"
-                        
-                        # 使用context发送消息
-                        await self.context.send_message(unified_msg_origin, message_chain)
-                        logger.info(f"已向群 {group_id} 推送新帖子: {title}")
-                    except Exception as e:
-                        logger.error(f"向群 {group_id} 推送消息失败: {e}")
+            added = self.outbox.enqueue(new_posts, target_groups)
+            if not added:
+                return
+            # 发件箱必须先于已知帖子落盘，否则崩溃后这些帖子既不会重新发现也不会推送
+            self._outbox_writer.mark_dirty(added)
+            await self._outbox_writer.flush()
+            self._start_outbox_worker()
+            self._outbox_event.set()
                         
         except Exception as e:
             logger.error(f"通知新帖子失败: {e}")
 
+    def _start_outbox_worker(self):
+        """启动发件箱的后台推送任务"""
+        if self._outbox_task is None or self._outbox_task.done():
+            self._outbox_stopping = False
+            self._outbox_task = asyncio.create_task(self._outbox_worker())
+
+    async def _outbox_worker(self):
+        """推送发件箱中到期的记录，没有到期记录时等待新消息或下一次重试"""
+        while not self._outbox_stopping:
+            self._outbox_event.clear()
+            try:
+                await self._deliver_outbox()
+            except Exception as e:
+                logger.error(f"推送发件箱消息失败: {e}")
+            if self._outbox_stopping:
+                break
+            
+            next_due = self.outbox.next_due()
+            delay = 300 if next_due is None else min(300, max(1, next_due - time.time()))
+            try:
+                await asyncio.wait_for(self._outbox_event.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver_outbox(self):
+        """推送一次发件箱中到期的记录"""
+        due = self.outbox.due()
+        if not due:
+            return
+        
+        entries = {(entry['post']['id'], entry['group_id']): entry for entry in due}
+        # 不同来源的帖子分开生成消息，标题和链接使用各自的论坛
+        posts_by_group: Dict[Tuple[str, str, str], List[Dict]] = {}
+        for entry in due:
+            post = entry['post']
+            forum = (entry['group_id'], post.get('forum_name', FORUM_NAME), post.get('forum_url', FORUM_URL))
+            posts_by_group.setdefault(forum, []).append(post)
+        # 仅在QQ平台（aiocqhttp）上把大批新帖子合并为转发消息
+        forward_threshold = self.config.get("forward_threshold", 5) if self._get_forward_client() else 0
+        plan = {}
+        for (group_id, forum_name, forum_url), posts in posts_by_group.items():
+            group_plan = plan_notifications(
+                posts, [group_id],
+                default_mode=self.config.get("notification_mode", "individual"),
+                group_modes=parse_group_modes(self.config.get("group_notification_modes", [])),
+                max_title_length=self.config.get("max_title_length", 50),
+                digest_max_posts=self.config.get("digest_max_posts", 10),
+                digest_max_length=self.config.get("digest_max_length", 1500),
+                digest_max_messages=self.config.get("digest_max_messages", 3),
+                forward_threshold=forward_threshold,
+                forward_max_nodes=self.config.get("forward_max_nodes", 50),
+                forum_name=forum_name,
+                forum_url=forum_url,
+            )
+            for group, notifications in group_plan.items():
+                plan.setdefault(group, []).extend(notifications)
+        
+        async def before_send(group_id: str, notification: Notification):
+            # 取得令牌、即将发送时才标记为发送中并保存，重启后不会重复推送；
+            # 还没轮到的记录保持待发送，关闭插件后下次启动时继续推送
+            keys = [(post['id'], group_id) for post in notification.posts]
+            self.outbox.begin(entries[key] for key in keys if key in entries)
+            self._outbox_writer.mark_dirty(len(keys))
+            try:
+                saved = await self._outbox_writer.flush()
+            except BaseException:
+                # 被取消时这些消息还没有发送
+                self.outbox.abort(keys)
+                self._outbox_writer.mark_dirty(len(keys))
+                raise
+            if not saved:
+                self.outbox.abort(keys)
+                self._outbox_writer.mark_dirty(len(keys))
+                raise RuntimeError("保存发件箱失败，暂不发送")
+        
+        notified_groups: Dict[str, List] = {}
+        
+        def on_result(result: SendResult):
+            # 每条消息发送完成时立即记录结果，推送中途关闭插件也不会丢失
+            notification = result.notification
+            keys = [(post['id'], result.group_id) for post in notification.posts]
+            self._outbox_writer.mark_dirty(len(keys))
+            if not result.ok:
+                dropped = self.outbox.failed(keys, str(result.error))
+                logger.error(f"向群 {result.group_id} 推送消息失败: {result.error}")
+                for entry in dropped:
+                    logger.error(f"向群 {entry['group_id']} 推送帖子失败 {entry['attempts']} 次，已放弃: "
+                                 f"{entry['post']['title']}")
+                return
+            
+            self.outbox.succeeded(keys)
+            if notification.is_forward:
+                logger.info(f"已向群 {result.group_id} 合并转发 {len(notification.posts)} 个新帖子"
+                            f"（耗时 {result.latency * 1000:.0f} ms）")
+            elif len(notification.posts) == 1:
+                logger.info(f"已向群 {result.group_id} 推送新帖子: {notification.posts[0]['title']}"
+                            f"（耗时 {result.latency * 1000:.0f} ms）")
+            else:
+                logger.info(f"已向群 {result.group_id} 推送 {len(notification.posts)} 个新帖子的摘要"
+                            f"（耗时 {result.latency * 1000:.0f} ms）")
+            if result.waited >= 1:
+                logger.debug(f"向群 {result.group_id} 发送前限速等待 {result.waited:.1f} 秒")
+            for post in notification.posts:
+                notified_groups.setdefault(post['id'], []).append(result.group_id)
+        
+        def mark_notified():
+            for post_id, groups in notified_groups.items():
+                self.known_posts.mark_notified(post_id, groups)
+        
+        # 并发发送到每个群，按群和账号限速
+        started = time.perf_counter()
+        try:
+            results = await self._get_dispatcher().dispatch(plan, before_send, on_result)
+            logger.info(f"本轮向 {len(plan)} 个群发送 {len(results)} 条消息，"
+                        f"失败 {sum(not result.ok for result in results)} 条，"
+                        f"用时 {time.perf_counter() - started:.1f} 秒")
+        finally:
+            if notified_groups:
+                await self._run_store(mark_notified)
+                await self.save_known_posts(len(notified_groups))
+
+    def _get_dispatcher(self) -> FanOutDispatcher:
+        """获取消息分发器，首次使用时按配置创建"""
+        if self._dispatcher is None:
+            self._dispatcher = FanOutDispatcher(
+                self._send_notification,
+                concurrency=self.config.get("send_concurrency", 5),
+                group_rate=self.config.get("group_send_rate_per_minute", 20) / 60,
+                group_burst=self.config.get("group_send_burst", 5),
+                account_rate=self.config.get("account_send_rate_per_minute", 60) / 60,
+                account_burst=self.config.get("account_send_burst", 10),
+            )
+        return self._dispatcher
+
+    def _get_forward_client(self):
+        """获取QQ平台（aiocqhttp）的协议端客户端，不可用时返回None"""
+        try:
+            from astrbot.core.platform.sources.aiocqhttp.aiocqhttp_platform_adapter import AiocqhttpAdapter
+            platform = self.context.get_platform(filter.PlatformAdapterType.AIOCQHTTP)
+            if isinstance(platform, AiocqhttpAdapter):
+                return platform.get_client()
+        except Exception as e:
+            logger.debug(f"无法获取aiocqhttp协议端客户端: {e}")
+        return None
+
+    async def _send_forward(self, client, group_id: str, notification: Notification):
+        """通过协议端API发送合并转发消息，每个帖子一个节点"""
+        # 转发节点的发送者显示为机器人自己
+        if self._forward_uin is None:
+            try:
+                login_info = await client.api.call_action('get_login_info')
+                self._forward_uin = str(login_info.get('user_id', ''))
+            except Exception as e:
+                logger.warning(f"获取登录信息失败，合并转发节点将不显示机器人QQ号: {e}")
+                self._forward_uin = ''
+        sender_name = self.config.get("forward_sender_name", "Unikorn论坛")
+        forward_payload = {
+            "group_id": int(group_id),
+            "messages": [
+                {"type": "node", "data": {"name": sender_name, "uin": self._forward_uin, "content": content}}
+                for content in notification.nodes
+            ],
+        }
+        send_result = await client.api.call_action('send_group_forward_msg', **forward_payload)
+        logger.debug(f"合并转发结果: {send_result}")
+
+    async def _send_notification(self, group_id: str, notification: Notification):
+        """向群发送一条推送消息"""
+        if notification.is_forward:
+            client = self._get_forward_client()
+            if client is not None:
+                await self._send_forward(client, group_id, notification)
+                return
+            # 不在QQ平台时退回普通消息，text 中包含全部帖子
+            logger.debug("aiocqhttp协议端不可用，合并转发消息改为普通消息发送")
+        
+        # 构造消息链 - 使用正确的MessageChain方式
+        message_chain = MessageChain().message(notification.text)
+        
+        # 构造unified_msg_origin
+        unified_msg_origin = f"qq_group_{group_id}"
+        
+        # 使用context发送消息
+        await self.context.send_message(unified_msg_origin, message_chain)
+
     async def start_monitoring(self):
         """启动监控任务"""
         if self.check_task and not self.check_task.done():
@@ -541,20 +1031,90 @@ class UnikornNewsPlugin(Star):
         interval = self.config.get("check_interval", 5) * 60  # 转换为秒
         logger.info(f"启动Unikorn论坛监控，检查间隔: {interval/60} 分钟")
         
+        self.scheduler = DeadlineScheduler(interval, source=PRIMARY_SOURCE)
+        # 额外来源的第一次检查在各自的间隔内错开，避免同时请求
+        for index, state in enumerate(self.sources.values(), 1):
+            delay = state.config.interval * index / (len(self.sources) + 1)
+            self.scheduler.add(state.name, state.config.interval, delay)
         self.check_task = asyncio.create_task(self._monitoring_loop(interval))
 
     async def _monitoring_loop(self, interval: int):
-        """监控循环"""
-        while True:
-            try:
+        """监控循环：由同一个调度器按各来源的截止时间触发检查，不同来源的检查并发进行"""
+        scheduler = self.scheduler
+        running = set()
+        try:
+            while True:
+                tick = await scheduler.wait()
+                if tick.lateness >= 1:
+                    logger.warning(f"{tick.source} 的第 {tick.number} 次检查比计划晚了 {tick.lateness:.1f} 秒")
+                task = asyncio.create_task(self._run_check(tick, interval))
+                running.add(task)
+                task.add_done_callback(running.discard)
+        except asyncio.CancelledError:
+            logger.info("监控任务已取消")
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            scheduler.close()
+
+    async def _run_check(self, tick, interval: int):
+        """执行一次触发的检查并安排这个来源的下一次检查"""
+        next_interval = None
+        try:
+            if tick.source == PRIMARY_SOURCE:
                 await self.check_for_new_posts()
-                await asyncio.sleep(interval)
-            except asyncio.CancelledError:
-                logger.info("监控任务已取消")
-                break
-            except Exception as e:
-                logger.error(f"监控循环出错: {e}")
-                await asyncio.sleep(interval)
+                next_interval = self._next_check_interval(interval)
+            else:
+                await self.check_source(self.sources[tick.source])
+        except Exception as e:
+            logger.error(f"监控循环出错: {e}")
+        finally:
+            skipped = self.scheduler.finish(tick, next_interval)
+        if skipped:
+            logger.warning(f"{tick.source} 的检查耗时超过间隔，跳过 {skipped} 次检查")
+
+    async def check_source(self, state: SourceState):
+        """检查一个额外来源的新帖子"""
+        source = state.config
+        try:
+            if not self.session:
+                raise RuntimeError("HTTP会话未初始化")
+            async with self.session.get(source.url, headers=self._conditional_headers(state.validators)) as response:
+                if response.status == 304:
+                    logger.debug(f"来源 {source.name} 的页面未变化 (304)")
+                    state.checks += 1
+                    state.last_checked = time.time()
+                    state.last_error = None
+                    return
+                if response.status != 200:
+                    raise RuntimeError(f"状态码: {response.status}")
+                html = await response.text()
+                validators = self._response_validators(response.headers)
+            
+            posts = await self._parse_forum_html(html, profile={'base_url': source.url, **source.profile},
+                                                 source_name=source.name)
+            if not posts:
+                raise RuntimeError("页面中没有找到帖子")
+            first_check = not state.seeded
+            new_posts = state.record(posts)
+            state.validators = validators
+            
+            if first_check:
+                logger.info(f"来源 {source.name} 首次检查，记录现有的 {len(posts)} 个帖子，不推送")
+            elif new_posts:
+                logger.info(f"来源 {source.name} 发现 {len(new_posts)} 个新帖子")
+                await self.notify_new_posts(
+                    [{**post, 'forum_name': source.name, 'forum_url': source.url} for post in new_posts],
+                    source.groups)
+            if state.known_posts.dirty:
+                self._source_writers[source.name].mark_dirty(max(1, len(new_posts)))
+        except Exception as e:
+            state.last_error = str(e)
+            logger.error(f"检查来源 {source.name} 失败: {e}")
+
+    def _is_monitoring(self) -> bool:
+        return bool(self.check_task and not self.check_task.done())
 
     @filter.command("unikorn")
     async def unikorn_command(self, event: AstrMessageEvent):
@@ -597,12 +1157,66 @@ class UnikornNewsPlugin(Star):
         status = "运行中" if is_running else "已停止"
         interval = self.config.get("check_interval", 5)
         target_groups = self.config.get("target_groups", [])
+        known_count = await self._run_store(len, self.known_posts)
         
         message = (f"📊 Unikorn论坛监控状态\n\n"
                   f"🔄 状态: {status}\n"
                   f"⏰ 检查间隔: {interval} 分钟\n"
                   f"👥 目标群: {len(target_groups)} 个\n"
-                  f"📚 已知帖子: {len(self.known_posts)} 个")
+                  f"📚 已知帖子: {known_count} 个（{self.known_posts.policy}，已淘汰 {self.known_posts.evicted} 个）\n"
+                  f"🧬 页面指纹缓存: 命中 {self.fingerprint_hits} 次 / 未命中 {self.fingerprint_misses} 次")
+        
+        if self.polling is not None:
+            decision = self.polling_decision or self.polling.decide()
+            message += (f"\n⏱️ 自适应间隔: 当前 {decision.base_interval / 60:.1f} 分钟"
+                        f"（±{self.polling.jitter:.0%} 抖动，范围 {self.polling.min_interval / 60:g}-"
+                        f"{self.polling.max_interval / 60:g} 分钟）\n   {decision.reason}")
+        
+        next_check = self.scheduler.time_until_next() if is_running and self.scheduler is not None else None
+        if next_check is not None:
+            message += f"\n⏳ 下次检查: {next_check:.0f} 秒后"
+            lateness = self.scheduler.lateness_stats()
+            if lateness:
+                message += (f"（最近 {lateness['count']} 次定时检查延迟 平均 {lateness['avg_ms']:.0f} ms / "
+                            f"最长 {lateness['max_ms']:.0f} ms，跳过 {self.scheduler.skipped} 次）")
+        
+        if self.sources:
+            message += f"\n🗂️ 额外来源: {len(self.sources)} 个"
+            for state in self.sources.values():
+                line = (f"\n   · {state.name}: 每 {state.config.interval / 60:g} 分钟，"
+                        f"已知 {len(state.known_posts)} 个，上次新帖 {state.last_new} 个")
+                source_next = self.scheduler.time_until_next(state.name) if is_running and self.scheduler else None
+                if source_next is not None:
+                    line += f"，{source_next:.0f} 秒后检查"
+                if state.last_error:
+                    line += f"，上次失败: {state.last_error}"
+                message += line
+        
+        posts_age = self.read_cache.age('posts')
+        if posts_age is not None:
+            cache_stats = self.read_cache.stats
+            message += (f"\n🗃️ 帖子快照: {posts_age:.0f} 秒前更新，查询命中 {cache_stats['fresh']} 次 / "
+                        f"返回旧数据 {cache_stats['stale']} 次 / 等待刷新 {cache_stats['miss']} 次")
+        
+        if len(self.outbox):
+            message += f"\n📮 发件箱: {len(self.outbox)} 条待推送"
+        
+        if self._dispatcher is not None and self._dispatcher.latencies:
+            latency = self._dispatcher.latency_stats()
+            message += (f"\n📨 推送: 成功 {self._dispatcher.sent} 条 / 失败 {self._dispatcher.failed} 条，"
+                        f"最近 {latency['count']} 次耗时 平均 {latency['avg_ms']:.0f} ms / "
+                        f"P95 {latency['p95_ms']:.0f} ms / 最长 {latency['max_ms']:.0f} ms")
+        
+        if self.bloom is not None:
+            message += (f"\n🌸 布隆过滤器: 填充率 {self.bloom.fill_ratio:.1%}，估计误判率 "
+                        f"{self.bloom.estimated_error_rate:.3%}（直接排除 {self.bloom_stats['negatives']} 次，"
+                        f"存储确认 {self.bloom_stats['confirmed']} 次，误判 {self.bloom_stats['false_positives']} 次）")
+        
+        if self.streaming_stats:
+            total = self.streaming_stats['content_length']
+            read = f"{self.streaming_stats['bytes_read']}/{total}" if total else f"{self.streaming_stats['bytes_read']}"
+            stopped = "提前停止" if self.streaming_stats['stopped_early'] else "完整读取"
+            message += f"\n🌊 上次流式解析: 读取 {read} 字节，{stopped}"
         
         yield event.plain_result(message)
 
@@ -612,7 +1226,11 @@ class UnikornNewsPlugin(Star):
         yield event.plain_result("🔍 正在检查Unikorn论坛更新...")
         
         try:
-            await self.check_for_new_posts()
+            if self._is_monitoring():
+                # 由监控循环立即检查，并从这次检查开始重新计算下一次检查的时间
+                await self.scheduler.trigger()
+            else:
+                await self.check_for_new_posts()
             yield event.plain_result("✅ 检查完成！如有新帖子会自动推送到配置的群。")
         except Exception as e:
             logger.error(f"手动检查失败: {e}")
@@ -639,11 +1257,13 @@ class UnikornNewsPlugin(Star):
 
     @filter.command("unikorn", "posts")
     async def posts_command(self, event: AstrMessageEvent):
-        """查看最新帖子"""
-        yield event.plain_result("📖 正在获取最新帖子...")
-        
+        """查看最新帖子，优先使用缓存的结果"""
         try:
-            posts = await self.fetch_forum_posts()
+            # 缓存中没有结果时才需要等待请求论坛
+            if self.read_cache.age('posts') is None:
+                yield event.plain_result("📖 正在获取最新帖子...")
+            cached = await self.read_cache.get('posts', self._refresh_cached_posts)
+            posts = cached.value
             if not posts:
                 yield event.plain_result("❌ 未能获取到帖子，可能网站结构发生了变化")
                 return
@@ -661,6 +1281,8 @@ class UnikornNewsPlugin(Star):
             
             if len(posts) > 5:
                 message += f"... 还有 {len(posts) - 5} 个帖子"
+            if cached.age >= 60:
+                message += f"\n🕒 数据更新于 {cached.age / 60:.0f} 分钟前"
                 
             yield event.plain_result(message)
             
@@ -846,75 +1468,98 @@ class UnikornNewsPlugin(Star):
             self.config["debug_mode"] = True
             
             try:
-                # 获取原始帖子数据
-                if not self.session:
-                    yield event.plain_result("❌ HTTP会话未初始化")
+                # 使用缓存的页面HTML，缓存过期时在后台刷新
+                cached = await self.read_cache.get('html', self._refresh_cached_html)
+                if cached.value is None:
+                    yield event.plain_result("❌ 获取论坛页面失败")
                     return
                 
-                async with self.session.get(self.forum_url) as response:
-                    if response.status != 200:
-                        yield event.plain_result(f"❌ 获取论坛页面失败，状态码: {response.status}")
-                        return
-                    
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # 分析网页结构
-                    debug_info = []
-                    debug_info.append("📊 网页结构分析:")
-                    debug_info.append(f"总链接数: {len(soup.find_all('a', href=True))}")
-                    debug_info.append(f"总元素数: {len(soup.find_all())}")
-                    
-                    # 查找潜在的帖子容器
-                    containers = self._find_post_containers(soup)
-                    debug_info.append(f"潜在帖子容器: {len(containers)}")
-                    
-                    # 获取所有链接进行分析
-                    all_links = soup.find_all('a', href=True)
-                    valid_links = []
-                    invalid_links = []
-                    
-                    for link in all_links:
-                        href = link.get('href', '')
-                        title = link.get_text(strip=True)
-                        
-                        if self._looks_like_post_link(link):
-                            valid_links.append({'title': title, 'href': href})
-                        else:
-                            invalid_links.append({'title': title, 'href': href})
-                    
-                    debug_info.append(f"疑似帖子链接: {len(valid_links)}")
-                    debug_info.append(f"排除的链接: {len(invalid_links)}")
-                    
-                    # 显示前几个有效链接
-                    debug_info.append("\n📝 前5个疑似帖子:")
-                    for i, link in enumerate(valid_links[:5], 1):
-                        debug_info.append(f"{i}. {link['title'][:30]}...")
-                        debug_info.append(f"   URL: {link['href']}")
-                    
-                    # 显示前几个被排除的链接
-                    debug_info.append("\n❌ 前5个被排除的链接:")
-                    for i, link in enumerate(invalid_links[:5], 1):
-                        debug_info.append(f"{i}. {link['title'][:30]}...")
-                        debug_info.append(f"   URL: {link['href']}")
-                    
-                    # 测试完整的筛选流程
-                    posts = await self.fetch_forum_posts()
-                    debug_info.append(f"\n✅ 最终筛选结果: {len(posts)} 个有效帖子")
-                    
-                    if posts:
-                        debug_info.append("\n📋 最终帖子列表:")
-                        for i, post in enumerate(posts[:3], 1):
-                            debug_info.append(f"{i}. {post['title']}")
-                    
-                    # 配置信息
-                    debug_info.append(f"\n⚙️ 当前筛选配置:")
-                    debug_info.append(f"最小标题长度: {self.config.get('min_title_length', 5)}")
-                    debug_info.append(f"严格过滤: {self.config.get('strict_filtering', True)}")
-                    debug_info.append(f"排除关键词: {len(self.config.get('excluded_keywords', []))}")
-                    
-                    yield event.plain_result("\n".join(debug_info))
+                html = cached.value
+                backend = self._get_parser_backend(require_tree=True)
+                soup = backend.parse(html)
+                
+                # 分析网页结构
+                debug_info = []
+                debug_info.append("📊 网页结构分析:")
+                debug_info.append(f"解析后端: {backend.name}")
+                debug_info.append(f"SPA框架: {detect_spa(html) or '未检测到'}")
+                debug_info.append(f"页面获取于: {cached.age:.0f} 秒前")
+                debug_info.append(f"总链接数: {len(soup.find_all('a', href=True))}")
+                debug_info.append(f"总元素数: {len(soup.find_all())}")
+                
+                # 查找潜在的帖子容器
+                containers = self._find_post_containers(soup)
+                debug_info.append(f"潜在帖子容器: {len(containers)}")
+                for selector, count in self.container_rule_hits.items():
+                    if count:
+                        debug_info.append(f"  {selector}: {count}")
+                
+                # 获取所有链接进行分析
+                all_links = soup.find_all('a', href=True)
+                valid_links = []
+                invalid_links = []
+                
+                for link in all_links:
+                    href = link.get('href', '')
+                    title = link.get_text(strip=True)
                     
+                    if self._looks_like_post_link(link):
+                        valid_links.append({'title': title, 'href': href})
+                    else:
+                        invalid_links.append({'title': title, 'href': href})
+                
+                debug_info.append(f"疑似帖子链接: {len(valid_links)}")
+                debug_info.append(f"排除的链接: {len(invalid_links)}")
+                
+                # 显示前几个有效链接
+                debug_info.append("\n📝 前5个疑似帖子:")
+                for i, link in enumerate(valid_links[:5], 1):
+                    debug_info.append(f"{i}. {link['title'][:30]}...")
+                    debug_info.append(f"   URL: {link['href']}")
+                
+                # 显示前几个被排除的链接
+                debug_info.append("\n❌ 前5个被排除的链接:")
+                for i, link in enumerate(invalid_links[:5], 1):
+                    debug_info.append(f"{i}. {link['title'][:30]}...")
+                    debug_info.append(f"   URL: {link['href']}")
+                
+                # 局部解析与整页解析的对比
+                region_html = slice_posts_region(html)
+                if region_html is not None:
+                    full_nodes, full_bytes = measure_parse(backend, html)
+                    region_nodes, region_bytes = measure_parse(backend, region_html)
+                    debug_info.append("\n✂️ 局部解析:")
+                    debug_info.append(f"帖子区域: {len(region_html)}/{len(html)} 字符")
+                    debug_info.append(f"DOM节点: {region_nodes}（整页 {full_nodes}，减少 {full_nodes - region_nodes}）")
+                    debug_info.append(f"解析内存峰值: {region_bytes // 1024} KB（整页 {full_bytes // 1024} KB，"
+                                      f"节省 {(full_bytes - region_bytes) // 1024} KB）")
+                else:
+                    debug_info.append("\n✂️ 局部解析: 未找到帖子列表区域，将解析整个页面")
+                
+                # 用同一份页面测试完整的筛选流程
+                posts = await self._parse_forum_html(html)
+                debug_info.append(f"\n✅ 最终筛选结果: {len(posts)} 个有效帖子")
+                
+                if posts:
+                    debug_info.append("\n📋 最终帖子列表:")
+                    for i, post in enumerate(posts[:3], 1):
+                        debug_info.append(f"{i}. {post['title']}")
+                
+                if self.partial_parse_stats:
+                    stats = self.partial_parse_stats
+                    debug_info.append(f"\n📉 最近一轮解析: DOM节点 {stats['region_nodes']}/{stats['full_nodes']}，"
+                                      f"内存峰值 {stats['region_bytes'] // 1024}/{stats['full_bytes'] // 1024} KB，"
+                                      f"内容 {stats['region_chars']}/{stats['full_chars']} 字符")
+                
+                # 配置信息
+                debug_info.append(f"\n⚙️ 当前筛选配置:")
+                debug_info.append(f"解析后端配置: {self.config.get('html_parser', 'lxml')}")
+                debug_info.append(f"最小标题长度: {self.config.get('min_title_length', 5)}")
+                debug_info.append(f"严格过滤: {self.config.get('strict_filtering', True)}")
+                debug_info.append(f"排除关键词: {len(self.config.get('excluded_keywords', []))}")
+                
+                yield event.plain_result("\n".join(debug_info))
+                
             finally:
                 # 恢复原始调试模式设置
                 self.config["debug_mode"] = original_debug
@@ -925,6 +1570,14 @@ class UnikornNewsPlugin(Star):
 
     async def terminate(self):
         """插件销毁方法"""
+        # 整个关闭过程共用一个截止时间，每一步只使用剩余的时间
+        timeout = self.config.get("persist_shutdown_timeout", 10)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        
+        def remaining() -> float:
+            return max(0.0, deadline - loop.time())
+        
         try:
             if self.check_task and not self.check_task.done():
                 self.check_task.cancel()
@@ -933,10 +1586,39 @@ class UnikornNewsPlugin(Star):
                 except asyncio.CancelledError:
                     pass
             
+            await self.read_cache.close()
             if self.session and not self.session.closed:
                 await self.session.close()
+            
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown()
                 
-            await self.save_known_posts()
+            # 等待正在进行的推送完成，超时则中断；至少留一半时间给最后一次写入
+            if self._outbox_task is not None and not self._outbox_task.done():
+                self._outbox_stopping = True
+                self._outbox_event.set()
+                try:
+                    await asyncio.wait_for(self._outbox_task, remaining() / 2)
+                except (asyncio.TimeoutError, asyncio.CancelledError):
+                    logger.warning("推送未能在关闭前完成，未完成的消息会在下次启动时处理")
+            
+            # 在剩余时间内完成最后一次写入
+            write_timeout = remaining()
+            flushed = await asyncio.gather(
+                self._known_posts_writer.close(write_timeout),
+                self._http_cache_writer.close(write_timeout),
+                self._outbox_writer.close(write_timeout),
+                self._polling_writer.close(write_timeout),
+                *(writer.close(write_timeout) for writer in self._source_writers.values()),
+            )
+            if not all(flushed):
+                logger.error(f"部分数据未能在 {timeout} 秒内保存完成")
+            if self._store_executor is not None:
+                try:
+                    await asyncio.wait_for(self._run_store(self.known_posts.close), remaining())
+                except asyncio.TimeoutError:
+                    logger.error(f"已知帖子存储未能在 {timeout} 秒内关闭")
+                self._store_executor.shutdown(wait=False)
             logger.info("Unikorn News Plugin 已清理完成")
         except Exception as e:
             logger.error(f"插件清理失败: {e}")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+测试可扩展布隆过滤器：无漏判、误判率、扩容和序列化
+"""
+
+from unikorn.bloom import ScalableBloomFilter
+from unikorn.seen_store import SeenStore, post_hash
+
+POST = "https://unikorn.axfff.com/forum/post/{}"
+
+
+def test_no_false_negatives_and_error_rate():
+    """已加入的元素一定命中，未加入元素的误判率接近配置值"""
+    bloom = ScalableBloomFilter(error_rate=0.01, initial_capacity=500)
+    bloom.update(post_hash(POST.format(i)) for i in range(5000))
+    assert all(post_hash(POST.format(i)) in bloom for i in range(5000))
+
+    trials = 20000
+    false_positives = sum(post_hash(POST.format(i)) in bloom for i in range(5000, 5000 + trials))
+    rate = false_positives / trials
+    print(f"{len(bloom.filters)} 级过滤器，填充率 {bloom.fill_ratio:.1%}，"
+          f"估计误判率 {bloom.estimated_error_rate:.3%}，实测 {rate:.3%}")
+    assert len(bloom.filters) > 1
+    # 已经被判定存在的元素（包括误判）不会重复加入
+    assert 4900 < bloom.count <= 5000
+    assert rate < 0.02
+    assert bloom.estimated_error_rate < 0.02
+    print("✅ PASS")
+
+
+def test_duplicates_do_not_consume_capacity():
+    """重复加入的元素不计入容量"""
+    bloom = ScalableBloomFilter(initial_capacity=10)
+    for _ in range(5):
+        bloom.update(range(10))
+    assert bloom.count == 10
+    assert len(bloom.filters) == 1
+    print("✅ PASS")
+
+
+def test_round_trip():
+    """序列化后恢复的过滤器判定结果一致"""
+    store = SeenStore(max_size=0)
+    for i in range(300):
+        store.add(POST.format(i), now=i)
+    bloom = ScalableBloomFilter(error_rate=0.001, initial_capacity=100)
+    bloom.update(store.hashes())
+
+    restored = ScalableBloomFilter.from_bytes(bloom.to_bytes())
+    values = [post_hash(POST.format(i)) for i in range(600)]
+    assert [value in restored for value in values] == [value in bloom for value in values]
+    assert restored.count == bloom.count
+    assert restored.error_rate == 0.001
+    try:
+        ScalableBloomFilter.from_bytes(b'XXXX' + bytes(40))
+        raise AssertionError("应当拒绝无效数据")
+    except ValueError:
+        pass
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_no_false_negatives_and_error_rate()
+    test_duplicates_do_not_consume_capacity()
+    test_round_trip()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+测试查询结果缓存：有效期内直接命中、过期后先返回旧结果再后台刷新、并发请求共享一次刷新
+"""
+
+import asyncio
+
+from unikorn.cache import FRESH, MISS, STALE, ResultCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fresh_and_stale_while_revalidate():
+    """新鲜的结果直接返回；过期的结果立即返回，同时在后台刷新"""
+    async def run():
+        clock = FakeClock()
+        cache = ResultCache(ttl=60, stale_ttl=600, clock=clock)
+        calls = []
+
+        async def refresh():
+            calls.append(clock.now)
+            await asyncio.sleep(0.01)
+            return f"第{len(calls)}次刷新"
+
+        cache.put('posts', "监控循环的结果")
+        clock.now += 30
+        result = await cache.get('posts', refresh)
+        assert result.state == FRESH and result.value == "监控循环的结果" and calls == []
+
+        clock.now += 60
+        result = await cache.get('posts', refresh)
+        assert result.state == STALE and result.value == "监控循环的结果" and result.age == 90
+        again = await cache.get('posts', refresh)
+        assert again.state == STALE
+        await asyncio.sleep(0.05)
+        assert len(calls) == 1
+        result = await cache.get('posts', refresh)
+        assert result.state == FRESH and result.value == "第1次刷新"
+        print(f"✅ PASS: {cache.stats}")
+
+    asyncio.run(run())
+
+
+def test_miss_waits_for_single_refresh():
+    """没有结果时并发的请求等待同一次刷新"""
+    async def run():
+        cache = ResultCache(ttl=60, stale_ttl=0)
+        calls = []
+
+        async def refresh():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return ["帖子"]
+
+        results = await asyncio.gather(*(cache.get('posts', refresh) for _ in range(10)))
+        assert len(calls) == 1
+        assert all(result.state == MISS and result.value == ["帖子"] for result in results)
+
+    asyncio.run(run())
+    print("✅ PASS")
+
+
+def test_failed_refresh_keeps_old_value():
+    """刷新失败时不写入缓存，仍返回旧结果；从未成功时返回None"""
+    async def run():
+        clock = FakeClock()
+        cache = ResultCache(ttl=10, stale_ttl=10, clock=clock)
+
+        async def failing():
+            raise RuntimeError("网络错误")
+
+        assert (await cache.get('posts', failing)).value is None
+        cache.put('posts', "旧结果")
+        clock.now += 100
+        result = await cache.get('posts', failing)
+        assert result.state == STALE and result.value == "旧结果"
+        assert cache.stats['refresh_failures'] == 2
+
+        cache.renew('posts')
+        assert (await cache.get('posts', failing)).state == FRESH
+        await cache.close()
+
+    asyncio.run(run())
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_fresh_and_stale_while_revalidate()
+    test_miss_waits_for_single_refresh()
+    test_failed_refresh_keeps_old_value()
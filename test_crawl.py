@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+测试多页抓取：遇到已知帖子边界停止、按页码顺序合并、并发上限和页数上限
+"""
+
+import asyncio
+
+from unikorn.crawl import crawl_pages
+
+PAGE_SIZE = 5
+POST = "https://unikorn.axfff.com/forum/post/{}"
+
+
+def make_forum(total):
+    """按从新到旧排列的帖子，分页返回"""
+    posts = [{'id': POST.format(n), 'title': f"帖子{n}", 'url': POST.format(n)} for n in range(total, 0, -1)]
+    return [posts[i:i + PAGE_SIZE] for i in range(0, len(posts), PAGE_SIZE)]
+
+
+def run_crawl(pages, known_below, max_pages=10, concurrency=3, delay=0.01, fail_page=None):
+    requested = []
+    in_flight = [0, 0]
+
+    async def fetch_page(page):
+        requested.append(page)
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight[1], in_flight[0])
+        try:
+            # 后面的页面先返回，检验合并顺序
+            await asyncio.sleep(delay / page)
+            if page == fail_page:
+                raise RuntimeError("请求失败")
+            return pages[page - 1] if page <= len(pages) else []
+        finally:
+            in_flight[0] -= 1
+
+    def is_known(post_id):
+        return int(post_id.rsplit('/', 1)[1]) <= known_below
+
+    result = asyncio.run(crawl_pages(pages[0], fetch_page, is_known, max_pages, concurrency))
+    return result, requested, in_flight[1]
+
+
+def test_first_page_boundary_needs_no_crawl():
+    """第一页已经到达已知帖子时不翻页"""
+    pages = make_forum(30)
+    result, requested, _ = run_crawl(pages, known_below=27)
+    assert requested == [] and result.pages_fetched == 1 and result.boundary_page == 1
+    print("✅ PASS")
+
+
+def test_crawl_stops_at_known_boundary_in_order():
+    """抓取到包含已知帖子的那一页为止，按页码顺序合并且没有遗漏"""
+    pages = make_forum(60)
+    result, requested, peak = run_crawl(pages, known_below=60 - 13, concurrency=3)
+    ids = [post['id'] for post in result.posts]
+    print(f"请求的页面: {requested}，最大并发: {peak}，边界页: {result.boundary_page}")
+    assert result.boundary_page == 3
+    assert ids == [POST.format(n) for n in range(60, 60 - 15, -1)]
+    assert peak <= 3
+    assert max(requested) <= 3 + 3
+    print("✅ PASS")
+
+
+def test_page_budget_and_failures():
+    """达到页数上限时报告可能遗漏；请求失败的页面视为边界"""
+    pages = make_forum(100)
+    result, requested, _ = run_crawl(pages, known_below=0, max_pages=4)
+    assert result.exhausted and result.pages_fetched == 4
+    assert sorted(requested) == [2, 3, 4] and len(result.posts) == 20
+
+    result, _, _ = run_crawl(pages, known_below=0, max_pages=6, fail_page=3)
+    assert result.boundary_page == 3 and len(result.posts) == 10
+    print("✅ PASS")
+
+
+def test_duplicates_from_shifted_pages_are_merged():
+    """抓取期间新帖子把旧帖子挤到下一页时，重复的帖子只保留一次"""
+    pages = make_forum(30)
+    pages[1] = pages[0][-2:] + pages[1][:-2]
+    result, _, _ = run_crawl(pages, known_below=20)
+    ids = [post['id'] for post in result.posts]
+    assert len(ids) == len(set(ids))
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_first_page_boundary_needs_no_crawl()
+    test_crawl_stops_at_known_boundary_in_order()
+    test_page_budget_and_failures()
+    test_duplicates_from_shifted_pages_are_merged()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+测试并发分发：群之间并发、群内顺序、令牌桶限速和失败统计
+"""
+
+import asyncio
+import time
+
+from unikorn.dispatch import FanOutDispatcher, TokenBucket
+from unikorn.notifications import Notification
+
+
+def make_plan(groups, messages):
+    return {group: [Notification(f"{group}-{i}", []) for i in range(messages)] for group in groups}
+
+
+def test_concurrent_groups_keep_order():
+    """总耗时不随群数线性增长，同一个群的消息按顺序发送"""
+    async def run():
+        sent = []
+
+        async def send(group_id, notification):
+            await asyncio.sleep(0.05)
+            sent.append(notification.text)
+
+        dispatcher = FanOutDispatcher(send, concurrency=10, group_rate=0, account_rate=0)
+        started = time.perf_counter()
+        results = await dispatcher.dispatch(make_plan([str(g) for g in range(10)], 2))
+        elapsed = time.perf_counter() - started
+        print(f"10 个群各 2 条消息，用时 {elapsed:.2f} 秒")
+        assert len(results) == 20 and all(result.ok for result in results)
+        assert elapsed < 0.5
+        for group in range(10):
+            assert sent.index(f"{group}-0") < sent.index(f"{group}-1")
+        assert dispatcher.latency_stats()['count'] == 20
+
+    asyncio.run(run())
+    print("✅ PASS")
+
+
+def test_semaphore_limits_concurrency():
+    """同时进行的发送数不超过并发上限"""
+    async def run():
+        active = 0
+        peak = 0
+
+        async def send(group_id, notification):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+
+        dispatcher = FanOutDispatcher(send, concurrency=3, group_rate=0, account_rate=0)
+        await dispatcher.dispatch(make_plan([str(g) for g in range(8)], 1))
+        print(f"最大并发 {peak}")
+        assert peak == 3
+
+    asyncio.run(run())
+    print("✅ PASS")
+
+
+def test_token_buckets_and_failures():
+    """群令牌桶用尽后等待补充；失败的发送单独记录"""
+    async def run():
+        async def send(group_id, notification):
+            if group_id == "bad":
+                raise RuntimeError("发送失败")
+
+        dispatcher = FanOutDispatcher(send, group_rate=20, group_burst=2, account_rate=0)
+        results = await dispatcher.dispatch(make_plan(["good", "bad"], 4))
+        waits = [round(result.waited, 2) for result in results if result.group_id == "good"]
+        print(f"good 群各消息等待: {waits}")
+        assert waits[:2] == [0, 0]
+        assert waits[2] >= 0.04 and waits[3] >= 0.04
+        assert dispatcher.sent == 4 and dispatcher.failed == 4
+        assert all(isinstance(result.error, RuntimeError) for result in results if result.group_id == "bad")
+
+        # 账号令牌桶在所有群之间共享
+        bucket = TokenBucket(rate=10, capacity=1)
+        waits = [await bucket.acquire() for _ in range(3)]
+        assert waits[0] == 0 and waits[1] > 0.05
+
+    asyncio.run(run())
+    print("✅ PASS")
+
+
+def test_hooks_run_per_message():
+    """before_send 在取得令牌后逐条调用，失败时不发送；on_result 在每条消息完成时调用"""
+    async def run():
+        events = []
+
+        async def send(group_id, notification):
+            events.append(('send', notification.text))
+
+        async def before_send(group_id, notification):
+            events.append(('before', notification.text))
+            if notification.text == "b-1":
+                raise RuntimeError("保存失败")
+
+        def on_result(result):
+            events.append(('result', result.notification.text, result.ok))
+
+        dispatcher = FanOutDispatcher(send, group_rate=20, group_burst=1, account_rate=0)
+        results = await dispatcher.dispatch(make_plan(["a", "b"], 2), before_send, on_result)
+        print(f"事件顺序: {events}")
+        assert ('send', "b-1") not in events
+        assert not next(result for result in results if result.notification.text == "b-1").ok
+        for text in ("a-0", "a-1", "b-0"):
+            assert events.index(('before', text)) < events.index(('send', text)) < \
+                events.index(('result', text, True))
+        # 群令牌桶只有一个令牌，第二条消息在等待令牌之后才标记
+        assert events.index(('result', "a-0", True)) < events.index(('before', "a-1"))
+
+    asyncio.run(run())
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_concurrent_groups_keep_order()
+    test_semaphore_limits_concurrency()
+    test_token_buckets_and_failures()
+    test_hooks_run_per_message()
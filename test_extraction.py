@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+测试基于DOM的帖子提取
+"""
+
+import os
+
+from bs4 import BeautifulSoup
+
+from unikorn.extraction import (
+    CONTAINER_RULES, detect_spa, extract_forum_posts, find_post_containers, slice_posts_region,
+)
+
+SAMPLE_PAGE = os.path.join(os.path.dirname(__file__), 'samples', 'forum_page.html')
+
+OVERLAP_PAGE = """
+<ul class="topic-list">
+  <li id="post-1" class="topic-item" data-post-id="1"><a href="/forum/post/1">第一个帖子标题</a></li>
+  <li id="post-2" class="topic-item" data-post-id="2"><a href="/forum/post/2">第二个帖子标题</a></li>
+  <li class="nav-item"><a href="/">首页</a></li>
+  <li class="topic-btn"><a href="/new">我要发帖</a></li>
+</ul>
+"""
+
+
+def legacy_find_post_containers(soup, limit=10):
+    """原 main.py 中逐条执行选择器的实现"""
+    containers = []
+    for rule in CONTAINER_RULES:
+        elements = soup.select(rule.selector)
+        if elements:
+            containers.extend(elements)
+            if len(containers) >= limit:
+                break
+    return containers
+
+
+def test_single_pass_matches_selectors():
+    """测试单次遍历与逐条选择器的结果一致"""
+    print("=== 测试单次遍历容器识别 ===\n")
+
+    with open(SAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        pages = {'forum_page.html': f.read(), 'overlap': OVERLAP_PAGE}
+
+    for name, html in pages.items():
+        soup = BeautifulSoup(html, 'html.parser')
+        containers, hits = find_post_containers(soup)
+        legacy = legacy_find_post_containers(soup)
+
+        # 结果去重且保持文档顺序
+        order = {id(element): i for i, element in enumerate(soup.find_all(True))}
+        expected = sorted({id(element): element for element in legacy}.values(), key=lambda e: order[id(e)])
+        print(f"{name}: 选择器结果 {len(legacy)} 个（含重复），单次遍历 {len(containers)} 个")
+        assert [id(e) for e in containers] == [id(e) for e in expected]
+
+        for rule in CONTAINER_RULES:
+            assert hits[rule.selector] == len(soup.select(rule.selector)), rule.selector
+
+    print("✅ PASS 单次遍历结果一致")
+
+
+def test_slice_posts_region():
+    """测试从原始HTML截取帖子列表区域"""
+    print("\n=== 测试帖子区域截取 ===\n")
+
+    with open(SAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    region = slice_posts_region(html)
+    print(f"整页 {len(html)} 字符，帖子区域 {len(region)} 字符")
+    assert region.startswith('<div class="posts-list">')
+    assert '__NUXT_DATA__' not in region and '<style>' not in region
+
+    # 局部解析与整页解析得到相同的帖子容器
+    full_containers, _ = find_post_containers(BeautifulSoup(html, 'html.parser'))
+    region_containers, _ = find_post_containers(BeautifulSoup(region, 'html.parser'))
+    assert [c.get_text(strip=True) for c in full_containers] == [c.get_text(strip=True) for c in region_containers]
+
+    # 嵌套的同名标签能正确配对，多个区域都会被截取
+    nested = ('<main><div class="posts-list"><div><div>帖子</div></div><br/></div>'
+              '<p>广告</p><ul class=\'topic-list\'><li>话题</li></ul></main>')
+    assert slice_posts_region(nested) == ('<div class="posts-list"><div><div>帖子</div></div><br/></div>\n'
+                                          "<ul class='topic-list'><li>话题</li></ul>")
+    assert slice_posts_region('<div class="content"><a href="/forum/post/1">帖子</a></div>') is None
+
+    # 调试模式下统计实际解析得到的DOM元素数和内存峰值
+    stats = extract_forum_posts(html, {'extraction_mode': 'dom', 'html_parser': 'html.parser',
+                                       'debug_mode': True})['stats']['partial_parse']
+    print(f"DOM节点 {stats['region_nodes']}/{stats['full_nodes']}，"
+          f"内存峰值 {stats['region_bytes']}/{stats['full_bytes']} 字节")
+    assert stats['region_nodes'] == len(BeautifulSoup(region, 'html.parser').find_all(True))
+    assert stats['full_nodes'] == len(BeautifulSoup(html, 'html.parser').find_all(True))
+    assert 0 < stats['region_bytes'] < stats['full_bytes']
+    print("✅ PASS 帖子区域截取")
+
+
+def test_detect_spa():
+    """测试在原始HTML上检测SPA框架，并据此选择提取方式"""
+    print("\n=== 测试SPA检测 ===\n")
+
+    with open(SAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    cases = [
+        (html, 'nuxt'),
+        ('<div id="app" data-v-app>Vue</div><script src="/nuxt.js"></script>', 'nuxt'),
+        ('<div data-reactroot=""></div><script>Vue</script>', 'react'),
+        ('<html NG-APP="forum"></html>', 'angular'),
+        ('<html><body><a href="/forum/post/1">帖子</a></body></html>', ''),
+    ]
+    for page, expected in cases:
+        framework = detect_spa(page)
+        print(f"{'✅ PASS' if framework == expected else '❌ FAIL'} {page[:40]!r} -> {framework!r}")
+        assert framework == expected
+
+    # 已知不是 Nuxt 页面时直接走DOM提取
+    result = extract_forum_posts(html, spa_framework='react')
+    assert result['stats']['source'] == 'containers' and 'nuxt_payload' not in result['stats']
+    result = extract_forum_posts(html, spa_framework='nuxt')
+    assert result['stats']['source'] == 'nuxt'
+
+
+if __name__ == "__main__":
+    test_single_pass_matches_selectors()
+    test_slice_posts_region()
+    test_detect_spa()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+测试预编译过滤引擎与原有逐条正则实现的结果一致
+
+原实现中英文按钮关键词按子串匹配，会把 "Looking" 当作包含 "ok" 的按钮，
+参照实现已改为整词匹配。
+"""
+
+import re
+
+from unikorn.filters import BUTTON_EXACT_PATTERNS, DEFAULT_BUTTON_KEYWORDS, STRICT_EXCLUSION_PATTERNS, FilterEngine
+
+EXCLUDED_KEYWORDS = ["发帖", "回复", "登录", "注册", "搜索", "Hackathon"]
+
+TEST_TITLES = [
+    "我要发帖", "发帖", "登录", "注册", "上一页", "下一页", "首页", "搜索", "排序方式：",
+    "第 1 页", "共 1 页", "页码 3", "更多", "详情", "1", "123", "", "   ", "a", "NEW POST", "Home",
+    "关于课程选择的建议", "新生入学指南", "学校生活分享", "讨论：最好的学习方法", "寻找室友",
+    "How to improve English", "Study group formation", "论坛文章", "关于发帖规则的讨论",
+    "如何在论坛发帖？", "Looking for a teammate for HACKATHON", "菜单设置", "关于我们",
+    "期末复习资料整理（回复可见）", "Please REPLY here",
+    "Looking for a teammate", "Edited lecture notes", "OK!", "这个可以ok吗",
+]
+
+
+def legacy_is_button_text(text, excluded_keywords):
+    """原 main.py 中的实现"""
+    if not text or len(text.strip()) < 2:
+        return True
+    text_clean = text.strip()
+    for pattern in BUTTON_EXACT_PATTERNS:
+        if re.search(f'^{pattern}$', text_clean, re.IGNORECASE):
+            return True
+    text_lower = text_clean.lower()
+    for keyword in DEFAULT_BUTTON_KEYWORDS:
+        if keyword.isascii():
+            if re.search(rf'(?<![a-z]){keyword}(?![a-z])', text_lower):
+                return True
+        elif keyword in text_lower:
+            return True
+    for keyword in excluded_keywords:
+        if keyword.lower() in text_lower:
+            return True
+    if re.match(r'^[\d\s\-_\+\.]+$|^.$', text_clean):
+        return True
+    return False
+
+
+def legacy_is_excluded_content(text, excluded_keywords):
+    """原 main.py 中的实现"""
+    if not text:
+        return True
+    text_clean = text.strip()
+    for pattern in STRICT_EXCLUSION_PATTERNS:
+        if re.search(pattern, text_clean, re.IGNORECASE):
+            return True
+    text_lower = text_clean.lower()
+    return any(keyword.lower() in text_lower for keyword in excluded_keywords)
+
+
+def test_filter_engine_matches_legacy():
+    """测试过滤引擎与原实现逐条一致"""
+    print("=== 测试预编译过滤引擎 ===\n")
+
+    engine = FilterEngine(EXCLUDED_KEYWORDS)
+    verdicts = engine.classify(TEST_TITLES)
+
+    mismatches = 0
+    for title, verdict in zip(TEST_TITLES, verdicts):
+        expected = (legacy_is_button_text(title, EXCLUDED_KEYWORDS),
+                    legacy_is_excluded_content(title, EXCLUDED_KEYWORDS))
+        actual = (verdict.is_button, verdict.is_excluded)
+        status = "✅ PASS" if actual == expected else "❌ FAIL"
+        if actual != expected:
+            mismatches += 1
+        print(f"{status} '{title}' -> 按钮:{verdict.is_button}, 排除:{verdict.is_excluded}")
+
+    print(f"\n测试结果: {len(TEST_TITLES) - mismatches}/{len(TEST_TITLES)} 通过")
+    assert mismatches == 0
+
+    # 没有用户关键词时只使用默认规则
+    empty_engine = FilterEngine()
+    assert not empty_engine.is_excluded_content("关于发帖规则的讨论")
+    assert empty_engine.is_button_text("回复")
+    assert not empty_engine.is_button_text("Looking for a teammate for hackathon")
+
+
+if __name__ == "__main__":
+    test_filter_engine_matches_legacy()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+测试内存映射哈希存储：成员查询、增量日志、合并淘汰和JSON导入
+"""
+
+import os
+import tempfile
+
+from unikorn.hash_store import HashSeenStore, post_hash
+from unikorn.seen_store import SeenStore
+
+POST = "https://unikorn.axfff.com/forum/post/{}"
+DAY = 86400
+
+
+def make_store(directory, **kwargs):
+    return HashSeenStore(os.path.join(directory, 'posts.hashes'), **kwargs)
+
+
+def test_membership_and_merge():
+    """合并前后成员查询结果一致，主文件大小为每个帖子12字节"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = make_store(directory, max_size=0, merge_threshold=100)
+        for i in range(250):
+            store.add(POST.format(i), now=i)
+            store.flush()
+        print(f"合并 {store.merges} 次，增量 {store.pending} 条，共 {len(store)} 个帖子")
+        assert store.merges == 2
+        assert len(store) == 250
+        assert all(POST.format(i) in store for i in range(250))
+        assert POST.format(250) not in store
+        # 规范化后相同的ID视为同一个帖子
+        assert POST.format(7) + '/' in store
+        assert post_hash(POST.format(7) + '#reply') == post_hash(POST.format(7))
+
+        store.merge()
+        assert os.path.getsize(store.path) == 16 + 250 * 12
+        assert not os.path.exists(store.delta_path)
+        assert store.first_seen(POST.format(42)) == 42
+        store.close()
+    print("✅ PASS")
+
+
+def test_delta_log_survives_restart():
+    """未合并的新帖子保存在增量日志中，重启后仍然可见"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = make_store(directory, merge_threshold=1000)
+        store.add(POST.format(1), now=10)
+        store.merge()
+        store.add(POST.format(2), now=20)
+        assert store.flush() == 1
+        assert os.path.getsize(store.delta_path) == 12
+        # 模拟写入中断留下的不完整记录
+        with open(store.delta_path, 'ab') as f:
+            f.write(b'\x01\x02\x03')
+        store._unmap()
+
+        reopened = make_store(directory, merge_threshold=1000)
+        assert POST.format(1) in reopened
+        assert POST.format(2) in reopened
+        assert reopened.pending == 1
+        reopened.close()
+    print("✅ PASS")
+
+
+def test_eviction_matches_memory_store():
+    """合并时的淘汰结果与内存中的 SeenStore 一致（后者在每次添加时淘汰）"""
+    with tempfile.TemporaryDirectory() as directory:
+        for policy in ('lru', 'fifo'):
+            memory = SeenStore(max_size=3, max_age=30 * DAY, policy=policy, refresh_interval=DAY)
+            hashed = make_store(directory, max_size=3, max_age=30 * DAY, policy=policy, refresh_interval=DAY)
+            for store in (memory, hashed):
+                for i in range(3):
+                    store.add(POST.format(i), now=i * DAY)
+                store.touch(POST.format(0), now=2.5 * DAY)
+                for i in range(3, 5):
+                    store.add(POST.format(i), now=i * DAY)
+            # 在最后一次添加时合并，fifo 模式下刚出现过的帖子0两边都保留
+            memory.prune(now=4 * DAY)
+            hashed.merge(now=4 * DAY)
+            kept = [i for i in range(5) if POST.format(i) in hashed]
+            print(f"{policy}: 保留 {kept}")
+            assert kept == [i for i in range(5) if POST.format(i) in memory]
+            hashed.close()
+            os.remove(hashed.path)
+    print("✅ PASS")
+
+
+def test_json_import():
+    """主文件不存在时导入JSON数据文件"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = make_store(directory)
+        assert store.needs_json_import()
+        assert store.import_json_data({'known_posts': [POST.format(i) for i in range(5)]}, now=100) == 5
+        assert store.import_json_data({'known_posts': [POST.format(9)]}, now=100) == 0
+        assert len(store) == 5
+        assert POST.format(9) not in store
+        store.close()
+
+        # 重新打开后不再需要读取JSON数据文件；导入0条记录时同样只导入一次
+        reopened = make_store(directory)
+        assert not reopened.needs_json_import()
+        reopened.close()
+
+        empty = HashSeenStore(os.path.join(directory, 'empty.hashes'))
+        assert empty.import_json_data({'known_posts': []}, now=100) == 0
+        empty.close()
+        empty = HashSeenStore(os.path.join(directory, 'empty.hashes'))
+        assert not empty.needs_json_import()
+        empty.close()
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_membership_and_merge()
+    test_delta_log_survives_restart()
+    test_eviction_matches_memory_store()
+    test_json_import()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+测试 Aho-Corasick 关键词索引
+"""
+
+import random
+
+from unikorn.keyword_index import KeywordIndex
+
+
+def test_keyword_index_basic():
+    """测试重叠关键词、中文和大小写"""
+    print("=== 测试关键词索引 ===\n")
+
+    index = KeywordIndex()
+    for keyword in ['he', 'she', 'his', 'hers']:
+        index.add(keyword, 1)
+    index.add('发帖', 2)
+    index.add('帖子', 4)
+    index.build()
+
+    cases = [
+        ('ushers', 1),
+        ('关于发帖规则', 2),
+        ('新帖子', 4),
+        ('发帖子', 6),   # 重叠的中文关键词都能命中
+        ('SHE 说', 1),   # 大小写无关
+        ('无关内容', 0),
+        ('', 0),
+    ]
+    for text, expected in cases:
+        tags = index.match_tags(text)
+        status = "✅ PASS" if tags == expected else "❌ FAIL"
+        print(f"{status} '{text}' -> {tags}")
+        assert tags == expected
+
+    assert '写帖子' in index
+    assert 'xyz' not in index
+    assert index.size == 6
+
+
+def test_keyword_index_matches_naive_loop():
+    """测试大量关键词时与逐个子串查找结果一致"""
+    print("\n=== 测试大量关键词 ===\n")
+
+    rng = random.Random(42)
+    alphabet = '课程讨论发帖回复校园生活abcdeXYZ'
+    keywords = {''.join(rng.choice(alphabet) for _ in range(rng.randint(2, 5))) for _ in range(2000)}
+    index = KeywordIndex.from_keywords(keywords)
+
+    mismatches = 0
+    for _ in range(500):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        expected = any(keyword.casefold() in text.casefold() for keyword in keywords)
+        if (text in index) != expected:
+            mismatches += 1
+
+    print(f"{len(keywords)} 个关键词，500 条文本，不一致: {mismatches}")
+    assert mismatches == 0
+
+
+if __name__ == "__main__":
+    test_keyword_index_basic()
+    test_keyword_index_matches_naive_loop()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+测试推送消息构造：单条模式、摘要合并与拆分、按群选择推送模式
+"""
+
+from unikorn.notifications import (
+    build_digest, build_forward, format_individual, parse_group_modes, plan_notifications,
+)
+
+POST = "https://unikorn.axfff.com/forum/post/{}"
+
+
+def make_posts(count, title="新帖子标题"):
+    return [{'id': POST.format(i), 'title': f"{title}{i}", 'url': POST.format(i)} for i in range(count)]
+
+
+def test_individual_message_matches_legacy_format():
+    """单条消息与原来的推送格式一致"""
+    post = {'title': '很长的标题' * 20, 'url': POST.format(1)}
+    message = format_individual(post, max_title_length=10)
+    assert message == f"🆕 Unikorn论坛新帖子\n\n📝 {'很长的标题' * 2}...\n🔗 {POST.format(1)}"
+    print("✅ PASS")
+
+
+def test_digest_split_by_count_and_length():
+    """摘要按帖子数和长度拆分，每个帖子只出现一次"""
+    posts = make_posts(7)
+    notifications = build_digest(posts, max_posts=3, max_messages=5)
+    print([len(n.posts) for n in notifications])
+    assert [len(n.posts) for n in notifications] == [3, 3, 1]
+    assert notifications[0].text.startswith("🆕 Unikorn论坛新帖子（共 7 个） 1/3")
+    assert sum((n.posts for n in notifications), []) == posts
+
+    long_posts = make_posts(4, title="标题" * 30)
+    notifications = build_digest(long_posts, max_posts=10, max_length=150, max_messages=5)
+    assert all(len(n.text) <= 200 for n in notifications)
+    assert len(notifications) == 4
+    print("✅ PASS")
+
+
+def test_digest_message_cap():
+    """超出消息条数上限的帖子只注明数量"""
+    posts = make_posts(25)
+    notifications = build_digest(posts, max_posts=10, max_messages=2)
+    assert len(notifications) == 2
+    assert len(notifications[-1].posts) == 15
+    assert "还有 5 个新帖子" in notifications[-1].text
+    assert POST.format(24) not in notifications[-1].text
+    print("✅ PASS")
+
+
+def test_per_group_modes():
+    """按群配置覆盖默认推送模式，格式错误的配置被忽略"""
+    modes = parse_group_modes(["111:digest", " 222 : Individual ", "333:unknown", "bad"])
+    assert modes == {'111': 'digest', '222': 'individual'}
+
+    posts = make_posts(3)
+    plan = plan_notifications(posts, ["111", "222", 444], default_mode="digest", group_modes=modes)
+    counts = {group: len(messages) for group, messages in plan.items()}
+    print(f"每个群的消息数: {counts}")
+    assert counts == {'111': 1, '222': 3, 444: 1}
+    print("✅ PASS")
+
+
+def test_forward_for_bursts():
+    """新帖子达到阈值时改为合并转发，每个帖子一个节点，退回的普通消息包含全部帖子"""
+    posts = make_posts(12)
+    forward = build_forward(posts, max_nodes=5)
+    assert [len(n.nodes) for n in forward] == [5, 5, 2]
+    assert forward[0].nodes[0] == format_individual(posts[0])
+    assert all(POST.format(i) in forward[0].text for i in range(5))
+    assert sum((n.posts for n in forward), []) == posts
+
+    plan = plan_notifications(posts, ["111", "222"], group_modes={'222': 'digest'},
+                              forward_threshold=10, forward_max_nodes=50)
+    assert all(len(messages) == 1 and messages[0].is_forward for messages in plan.values())
+
+    plan = plan_notifications(posts[:3], ["111"], forward_threshold=10)
+    assert len(plan["111"]) == 3 and not plan["111"][0].is_forward
+    plan = plan_notifications(posts, ["111"], forward_threshold=0)
+    assert len(plan["111"]) == 12
+    print("✅ PASS")
+
+
+def test_source_forum_name_and_url():
+    """额外来源的消息使用来源自己的名称和论坛链接"""
+    posts = make_posts(15)
+    assert format_individual(posts[0], forum_name="树洞").startswith("🆕 树洞新帖子")
+    digest = build_digest(posts, max_posts=10, max_messages=1, forum_name="树洞",
+                          forum_url="https://example.com/bbs")
+    assert digest[0].text.startswith("🆕 树洞新帖子（共 15 个）")
+    assert "https://example.com/bbs" in digest[-1].text
+    assert "Unikorn" not in digest[-1].text
+
+    plan = plan_notifications(posts, ["111"], forward_threshold=10, forum_name="树洞")
+    assert plan["111"][0].nodes[0].startswith("🆕 树洞新帖子")
+    assert plan["111"][0].text.startswith("🆕 树洞新帖子")
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_individual_message_matches_legacy_format()
+    test_digest_split_by_count_and_length()
+    test_digest_message_cap()
+    test_per_group_modes()
+    test_forward_for_bursts()
+    test_source_forum_name_and_url()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+测试 __NUXT_DATA__ 负载解码和帖子提取
+"""
+
+import json
+import math
+import os
+
+from unikorn.nuxt_payload import decode_devalue, extract_posts, posts_from_data
+
+SAMPLE_PAGE = os.path.join(os.path.dirname(__file__), 'samples', 'forum_page.html')
+
+
+def test_decode_devalue():
+    """测试devalue格式的还原"""
+    print("=== 测试devalue解码 ===\n")
+
+    payload = [
+        {"data": 1, "state": 5, "flags": 8},
+        ["ShallowReactive", 2],
+        {"posts": 3},
+        [4],
+        {"id": 10, "title": 6, "created_at": 7},
+        {"token": 6},
+        "课程讨论",
+        ["Date", "2026-10-16T08:00:00.000Z"],
+        ["Set", 9, -1],
+        True,
+        12,
+    ]
+
+    data = decode_devalue(payload)
+    post = data["data"]["posts"][0]
+    print(f"还原后的帖子: {post}")
+    assert post == {"id": 12, "title": "课程讨论", "created_at": "2026-10-16T08:00:00.000Z"}
+    assert data["state"]["token"] == "课程讨论"
+    assert data["flags"] == [True, None]
+
+    # 特殊数值
+    values = decode_devalue([[1, -3, -4, -6], 7])
+    assert values[0] == 7 and math.isnan(values[1]) and values[2] == float('inf')
+
+    # 循环引用
+    cyclic = decode_devalue([{"self": 0, "name": 1}, "loop"])
+    assert cyclic["self"] is cyclic
+    print("✅ PASS devalue解码")
+
+
+def test_extract_posts_from_page():
+    """测试从录制页面提取帖子"""
+    print("\n=== 测试从页面负载提取帖子 ===\n")
+
+    with open(SAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    posts = extract_posts(html)
+    print(f"提取到 {len(posts)} 个帖子")
+    for post in posts[:3]:
+        print(f"  {post['post_id']} {post['title']} - {post['author']} @ {post.get('timestamp')}")
+
+    assert len(posts) == 30
+    assert posts[0]['title'] == '关于课程选择的一些建议'
+    assert posts[0]['author'] == 'alice'
+    assert posts[0]['id'] == posts[0]['url'] == 'https://unikorn.axfff.com/forum/post/1200'
+
+    # 没有负载时返回 None，由调用方回退到DOM提取
+    assert extract_posts('<html><body><a href="/forum/post/1">标题</a></body></html>') is None
+    # 负载损坏时同样回退
+    assert extract_posts('<script id="__NUXT_DATA__" type="application/json">[{</script>') is None
+
+    # 取最长的帖子列表，并使用自定义链接模板
+    data = {"pinned": [{"id": 1, "title": "置顶"}],
+            "list": [{"postId": 2, "subject": "A", "user": {"nickname": "n"}},
+                     {"postId": 3, "subject": "B", "user": "m"}]}
+    posts = posts_from_data(data, "https://example.com/t/{id}")
+    assert [p['url'] for p in posts] == ["https://example.com/t/2", "https://example.com/t/3"]
+    assert [p['author'] for p in posts] == ["n", "m"]
+    print("✅ PASS 负载帖子提取")
+
+
+def test_payload_ids_match_dom_links():
+    """测试负载帖子的ID与DOM提取的链接一致"""
+    print("\n=== 测试负载帖子ID与页面链接一致 ===\n")
+
+    # 记录自带的相对链接按 base_url 补全，不使用模板
+    data = {"list": [{"id": 7, "title": "A", "href": "/bbs/thread/7"},
+                     {"id": 8, "title": "B"}]}
+    links = {"8": "https://example.com/bbs/thread/8"}
+    posts = posts_from_data(data, "https://example.com/post/{id}", "https://example.com/bbs/", links)
+    print(f"帖子ID: {[p['id'] for p in posts]}")
+    assert [p['id'] for p in posts] == ["https://example.com/bbs/thread/7", "https://example.com/bbs/thread/8"]
+
+    # 模板与页面链接不一致时，以页面中相同编号的链接为准
+    payload = json.dumps([{"posts": 1}, [2], {"id": 3, "title": 4}, 42, "标题"])
+    html = ('<a class="title" href="/thread/42?from=list">标题</a>'
+            f'<script id="__NUXT_DATA__" type="application/json">{payload}</script>')
+    posts = extract_posts(html, "https://unikorn.axfff.com/forum/post/{id}")
+    assert posts[0]['id'] == "https://unikorn.axfff.com/thread/42?from=list"
+    assert posts[0]['post_id'] == "42"
+    print("✅ PASS 负载帖子ID一致")
+
+
+if __name__ == "__main__":
+    test_decode_devalue()
+    test_extract_posts_from_page()
+    test_payload_ids_match_dom_links()
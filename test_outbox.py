@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+测试推送发件箱：去重入队、指数退避重试、放弃、重启恢复
+"""
+
+import json
+
+from unikorn.outbox import Outbox
+
+POST = "https://unikorn.axfff.com/forum/post/{}"
+
+
+def make_posts(count):
+    return [{'id': POST.format(i), 'title': f'新帖子标题{i}', 'url': POST.format(i)} for i in range(count)]
+
+
+def test_enqueue_is_idempotent():
+    """同一个 (帖子, 群) 只入队一次，送达后也不会再次入队"""
+    outbox = Outbox()
+    posts = make_posts(2)
+    assert outbox.enqueue(posts, ["1", 2], now=0) == 4
+    assert outbox.enqueue(posts, ["1", "2"], now=0) == 0
+
+    due = outbox.due(now=0)
+    outbox.begin(due)
+    outbox.succeeded([(POST.format(0), "1")], now=1)
+    assert outbox.is_delivered(POST.format(0), 1)
+    assert outbox.enqueue(posts[:1], ["1"], now=2) == 0
+    assert len(outbox) == 3
+    print("✅ PASS")
+
+
+def test_backoff_with_jitter_and_drop():
+    """失败后按指数退避重试，超过最大次数后放弃"""
+    outbox = Outbox(max_attempts=3, base_delay=10, max_delay=25, rng=lambda: 1.0)
+    outbox.enqueue(make_posts(1), ["1"], now=0)
+    key = (POST.format(0), "1")
+
+    delays = []
+    now = 0
+    for _ in range(2):
+        due = outbox.due(now)
+        assert len(due) == 1
+        outbox.begin(due)
+        assert outbox.failed([key], "超时", now=now) == []
+        delays.append(outbox.next_due() - now)
+        assert outbox.due(now) == []
+        now = outbox.next_due()
+    print(f"重试间隔: {delays}")
+    assert delays == [10, 20]
+
+    outbox.begin(outbox.due(now))
+    dropped = outbox.failed([key], "超时", now=now)
+    assert len(dropped) == 1 and dropped[0]['attempts'] == 3
+    assert len(outbox) == 0
+
+    # 抖动使间隔落在上限的一半到全部之间，且不超过最大间隔
+    jittered = Outbox(base_delay=10, max_delay=25, rng=lambda: 0.0)
+    assert jittered.retry_delay(1) == 5
+    assert jittered.retry_delay(10) == 12.5
+    print("✅ PASS")
+
+
+def test_restart_recovery():
+    """重启后继续推送待发送记录，发送中的记录按已送达处理"""
+    outbox = Outbox()
+    outbox.enqueue(make_posts(3), ["1"], now=0)
+    due = outbox.due(now=0)
+    outbox.begin(due[:1])
+    data = json.loads(json.dumps(outbox.to_json_data()))
+
+    restored = Outbox()
+    uncertain = restored.load_json_data(data, now=5)
+    print(f"不确定是否送达的记录: {uncertain}，待推送: {len(restored)}")
+    assert uncertain == 1
+    assert restored.is_delivered(POST.format(0), "1")
+    assert [entry['post']['id'] for entry in restored.due(now=5)] == [POST.format(1), POST.format(2)]
+    assert restored.dirty
+    print("✅ PASS")
+
+
+def test_abort_restores_pending():
+    """标记为发送中后没能开始发送的记录恢复为待发送，重启后继续推送"""
+    outbox = Outbox()
+    outbox.enqueue(make_posts(2), ["1"], now=0)
+    due = outbox.due(now=0)
+    outbox.begin(due)
+    outbox.abort([(POST.format(1), "1")])
+    assert [entry['post']['id'] for entry in outbox.due(now=0)] == [POST.format(1)]
+    assert outbox.due(now=0)[0]['attempts'] == 0
+
+    restored = Outbox()
+    assert restored.load_json_data(json.loads(json.dumps(outbox.to_json_data())), now=5) == 1
+    assert [entry['post']['id'] for entry in restored.due(now=5)] == [POST.format(1)]
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_enqueue_is_idempotent()
+    test_backoff_with_jitter_and_drop()
+    test_restart_recovery()
+    test_abort_restores_pending()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+测试HTML解析后端的选择、回退和链接提取一致性
+"""
+
+import os
+
+from unikorn.parsers import BACKENDS, available_backends, get_backend
+
+SAMPLE_PAGE = os.path.join(os.path.dirname(__file__), 'samples', 'forum_page.html')
+
+
+def test_parser_backends():
+    """测试各解析后端提取到的链接一致"""
+    print("=== 测试HTML解析后端 ===\n")
+    print(f"可用后端: {available_backends()}")
+
+    # 未知后端回退到可用的DOM后端
+    fallback = get_backend("no-such-parser")
+    print(f"未知后端回退到: {fallback.name}")
+    assert fallback.builds_tree
+
+    # 需要DOM树时不会返回轻量链接扫描
+    tree_backend = get_backend("linkscan", require_tree=True)
+    print(f"需要DOM树时 linkscan 回退到: {tree_backend.name}")
+    assert tree_backend.builds_tree
+
+    with open(SAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    results = {}
+    for name in available_backends():
+        backend = BACKENDS[name]
+        document = backend.parse(html)
+        results[name] = [(link.get('href'), link.get_text(strip=True)) for link in backend.links(document)]
+        print(f"{name}: {len(results[name])} 个链接")
+
+    reference = results["html.parser"]
+    for name, links in results.items():
+        status = "✅ PASS" if links == reference else "❌ FAIL"
+        print(f"{status} {name} 与 html.parser 结果一致")
+        assert links == reference
+
+    # 链接扫描后端提供与bs4一致的class属性格式
+    link = get_backend("linkscan").parse('<a class="post-title big" href="/forum/post/1">标题 &amp; 内容</a>')[0]
+    assert link.get('class') == ['post-title', 'big']
+    assert link.get_text() == '标题 & 内容'
+
+
+if __name__ == "__main__":
+    test_parser_backends()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+测试状态持久化：原子写入、合并延迟写入、失败重试和关闭时的最终写入
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+
+from unikorn.persistence import DebouncedWriter, atomic_write, atomic_write_json
+
+
+def test_atomic_write():
+    """写入成功后替换原文件，不留下临时文件；写入失败时原文件不变"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'data.json')
+        atomic_write_json(path, {'known_posts': ['帖子']})
+        atomic_write_json(path, {'known_posts': ['帖子', '新帖子']})
+        with open(path, encoding='utf-8') as f:
+            assert json.load(f) == {'known_posts': ['帖子', '新帖子']}
+
+        try:
+            atomic_write(path, 'not bytes')
+            raise AssertionError("应当写入失败")
+        except TypeError:
+            pass
+        with open(path, encoding='utf-8') as f:
+            assert json.load(f)['known_posts'] == ['帖子', '新帖子']
+        assert os.listdir(directory) == ['data.json']
+    print("✅ PASS")
+
+
+def test_debounce_and_threshold():
+    """延迟期间的改动合并为一次写入，积累量达到阈值时立即写入"""
+    async def run():
+        writes = []
+        duration = [0.01]
+
+        async def write():
+            writes.append(asyncio.get_running_loop().time())
+            await asyncio.sleep(duration[0])
+
+        writer = DebouncedWriter(write, delay=0.1, max_pending=5)
+        for _ in range(3):
+            writer.mark_dirty()
+            await asyncio.sleep(0.01)
+        assert writes == []
+        await asyncio.sleep(0.15)
+        print(f"3 次改动写入 {len(writes)} 次")
+        assert len(writes) == 1 and not writer.dirty
+
+        writer.mark_dirty(5)
+        await asyncio.sleep(0.03)
+        assert len(writes) == 2
+
+        # 写入期间的新改动会安排下一次写入
+        writer.delay = 0.02
+        duration[0] = 0.1
+        writer.mark_dirty()
+        while len(writes) < 3:
+            await asyncio.sleep(0.005)
+        writer.mark_dirty()
+        await asyncio.sleep(0.3)
+        print(f"共写入 {len(writes)} 次")
+        assert len(writes) == 4 and not writer.dirty
+        assert await writer.close(1)
+
+    asyncio.run(run())
+    print("✅ PASS")
+
+
+def test_failure_retry_and_close_deadline():
+    """写入失败时保留改动并重试；关闭时最终写入受时间限制"""
+    async def run():
+        attempts = []
+        errors = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise OSError("磁盘已满")
+
+        writer = DebouncedWriter(flaky, delay=0.02, on_error=errors.append)
+        writer.mark_dirty(2)
+        await asyncio.sleep(0.1)
+        print(f"尝试写入 {len(attempts)} 次，错误: {errors}")
+        assert len(attempts) == 2 and len(errors) == 1
+        assert not writer.dirty
+
+        async def slow():
+            await asyncio.sleep(1)
+
+        writer = DebouncedWriter(slow, delay=10)
+        writer.mark_dirty()
+        assert not await writer.close(0.05)
+        assert writer.dirty
+
+        # 没有改动时即使没有剩余时间也按时完成
+        writer = DebouncedWriter(slow, delay=10)
+        assert await writer.close(0)
+
+    asyncio.run(run())
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_atomic_write()
+    test_debounce_and_threshold()
+    test_failure_retry_and_close_deadline()
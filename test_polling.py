@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+测试自适应检查间隔：到达速度估计、上下限、按时段的历史统计和随机抖动
+"""
+
+from unikorn.polling import AdaptivePollingPolicy, hour_of_week
+
+MINUTE = 60
+HOUR = 3600
+# 某个周一 0 时（本地时间）之后的时刻
+MONDAY = 1700000000 - hour_of_week(1700000000) * HOUR - 1700000000 % HOUR
+
+
+def make_policy(**kwargs):
+    options = dict(default_interval=5 * MINUTE, min_interval=1 * MINUTE, max_interval=30 * MINUTE,
+                   target_posts=0.5, jitter=0, rng=lambda: 0.5)
+    options.update(kwargs)
+    return AdaptivePollingPolicy(**options)
+
+
+def test_default_interval_without_data():
+    """没有数据时使用配置的检查间隔"""
+    decision = make_policy().decide(MONDAY)
+    assert decision.interval == 5 * MINUTE
+    assert decision.rate is None
+    print(f"✅ PASS: {decision.reason}")
+
+
+def test_interval_follows_arrival_rate():
+    """发帖活跃时收紧间隔，冷清时放宽，且不超出上下限"""
+    policy = make_policy()
+    now = MONDAY + 10 * HOUR
+    policy.observe(0, now)
+    for _ in range(12):
+        now += 5 * MINUTE
+        policy.observe(1, now)
+    busy = policy.decide(now)
+    print(f"活跃: {busy.base_interval / MINUTE:.1f} 分钟 - {busy.reason}")
+    assert busy.base_interval < 5 * MINUTE
+
+    for _ in range(48):
+        now += 5 * MINUTE
+        policy.observe(0, now)
+    quiet = policy.decide(now)
+    print(f"冷清: {quiet.base_interval / MINUTE:.1f} 分钟 - {quiet.reason}")
+    assert quiet.base_interval > busy.base_interval
+    assert MINUTE <= quiet.base_interval <= 30 * MINUTE
+
+    flood = make_policy()
+    flood.observe(0, now)
+    flood.observe(100, now + MINUTE)
+    assert flood.decide(now + MINUTE).base_interval == MINUTE
+    print("✅ PASS")
+
+
+def test_hour_of_week_history():
+    """历史上活跃的时段即使近期没有新帖子也会检查得更频繁"""
+    policy = make_policy(half_life=600)
+    now = MONDAY
+    policy.observe(0, now)
+    for week in range(2):
+        start = MONDAY + week * 7 * 24 * HOUR
+        for step in range(24 * 12):
+            now = start + (step + 1) * 5 * MINUTE
+            policy.observe(1 if 9 <= (step * 5 // 60) < 10 else 0, now)
+    busy_hour = policy.decide(MONDAY + 14 * 24 * HOUR + 9 * HOUR + 30 * MINUTE)
+    night = policy.decide(MONDAY + 14 * 24 * HOUR + 4 * HOUR)
+    print(f"9 时: {busy_hour.base_interval / MINUTE:.1f} 分钟，4 时: {night.base_interval / MINUTE:.1f} 分钟")
+    assert busy_hour.base_interval < night.base_interval
+    assert "历史" in busy_hour.reason
+
+    restored = make_policy()
+    restored.load_json_data(policy.to_json_data())
+    assert restored.counts == policy.counts and restored.ewma_rate == policy.ewma_rate
+    print("✅ PASS")
+
+
+def test_jitter_bounds():
+    """随机抖动不超过配置的比例"""
+    low = make_policy(jitter=0.2, rng=lambda: 0.0).decide(MONDAY)
+    high = make_policy(jitter=0.2, rng=lambda: 0.999999).decide(MONDAY)
+    assert abs(low.interval - 4 * MINUTE) < 1e-6
+    assert 5 * MINUTE < high.interval <= 6 * MINUTE
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_default_interval_without_data()
+    test_interval_follows_arrival_rate()
+    test_hour_of_week_history()
+    test_jitter_bounds()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+测试定时检查的调度：截止时间对齐不漂移、跳过错过的检查、手动触发重置截止时间
+"""
+
+import asyncio
+
+from unikorn.scheduler import DeadlineScheduler, Tick
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadlines_do_not_drift():
+    """检查耗时不会推迟下一个截止时间"""
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(60, clock=clock)
+    tick = Tick(1, 1000.0, 1000.0, 0.0, False)
+    clock.now = 1012.5
+    assert scheduler.finish(tick) == 0
+    assert scheduler.deadline == 1060.0
+    assert scheduler.time_until_next() == 47.5
+    print("✅ PASS")
+
+
+def test_missed_deadlines_are_skipped():
+    """检查耗时超过间隔时跳过错过的截止时间，仍与原来的时间对齐"""
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(60, clock=clock)
+    clock.now = 1000.0 + 150
+    skipped = scheduler.finish(Tick(1, 1000.0, 1000.0, 0.0, False))
+    print(f"跳过 {skipped} 次，下一个截止时间 {scheduler.deadline}")
+    assert skipped == 2
+    assert scheduler.deadline == 1180.0
+    assert scheduler.skipped == 2
+    print("✅ PASS")
+
+
+def test_trigger_resets_deadline_and_records_lateness():
+    """手动触发立即检查，并从触发时刻重新计算截止时间；定时触发记录延迟"""
+    async def run():
+        loop = asyncio.get_running_loop()
+        scheduler = DeadlineScheduler(0.2)
+        checks = []
+
+        async def loop_task():
+            while True:
+                tick = await scheduler.wait()
+                checks.append(tick)
+                await asyncio.sleep(0.01)
+                scheduler.finish(tick, result=tick.number)
+
+        task = asyncio.create_task(loop_task())
+        await asyncio.sleep(0.05)
+        assert len(checks) == 1 and not checks[0].triggered
+
+        triggered_at = loop.time()
+        result = await scheduler.trigger()
+        assert result == 2 and checks[1].triggered
+        assert abs(scheduler.deadline - (checks[1].started + 0.2)) < 1e-9
+        assert loop.time() - triggered_at < 0.1
+
+        await asyncio.sleep(0.3)
+        task.cancel()
+        scheduler.close()
+        scheduled = [tick for tick in checks if not tick.triggered]
+        stats = scheduler.lateness_stats()
+        print(f"共检查 {len(checks)} 次，定时检查延迟: {stats}")
+        assert len(checks) == 3
+        assert abs(checks[2].deadline - (checks[1].started + 0.2)) < 1e-9
+        assert stats['count'] == len(scheduled)
+        assert all(tick.lateness >= 0 for tick in scheduled)
+
+    asyncio.run(run())
+    print("✅ PASS")
+
+
+def test_sources_share_one_scheduler():
+    """多个来源按各自的间隔触发，同一个来源的检查不会重叠"""
+    async def run():
+        scheduler = DeadlineScheduler(0.1, source="main")
+        scheduler.add("slow", 0.25, delay=0.02)
+        checks = {"main": 0, "slow": 0}
+        running = set()
+
+        async def check(tick):
+            assert tick.source not in running
+            running.add(tick.source)
+            checks[tick.source] += 1
+            await asyncio.sleep(0.03)
+            running.discard(tick.source)
+            scheduler.finish(tick)
+
+        async def loop_task():
+            tasks = []
+            while True:
+                tick = await scheduler.wait()
+                tasks.append(asyncio.create_task(check(tick)))
+
+        task = asyncio.create_task(loop_task())
+        await asyncio.sleep(0.55)
+        task.cancel()
+        scheduler.close()
+        print(f"各来源的检查次数: {checks}")
+        assert 5 <= checks["main"] <= 7
+        assert 2 <= checks["slow"] <= 3
+
+    asyncio.run(run())
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_deadlines_do_not_drift()
+    test_missed_deadlines_are_skipped()
+    test_trigger_resets_deadline_and_records_lateness()
+    test_sources_share_one_scheduler()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+测试有界的已知帖子存储：数量和时间淘汰、LRU刷新、旧数据文件迁移
+"""
+
+import json
+
+from unikorn.seen_store import SeenStore
+
+POST = "https://unikorn.axfff.com/forum/post/{}"
+DAY = 86400
+
+
+def test_size_eviction_fifo():
+    """fifo 模式按发现顺序淘汰，再次出现不会刷新"""
+    store = SeenStore(max_size=3, policy="fifo")
+    for i in range(3):
+        store.add(POST.format(i), now=i * DAY)
+    store.touch(POST.format(0), now=10 * DAY)
+    store.add(POST.format(3), now=11 * DAY)
+    print(f"fifo 保留: {list(store)}")
+    assert POST.format(0) not in store
+    assert list(store) == [POST.format(i) for i in (1, 2, 3)]
+    assert store.evicted == 1
+    print("✅ PASS")
+
+
+def test_fifo_keeps_posts_on_page():
+    """fifo 模式下仍在页面上的置顶帖不会因过期或超出上限被淘汰"""
+    pinned = POST.format(0)
+    store = SeenStore(max_size=3, max_age=30 * DAY, policy="fifo")
+    store.add(pinned, now=0)
+    for day in range(1, 41):
+        store.touch(pinned, now=day * DAY)
+        store.add(POST.format(day), now=day * DAY)
+    print(f"fifo 保留: {list(store)}")
+    assert list(store) == [pinned, POST.format(39), POST.format(40)]
+    assert store.first_seen(pinned) == 0
+
+    # 最近出现的时间随数据保存
+    reloaded = SeenStore(max_size=3, max_age=30 * DAY, policy="fifo")
+    reloaded.load_json_data(json.loads(json.dumps(store.to_json_data())), now=40 * DAY)
+    assert pinned in reloaded
+
+    # 不再出现在页面上后按发现时间淘汰
+    store.prune(now=41 * DAY)
+    assert pinned not in store
+    print("✅ PASS")
+
+
+def test_size_eviction_lru():
+    """lru 模式下仍在页面上的帖子不会被淘汰"""
+    store = SeenStore(max_size=3, policy="lru", refresh_interval=DAY)
+    for i in range(3):
+        store.add(POST.format(i), now=i * DAY)
+    # 刷新间隔内的重复出现不改动记录
+    store.dirty = False
+    store.touch(POST.format(2), now=2.5 * DAY)
+    assert not store.dirty
+    store.touch(POST.format(0), now=10 * DAY)
+    store.add(POST.format(3), now=11 * DAY)
+    print(f"lru 保留: {list(store)}")
+    assert POST.format(0) in store
+    assert POST.format(1) not in store
+    print("✅ PASS")
+
+
+def test_age_eviction():
+    """超过保留时长的记录被淘汰"""
+    store = SeenStore(max_size=0, max_age=30 * DAY)
+    for i in range(5):
+        store.add(POST.format(i), now=i * 10 * DAY)
+    # 添加新记录时也会淘汰过期记录
+    assert POST.format(0) not in store
+    store.prune(now=45 * DAY)
+    print(f"淘汰 {store.evicted} 个过期记录，剩余 {len(store)} 个")
+    assert store.evicted == 2
+    assert list(store) == [POST.format(i) for i in (2, 3, 4)]
+    print("✅ PASS")
+
+
+def test_json_round_trip():
+    """保存后重新加载，顺序和时间戳保持不变"""
+    store = SeenStore(max_size=10)
+    for i in range(4):
+        store.add(POST.format(i), now=1000 + i)
+    data = json.loads(json.dumps(store.to_json_data()))
+
+    restored = SeenStore(max_size=10)
+    migrated = restored.load_json_data(data, now=2000)
+    assert not migrated
+    assert not restored.dirty
+    assert list(restored) == list(store)
+    assert restored.first_seen(POST.format(3)) == 1003
+    print("✅ PASS")
+
+
+def test_legacy_migration():
+    """旧格式的无序列表迁移时按帖子编号保留最新的帖子"""
+    legacy = {
+        'known_posts': [POST.format(i) for i in (7, 120, 3, 1200, 98)],
+        'last_update': '2024-01-01T00:00:00',
+    }
+    store = SeenStore(max_size=3, max_age=30 * DAY)
+    migrated = store.load_json_data(legacy, now=500 * DAY)
+    print(f"迁移后保留: {list(store)}")
+    assert migrated
+    assert store.dirty
+    # 迁移使用当前时间，不会因为旧文件的保存时间而全部过期
+    assert list(store) == [POST.format(i) for i in (98, 120, 1200)]
+    assert store.first_seen(POST.format(1200)) == 500 * DAY
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_size_eviction_fifo()
+    test_fifo_keeps_posts_on_page()
+    test_size_eviction_lru()
+    test_age_eviction()
+    test_json_round_trip()
+    test_legacy_migration()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+测试额外监控来源：配置解析与校验、首次检查只记录不推送、按来源保存已知帖子
+"""
+
+import json
+
+from unikorn.extraction import extract_forum_posts
+from unikorn.seen_store import SeenStore
+from unikorn.sources import SourceState, parse_sources
+
+POST = "https://example.edu/bbs/thread/{}"
+
+
+def make_posts(numbers):
+    return [{'id': POST.format(n), 'title': f"帖子{n}", 'url': POST.format(n)} for n in numbers]
+
+
+def test_parse_sources():
+    """有效的来源使用默认值补全，无效的项给出原因"""
+    entries = [
+        json.dumps({"name": "ai-board", "url": "https://unikorn.axfff.com/forum?board=ai",
+                    "interval": 10, "groups": [123], "profile": {"min_title_length": 4}}),
+        {"name": "campus", "url": "https://example.edu/bbs"},
+        {"name": "campus", "url": "https://example.edu/other"},
+        {"name": "unikorn", "url": "https://unikorn.axfff.com/forum"},
+        {"name": "bad name", "url": "https://example.edu"},
+        {"name": "ftp", "url": "ftp://example.edu"},
+        {"name": "profile", "url": "https://example.edu", "profile": {"debug_mode": True}},
+        "{not json",
+    ]
+    sources, errors = parse_sources(entries, default_interval=300)
+    for error in errors:
+        print(error)
+    assert [source.name for source in sources] == ["ai-board", "campus"]
+    assert sources[0].interval == 600 and sources[0].groups == ["123"]
+    assert sources[1].interval == 300 and sources[1].groups is None and sources[1].profile == {}
+    assert len(errors) == 6
+    print("✅ PASS")
+
+
+def test_first_check_seeds_without_notifying():
+    """新来源第一次检查只记录现有帖子，之后只返回新出现的帖子"""
+    sources, _ = parse_sources([{"name": "campus", "url": "https://example.edu/bbs"}], 300)
+    state = SourceState(sources[0], SeenStore())
+    assert state.record(make_posts([5, 4, 3]), now=1000) == []
+    assert len(state.known_posts) == 3 and state.known_posts.dirty
+
+    new_posts = state.record(make_posts([7, 6, 5, 4]), now=1300)
+    assert [post['id'] for post in new_posts] == [POST.format(7), POST.format(6)]
+    assert state.last_new == 2 and state.checks == 2
+    print("✅ PASS")
+
+
+def test_state_round_trip():
+    """已知帖子和缓存验证器按来源保存，链接变化时丢弃验证器"""
+    sources, _ = parse_sources([{"name": "campus", "url": "https://example.edu/bbs"}], 300)
+    state = SourceState(sources[0], SeenStore())
+    state.record(make_posts([3, 2, 1]), now=1000)
+    state.validators = {'etag': '"abc"'}
+    data = json.loads(json.dumps(state.to_json_data()))
+
+    restored = SourceState(sources[0], SeenStore())
+    restored.load_json_data(data, now=1100)
+    assert restored.seeded and restored.validators == {'etag': '"abc"'}
+    assert POST.format(2) in restored.known_posts
+
+    moved, _ = parse_sources([{"name": "campus", "url": "https://example.edu/bbs/new"}], 300)
+    restored = SourceState(moved[0], SeenStore())
+    restored.load_json_data(data, now=1100)
+    assert restored.validators == {} and len(restored.known_posts) == 3
+    print("✅ PASS")
+
+
+def test_relative_links_use_source_url():
+    """其他站点的相对链接按来源的链接补全，而不是Unikorn论坛"""
+    html = "".join(f'<a href="/bbs/thread/{n}">校园论坛帖子标题{n}</a>' for n in range(3))
+    options = {'html_parser': 'linkscan', 'base_url': "https://example.edu/bbs/"}
+    posts = extract_forum_posts(html, options)['posts']
+    assert [post['id'] for post in posts] == [POST.format(n) for n in range(3)]
+
+    default = extract_forum_posts(html, {'html_parser': 'linkscan'})['posts']
+    assert default[0]['id'] == "https://unikorn.axfff.com/bbs/thread/0"
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_parse_sources()
+    test_first_check_seeds_without_notifying()
+    test_state_round_trip()
+    test_relative_links_use_source_url()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+测试SQLite已知帖子存储：批量写入、推送记录、淘汰和JSON导入
+"""
+
+import os
+import sqlite3
+import tempfile
+
+from unikorn.seen_store import SeenStore
+from unikorn.sqlite_store import SQLiteSeenStore
+
+POST = "https://unikorn.axfff.com/forum/post/{}"
+DAY = 86400
+
+
+def make_store(directory, **kwargs):
+    return SQLiteSeenStore(os.path.join(directory, 'posts.db'), **kwargs)
+
+
+def test_batched_writes_and_reopen():
+    """改动在 flush 时一次写入，重新打开后仍然存在"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = make_store(directory)
+        for i in range(3):
+            post = {'id': POST.format(i), 'title': f'帖子{i}', 'url': POST.format(i)}
+            assert store.add(post['id'], now=i, record=post)
+        assert not store.add(POST.format(0), now=5)
+        store.mark_notified(POST.format(1), ['123', '456'])
+        assert store.dirty
+        assert len(store) == 3
+
+        written = store.flush()
+        print(f"批量写入 {written} 条记录")
+        assert not store.dirty
+        store.mark_notified(POST.format(1), ['789'])
+        store.close()
+
+        reopened = make_store(directory)
+        assert POST.format(2) in reopened
+        assert POST.format(9) not in reopened
+        assert reopened.first_seen(POST.format(1)) == 1
+        assert reopened.notified_groups(POST.format(1)) == {'123', '456', '789'}
+        journal = reopened.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        assert journal == 'wal'
+        row = reopened.connection.execute("SELECT title FROM posts WHERE id = ?", (POST.format(2),)).fetchone()
+        assert row[0] == '帖子2'
+        reopened.close()
+    print("✅ PASS")
+
+
+def test_eviction_matches_memory_store():
+    """淘汰结果与内存中的 SeenStore 一致"""
+    with tempfile.TemporaryDirectory() as directory:
+        for policy in ('lru', 'fifo'):
+            memory = SeenStore(max_size=3, max_age=30 * DAY, policy=policy, refresh_interval=DAY)
+            database = make_store(directory, max_size=3, max_age=30 * DAY, policy=policy, refresh_interval=DAY)
+            for store in (memory, database):
+                for i in range(5):
+                    store.add(POST.format(i), now=i * DAY)
+                store.touch(POST.format(0), now=10 * DAY)
+                if store is database:
+                    store.flush()
+                store.prune(now=10 * DAY)
+            print(f"{policy}: {list(memory)} / {list(database)}")
+            assert list(memory) == list(database)
+            database.connection.execute("DELETE FROM posts")
+            database.connection.commit()
+            database.close()
+    print("✅ PASS")
+
+
+def test_fifo_keeps_posts_on_page():
+    """fifo 模式下仍在页面上的置顶帖不会被淘汰"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = make_store(directory, max_size=3, max_age=30 * DAY, policy="fifo")
+        pinned = POST.format(0)
+        store.add(pinned, now=0)
+        for day in range(1, 41):
+            store.touch(pinned, now=day * DAY)
+            store.add(POST.format(day), now=day * DAY)
+            store.flush()
+            store.prune(now=day * DAY)
+        print(f"fifo 保留: {list(store)}")
+        assert list(store) == [pinned, POST.format(39), POST.format(40)]
+        assert store.first_seen(pinned) == 0
+        store.prune(now=41 * DAY)
+        assert pinned not in store
+        store.close()
+    print("✅ PASS")
+
+
+def test_json_import_once():
+    """JSON数据文件只在首次使用时导入"""
+    legacy = {'known_posts': [POST.format(i) for i in (3, 1, 2)]}
+    with tempfile.TemporaryDirectory() as directory:
+        store = make_store(directory)
+        assert store.needs_json_import()
+        assert store.import_json_data(legacy, now=100) == 3
+        assert not store.needs_json_import()
+        assert store.import_json_data({'known_posts': [POST.format(7)]}, now=200) == 0
+        assert list(store) == [POST.format(i) for i in (1, 2, 3)]
+        assert POST.format(7) not in store
+        store.close()
+        # 重新打开后不再需要读取JSON数据文件
+        store = make_store(directory)
+        assert not store.needs_json_import()
+        store.close()
+
+        count = sqlite3.connect(os.path.join(directory, 'posts.db')).execute(
+            "SELECT COUNT(*) FROM posts").fetchone()[0]
+        assert count == 3
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_batched_writes_and_reopen()
+    test_eviction_matches_memory_store()
+    test_fifo_keeps_posts_on_page()
+    test_json_import_once()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+测试流式增量解析：分块输入与一次性解析结果一致、多字节字符跨块、提前停止读取
+"""
+
+import asyncio
+import os
+
+from unikorn.extraction import deduplicate_posts, extract_forum_posts
+from unikorn.streaming import StreamingPostParser, iter_streamed_posts
+
+SAMPLE_PAGE = os.path.join(os.path.dirname(__file__), 'samples', 'forum_page.html')
+OPTIONS = {'excluded_keywords': ['发帖']}
+
+
+async def chunked(data: bytes, size: int, consumed: list):
+    """模拟 response.content.iter_chunked，记录被读取的块数"""
+    for start in range(0, len(data), size):
+        consumed.append(start)
+        yield data[start:start + size]
+
+
+def collect(data: bytes, size: int, stop_after: int = None):
+    async def run():
+        consumed, posts, stats = [], [], {}
+        async for post in iter_streamed_posts(chunked(data, size, consumed), 'utf-8', OPTIONS, stats):
+            posts.append(post)
+            if stop_after is not None and len(posts) >= stop_after:
+                break
+        return posts, consumed, stats
+    return asyncio.run(run())
+
+
+def test_streaming_matches_link_extraction():
+    """任意分块大小的流式解析结果都相同"""
+    with open(SAMPLE_PAGE, 'rb') as f:
+        data = f.read()
+    expected, _, _ = collect(data, len(data))
+    assert expected
+
+    # 7 字节的块会把中文字符和标签拆到不同的块中
+    for size in (7, 1024, len(data)):
+        posts, _, stats = collect(data, size)
+        titles = [post['title'] for post in posts]
+        print(f"块大小 {size}: {len(posts)} 个帖子，读取 {stats['bytes_read']} 字节")
+        assert titles == [post['title'] for post in expected]
+        assert stats['bytes_read'] == len(data)
+    print("✅ PASS")
+
+
+def test_streaming_matches_default_extraction():
+    """流式解析与默认提取流程得到相同的帖子"""
+    with open(SAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    for options in ({}, OPTIONS):
+        parser = StreamingPostParser(options)
+        parser.feed(html)
+        parser.close()
+        streamed = [(post['id'], post['title']) for post in deduplicate_posts(parser.pop_posts())]
+        for extra in ({}, {'extraction_mode': 'dom', 'html_parser': 'html.parser'}):
+            expected = [(post['id'], post['title'])
+                        for post in extract_forum_posts(html, {**options, **extra})['posts']]
+            print(f"配置 {options or '默认'} {extra or ''}: 流式 {len(streamed)} 个，默认流程 {len(expected)} 个")
+            assert streamed == expected
+    assert ('https://unikorn.axfff.com/forum/post/1140', 'Looking for a teammate for hackathon') in streamed
+    print("✅ PASS")
+
+
+def test_early_stop_skips_remaining_chunks():
+    """调用方停止迭代后不再读取剩余的数据块"""
+    with open(SAMPLE_PAGE, 'rb') as f:
+        data = f.read()
+    posts, consumed, stats = collect(data, 1024, stop_after=3)
+    total_chunks = (len(data) + 1023) // 1024
+    print(f"读取 {len(consumed)}/{total_chunks} 个数据块后停止")
+    assert len(posts) == 3
+    assert len(consumed) < total_chunks
+    assert stats['bytes_read'] < len(data)
+    print("✅ PASS")
+
+
+def test_parser_filters_links():
+    """按钮、导航和被排除的链接不会产出帖子"""
+    parser = StreamingPostParser(OPTIONS)
+    parser.feed('<a href="/forum/post/1">第一篇有效的帖子</a><a href="/forum/post/2">')
+    assert [post['title'] for post in parser.pop_posts()] == ['第一篇有效的帖子']
+    # 未闭合的链接在遇到下一个链接时结束
+    parser.feed('第二篇有效的帖子<a href="/forum/new">发帖</a><a href="/login">登录</a>')
+    parser.close()
+    titles = [post['title'] for post in parser.pop_posts()]
+    print(f"解析结果: {titles}")
+    assert titles == ['第二篇有效的帖子']
+    assert parser.links_seen == 4
+
+    # 容器中的标题链接不做按钮文本判断，同一容器的其余链接不再作为帖子
+    parser = StreamingPostParser()
+    parser.feed('<a href="/forum/post/9">Reply to all</a>'
+                '<ul><li class="post-item"><h3><a href="/forum/post/10">Reply guide for freshmen</a></h3>'
+                '<br><a href="/forum/post/10#comments">评论区的第一条留言</a></li>'
+                '<li class="post-item"><a href="/forum/post/11">第十一篇帖子标题</a></li></ul>')
+    parser.close()
+    titles = [post['title'] for post in parser.pop_posts()]
+    print(f"容器规则: {titles}")
+    assert titles == ['Reply guide for freshmen', '第十一篇帖子标题']
+    print("✅ PASS")
+
+
+if __name__ == "__main__":
+    test_streaming_matches_link_extraction()
+    test_streaming_matches_default_extraction()
+    test_early_stop_skips_remaining_chunks()
+    test_parser_filters_links()
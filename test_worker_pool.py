@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+测试解析进程池：子进程提取结果、任务超时和进程回收
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from unikorn.extraction import extract_forum_posts
+from unikorn.worker_pool import ParsePool, ParseTimeoutError
+
+SAMPLE_PAGE = os.path.join(os.path.dirname(__file__), 'samples', 'forum_page.html')
+
+
+def slow_task(seconds):
+    """模拟失控的解析任务"""
+    time.sleep(seconds)
+    return seconds
+
+
+def worker_pid(_):
+    return os.getpid()
+
+
+def crash_task(_):
+    """模拟工作进程异常退出，进程池随之损坏"""
+    os._exit(1)
+
+
+async def run_pool_checks():
+    with open(SAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        html = f.read()
+    options = {'extraction_mode': 'dom', 'html_parser': 'html.parser', 'excluded_keywords': ['发帖']}
+
+    pool = ParsePool(workers=1, max_tasks_per_worker=2, timeout=20)
+    try:
+        # 子进程与当前进程的提取结果一致
+        result = await pool.run(extract_forum_posts, html, options)
+        inline = extract_forum_posts(html, options)
+        print(f"子进程提取 {len(result['posts'])} 个帖子，当前进程提取 {len(inline['posts'])} 个")
+        assert result['posts'] == inline['posts']
+
+        # 每个工作进程执行 max_tasks_per_worker 个任务后被替换
+        pids = [await pool.run(worker_pid, i) for i in range(4)]
+        print(f"工作进程PID: {pids}")
+        assert len(set(pids)) >= 2
+
+        # 超时的任务会终止进程池，之后的任务在新进程中正常执行
+        pool.timeout = 0.5
+        try:
+            await pool.run(slow_task, 30)
+            raise AssertionError("应当超时")
+        except ParseTimeoutError as e:
+            print(f"✅ 超时任务已终止: {e}")
+        assert pool.timeouts == 1
+
+        pool.timeout = 20
+        assert await pool.run(slow_task, 0) == 0
+    finally:
+        pool.shutdown()
+
+
+async def run_timer_checks():
+    # 单个工作进程时第二个任务需要排队，排队时间不计入超时
+    pool = ParsePool(workers=1, timeout=1.2)
+    try:
+        await pool.run(slow_task, 0)
+        results = await asyncio.gather(pool.run(slow_task, 0.8), pool.run(slow_task, 0.8))
+        print(f"排队执行的任务结果: {results}")
+        assert results == [0.8, 0.8] and pool.timeouts == 0
+    finally:
+        pool.shutdown()
+
+    # 其他任务超时终止进程池时，正在执行的正常任务重新执行
+    pool = ParsePool(workers=2, timeout=3)
+    try:
+        await asyncio.gather(pool.run(slow_task, 0.2), pool.run(slow_task, 0.2))
+
+        async def healthy():
+            await asyncio.sleep(1.5)
+            return await pool.run(slow_task, 2.0)
+
+        stuck, result = await asyncio.gather(pool.run(slow_task, 30), healthy(), return_exceptions=True)
+        print(f"超时任务: {stuck!r}，正常任务结果: {result!r}")
+        assert isinstance(stuck, ParseTimeoutError)
+        assert result == 2.0 and pool.timeouts == 1
+    finally:
+        pool.shutdown()
+
+
+async def run_breaker_checks():
+    # 连续失败达到上限后暂停使用进程池，冷却结束后重新尝试
+    now = [0.0]
+    pool = ParsePool(workers=1, timeout=20, max_failures=2, cooldown=60, clock=lambda: now[0])
+    try:
+        for _ in range(2):
+            assert pool.available()
+            try:
+                await pool.run(crash_task, 0)
+                raise AssertionError("应当失败")
+            except BrokenProcessPool:
+                pass
+        print(f"连续失败后暂停到 {pool.disabled_until}")
+        assert not pool.available() and pool.trips == 1
+
+        now[0] = 61
+        assert pool.available()
+        assert await pool.run(slow_task, 0) == 0
+        # 成功后重新计数，偶发的一次失败不会暂停进程池
+        try:
+            await pool.run(crash_task, 0)
+        except BrokenProcessPool:
+            pass
+        assert pool.available()
+    finally:
+        pool.shutdown()
+
+
+def test_parse_pool():
+    """测试解析进程池"""
+    print("=== 测试解析进程池 ===\n")
+    asyncio.run(run_pool_checks())
+    print("✅ PASS 解析进程池")
+
+
+def test_parse_pool_timer():
+    """测试超时只计算任务的执行时间"""
+    print("\n=== 测试解析任务计时 ===\n")
+    asyncio.run(run_timer_checks())
+    print("✅ PASS 解析任务计时")
+
+
+def test_parse_pool_breaker():
+    """测试进程池连续失败后暂停使用"""
+    print("\n=== 测试解析进程池熔断 ===\n")
+    asyncio.run(run_breaker_checks())
+    print("✅ PASS 解析进程池熔断")
+
+
+if __name__ == "__main__":
+    test_parse_pool()
+    test_parse_pool_timer()
+    test_parse_pool_breaker()
@@ -0,0 +1,4 @@
+"""Unikorn论坛监控插件的内部组件
+
+这里的模块不依赖 AstrBot，可以在插件之外单独导入和测试。
+"""
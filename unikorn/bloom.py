@@ -0,0 +1,151 @@
+"""可扩展布隆过滤器
+
+放在已知帖子存储前面：过滤器判定“不存在”的帖子一定是新帖子，无需查询存储；
+只有判定“可能存在”的帖子才需要到存储中确认。
+
+:class:`ScalableBloomFilter` 由一组容量逐级翻倍的 :class:`BloomFilter` 组成，
+当前过滤器装满后追加一个误判率更低的新过滤器，使总体误判率始终不超过配置值。
+元素是 :func:`~unikorn.seen_store.post_hash` 给出的64位哈希，用双重哈希推导
+各个比特位置，因此可以直接从只保存哈希的存储重建。
+"""
+
+import math
+import struct
+from typing import Iterable, List
+
+MAGIC = b'UKBF'
+VERSION = 1
+HEADER = struct.Struct('<4sIdIQ')
+FILTER_HEADER = struct.Struct('<QdQIQ')
+_MIX = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    """固定容量的布隆过滤器"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = 0
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, value: int):
+        # 把哈希与常数相乘打散，再拆成两个32位哈希做双重哈希
+        mixed = (value * _MIX) & _MASK64
+        first = mixed & 0xFFFFFFFF
+        second = (mixed >> 32) | 1
+        for i in range(self.num_hashes):
+            yield (first + i * second) % self.num_bits
+
+    def add(self, value: int):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: int) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    @property
+    def bits_set(self) -> int:
+        return int.from_bytes(self.bits, 'little').bit_count()
+
+    @property
+    def fill_ratio(self) -> float:
+        return self.bits_set / self.num_bits
+
+    @property
+    def estimated_error_rate(self) -> float:
+        """根据当前比特填充率估计的误判率"""
+        return self.fill_ratio ** self.num_hashes
+
+
+class ScalableBloomFilter:
+    """容量不足时自动追加新过滤器的布隆过滤器"""
+
+    def __init__(self, error_rate: float = 0.01, initial_capacity: int = 1000,
+                 growth: int = 2, tightening: float = 0.5):
+        if not 0 < error_rate < 1:
+            raise ValueError(f"误判率必须在0和1之间: {error_rate}")
+        self.error_rate = error_rate
+        self.initial_capacity = max(1, int(initial_capacity))
+        self.growth = growth
+        self.tightening = tightening
+        self.filters: List[BloomFilter] = []
+        self.dirty = False
+
+    def _next_filter(self) -> BloomFilter:
+        index = len(self.filters)
+        # 各级误判率构成等比数列，总和不超过 error_rate
+        error = self.error_rate * (1 - self.tightening) * self.tightening ** index
+        bloom = BloomFilter(self.initial_capacity * self.growth ** index, error)
+        self.filters.append(bloom)
+        return bloom
+
+    def add(self, value: int):
+        if value in self:
+            return
+        bloom = self.filters[-1] if self.filters else None
+        if bloom is None or bloom.count >= bloom.capacity:
+            bloom = self._next_filter()
+        bloom.add(value)
+        self.dirty = True
+
+    def update(self, values: Iterable[int]):
+        for value in values:
+            self.add(value)
+
+    def __contains__(self, value: int) -> bool:
+        return any(value in bloom for bloom in self.filters)
+
+    @property
+    def count(self) -> int:
+        return sum(bloom.count for bloom in self.filters)
+
+    @property
+    def num_bits(self) -> int:
+        return sum(bloom.num_bits for bloom in self.filters)
+
+    @property
+    def fill_ratio(self) -> float:
+        """所有过滤器中被置位的比特比例"""
+        total = self.num_bits
+        return sum(bloom.bits_set for bloom in self.filters) / total if total else 0.0
+
+    @property
+    def estimated_error_rate(self) -> float:
+        """任一过滤器误判的概率"""
+        miss = 1.0
+        for bloom in self.filters:
+            miss *= 1 - bloom.estimated_error_rate
+        return 1 - miss
+
+    def to_bytes(self) -> bytes:
+        parts = [HEADER.pack(MAGIC, VERSION, self.error_rate, len(self.filters), self.initial_capacity)]
+        for bloom in self.filters:
+            parts.append(FILTER_HEADER.pack(bloom.capacity, bloom.error_rate, bloom.num_bits,
+                                            bloom.num_hashes, bloom.count))
+            parts.append(bytes(bloom.bits))
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ScalableBloomFilter":
+        magic, version, error_rate, num_filters, initial_capacity = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("无法识别的布隆过滤器数据")
+        instance = cls(error_rate, initial_capacity)
+        offset = HEADER.size
+        for _ in range(num_filters):
+            capacity, error, num_bits, num_hashes, count = FILTER_HEADER.unpack_from(data, offset)
+            offset += FILTER_HEADER.size
+            bloom = BloomFilter(capacity, error)
+            size = len(bloom.bits)
+            if bloom.num_bits != num_bits or bloom.num_hashes != num_hashes or offset + size > len(data):
+                raise ValueError("布隆过滤器数据已损坏")
+            bloom.bits = bytearray(data[offset:offset + size])
+            bloom.count = count
+            offset += size
+            instance.filters.append(bloom)
+        return instance
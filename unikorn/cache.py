@@ -0,0 +1,110 @@
+"""带过期时间和后台刷新的结果缓存
+
+查询类指令（``/unikorn posts``、``/unikorn debug``）直接读取缓存中的结果，
+不再每次都请求论坛。监控循环每次成功抓取后用 :meth:`ResultCache.put` 写入
+最新结果，缓存在 ``ttl`` 秒内视为新鲜：
+
+- 新鲜：直接返回
+- 过期但未超过 ``ttl + stale_ttl``：立即返回旧结果，同时在后台刷新
+  （stale-while-revalidate）
+- 没有结果或过期太久：等待刷新完成后返回，刷新失败时仍返回旧结果
+
+同一个键同时只有一次刷新，并发的请求共享刷新结果。刷新函数返回 None
+表示失败，不写入缓存。
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+class CacheResult(NamedTuple):
+    """一次读取的结果，age 是结果的存在时间（秒）"""
+    value: Any
+    age: float
+    state: str
+
+
+class ResultCache:
+    """按键缓存结果，过期后先返回旧结果再在后台刷新"""
+
+    def __init__(self, ttl: float = 60, stale_ttl: float = 600, clock: Callable[[], float] = time.monotonic):
+        self.ttl = max(0.0, ttl)
+        self.stale_ttl = max(0.0, stale_ttl)
+        self._clock = clock
+        self._values: Dict[str, Any] = {}
+        self._stored_at: Dict[str, float] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.stats = {FRESH: 0, STALE: 0, MISS: 0, 'refreshes': 0, 'refresh_failures': 0}
+
+    def put(self, key: str, value: Any):
+        """写入最新结果"""
+        self._values[key] = value
+        self._stored_at[key] = self._clock()
+
+    def renew(self, key: str):
+        """确认缓存的结果仍然有效（例如服务器返回304），重新开始计时"""
+        if key in self._values:
+            self._stored_at[key] = self._clock()
+
+    def age(self, key: str) -> Optional[float]:
+        if key not in self._stored_at:
+            return None
+        return self._clock() - self._stored_at[key]
+
+    def peek(self, key: str) -> Optional[CacheResult]:
+        """读取缓存而不触发刷新"""
+        age = self.age(key)
+        if age is None:
+            return None
+        return CacheResult(self._values[key], age, FRESH if age <= self.ttl else STALE)
+
+    def _refresh(self, key: str, refresh: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._refreshing.get(key)
+        if task is None or task.done():
+            task = asyncio.ensure_future(self._run_refresh(key, refresh))
+            self._refreshing[key] = task
+        return task
+
+    async def _run_refresh(self, key: str, refresh: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats['refreshes'] += 1
+        try:
+            value = await refresh()
+        except Exception:
+            value = None
+        if value is None:
+            self.stats['refresh_failures'] += 1
+            return None
+        self.put(key, value)
+        return value
+
+    async def get(self, key: str, refresh: Callable[[], Awaitable[Any]]) -> CacheResult:
+        """读取结果；过期时按 stale-while-revalidate 刷新，没有任何结果时 value 为 None"""
+        age = self.age(key)
+        if age is not None and age <= self.ttl:
+            self.stats[FRESH] += 1
+            return CacheResult(self._values[key], age, FRESH)
+        if age is not None and age <= self.ttl + self.stale_ttl:
+            self.stats[STALE] += 1
+            self._refresh(key, refresh)
+            return CacheResult(self._values[key], age, STALE)
+
+        self.stats[MISS] += 1
+        # 等待共享的刷新任务，调用方取消时不影响其他等待者
+        value = await asyncio.shield(self._refresh(key, refresh))
+        if value is None and key in self._values:
+            # 刷新失败时宁可返回过期很久的结果
+            return CacheResult(self._values[key], self.age(key), STALE)
+        return CacheResult(value, 0.0, MISS)
+
+    async def close(self):
+        """取消正在进行的后台刷新"""
+        tasks = [task for task in self._refreshing.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refreshing.clear()
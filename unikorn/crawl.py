@@ -0,0 +1,92 @@
+"""多页抓取：越过已知帖子边界后停止
+
+论坛按从新到旧排列帖子。两次检查之间的新帖子超过一页时（例如插件停止了一段
+时间），只看第一页会漏掉溢出到后面几页的新帖子。:func:`crawl_pages` 在第一页
+还没有到达已知帖子边界时，并发抓取第 2..N 页：
+
+- 信号量限制同时进行的请求数，按页码顺序发起请求
+- 某一页的最后一个帖子已知（或整页都是已知帖子、页面为空、请求失败）时，
+  说明边界就在这一页，之后的页面不再请求，已在进行的请求被取消
+- 各页的结果按页码顺序合并，抓取期间因新帖子插入而重复出现的帖子只保留一次
+- ``max_pages`` 是包含第一页在内的页数上限，保护论坛服务器
+"""
+
+import asyncio
+import inspect
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Union
+
+KnownCheck = Callable[[str], Union[bool, Awaitable[bool]]]
+
+
+class CrawlResult(NamedTuple):
+    """一次多页抓取的结果"""
+    posts: List[Dict]
+    pages_fetched: int
+    boundary_page: Optional[int]
+
+    @property
+    def exhausted(self) -> bool:
+        """用完了页数上限仍未到达已知帖子边界"""
+        return self.boundary_page is None
+
+
+async def reaches_known(posts: List[Dict], is_known: KnownCheck) -> bool:
+    """这一页是否已经到达已知帖子边界"""
+    if not posts:
+        return True
+    known = is_known(posts[-1]['id'])
+    if inspect.isawaitable(known):
+        known = await known
+    return bool(known)
+
+
+async def crawl_pages(first_page: List[Dict], fetch_page: Callable[[int], Awaitable[List[Dict]]],
+                      is_known: KnownCheck, max_pages: int = 5, concurrency: int = 3) -> CrawlResult:
+    """从第一页的结果开始，抓取后续页面直到已知帖子边界或页数上限
+
+    fetch_page(page) 返回第 page 页的帖子，失败时返回空列表或抛出异常，
+    两者都视为边界。is_known 可以是普通函数，也可以是异步函数（查询数据库等）。
+    """
+    if await reaches_known(first_page, is_known):
+        return CrawlResult(list(first_page), 1, 1)
+    last_page = max(1, max_pages)
+    if last_page == 1:
+        return CrawlResult(list(first_page), 1, None)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    # 目前已知的最靠前的边界页
+    boundary = [last_page + 1]
+    pages: Dict[int, List[Dict]] = {}
+
+    async def fetch(page: int):
+        async with semaphore:
+            if page > boundary[0]:
+                return
+            try:
+                posts = await fetch_page(page)
+            except Exception:
+                posts = []
+        pages[page] = posts
+        if await reaches_known(posts, is_known) and page < boundary[0]:
+            boundary[0] = page
+            for other_page, task in tasks.items():
+                if other_page > page and not task.done():
+                    task.cancel()
+
+    tasks = {page: asyncio.ensure_future(fetch(page)) for page in range(2, last_page + 1)}
+    try:
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+    merged = list(first_page)
+    seen = {post['id'] for post in merged}
+    end = min(boundary[0], last_page)
+    for page in range(2, end + 1):
+        for post in pages.get(page, []):
+            if post['id'] not in seen:
+                seen.add(post['id'])
+                merged.append(post)
+    boundary_page = boundary[0] if boundary[0] <= last_page else None
+    return CrawlResult(merged, len(pages) + 1, boundary_page)
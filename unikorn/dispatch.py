@@ -0,0 +1,154 @@
+"""并发的群消息分发
+
+:class:`FanOutDispatcher` 同时向多个群发送推送计划中的消息：
+
+- 同一个群的消息按顺序发送，不同群之间并发
+- 全局信号量限制同时进行的发送数量
+- 每个群和整个机器人账号各有一个令牌桶，限制发送频率，避免触发QQ的风控
+- 记录每次发送的排队等待时间和发送耗时
+- ``before_send`` 在取得令牌和并发名额之后、真正发送之前调用，``on_result``
+  在每条消息发送完成时调用，调用方可以据此逐条记录发送状态
+"""
+
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional
+
+from .notifications import Notification
+
+BeforeSend = Callable[[str, Notification], Awaitable[None]]
+OnResult = Callable[["SendResult"], None]
+
+
+class TokenBucket:
+    """令牌桶：以 rate 个/秒的速度补充令牌，最多积累 capacity 个"""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = None):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._clock = clock or (lambda: asyncio.get_running_loop().time())
+        self._tokens = self.capacity
+        self._updated: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        if self._updated is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """取出一个令牌，必要时等待；返回等待的秒数"""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        # 排队取令牌，先到先得
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+class SendResult(NamedTuple):
+    """一次发送的结果"""
+    group_id: str
+    notification: Notification
+    error: Optional[BaseException]
+    waited: float
+    latency: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class FanOutDispatcher:
+    """并发向多个群发送消息，按群和账号限速"""
+
+    def __init__(self, send: Callable[[str, Notification], Awaitable[None]], concurrency: int = 5,
+                 group_rate: float = 20 / 60, group_burst: int = 5,
+                 account_rate: float = 1.0, account_burst: int = 10, history: int = 200):
+        self._send = send
+        self.concurrency = max(1, concurrency)
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._group_buckets: Dict[str, TokenBucket] = {}
+        self._account_bucket: Optional[TokenBucket] = None
+        self.account_rate = account_rate
+        self.account_burst = account_burst
+        # 最近的发送耗时（秒），用于统计
+        self.latencies: Deque[float] = deque(maxlen=history)
+        self.sent = 0
+        self.failed = 0
+
+    def _group_bucket(self, group_id: str) -> TokenBucket:
+        bucket = self._group_buckets.get(group_id)
+        if bucket is None:
+            bucket = self._group_buckets[group_id] = TokenBucket(self.group_rate, self.group_burst)
+        return bucket
+
+    async def _send_one(self, group_id: str, notification: Notification,
+                        before_send: Optional[BeforeSend], on_result: Optional[OnResult]) -> SendResult:
+        loop = asyncio.get_running_loop()
+        queued = loop.time()
+        # 先取令牌再占用并发名额，等待限速时不占用名额
+        await self._group_bucket(group_id).acquire()
+        await self._account_bucket.acquire()
+        async with self._semaphore:
+            error = None
+            try:
+                if before_send is not None:
+                    await before_send(group_id, notification)
+            except Exception as e:
+                # 发送前的准备失败时不发送
+                error = e
+            started = loop.time()
+            if error is None:
+                try:
+                    await self._send(group_id, notification)
+                except Exception as e:
+                    error = e
+            finished = loop.time()
+        latency = finished - started
+        self.latencies.append(latency)
+        if error is None:
+            self.sent += 1
+        else:
+            self.failed += 1
+        result = SendResult(group_id, notification, error, started - queued, latency)
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    async def _send_group(self, group_id: str, notifications: List[Notification],
+                          before_send: Optional[BeforeSend], on_result: Optional[OnResult]) -> List[SendResult]:
+        return [await self._send_one(group_id, notification, before_send, on_result)
+                for notification in notifications]
+
+    async def dispatch(self, plan: Dict[str, List[Notification]], before_send: Optional[BeforeSend] = None,
+                       on_result: Optional[OnResult] = None) -> List[SendResult]:
+        """按推送计划发送消息，返回每次发送的结果"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._account_bucket = TokenBucket(self.account_rate, self.account_burst)
+        groups = await asyncio.gather(*(self._send_group(str(group_id), notifications, before_send, on_result)
+                                        for group_id, notifications in plan.items()))
+        return [result for results in groups for result in results]
+
+    def latency_stats(self) -> Dict[str, float]:
+        """最近发送耗时的统计（毫秒）"""
+        if not self.latencies:
+            return {}
+        ordered = sorted(self.latencies)
+        return {
+            'count': len(ordered),
+            'avg_ms': sum(ordered) / len(ordered) * 1000,
+            'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            'max_ms': ordered[-1] * 1000,
+        }
@@ -0,0 +1,474 @@
+"""帖子提取流水线
+
+把论坛页面HTML转换为帖子列表的全部CPU密集步骤：Nuxt负载解析、帖子区域截取、
+DOM解析、容器识别、链接提取和过滤去重。入口函数 :func:`extract_forum_posts`
+是只依赖可序列化参数的纯函数，可以直接提交到子进程执行。
+
+帖子容器识别规则与原先的CSS选择器一一对应，但只遍历一遍DOM树，
+每个元素同时与所有规则比对。
+"""
+
+import re
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+
+from . import nuxt_payload
+from .filters import POST_URL_RE, FilterEngine
+from .parsers import get_backend
+
+SITE_URL = 'https://unikorn.axfff.com'
+
+# extract_forum_posts 的默认参数，与插件配置项同名
+DEFAULT_OPTIONS = {
+    'extraction_mode': 'auto',
+    'nuxt_post_url_template': nuxt_payload.DEFAULT_URL_TEMPLATE,
+    'html_parser': 'lxml',
+    'partial_parse': True,
+    'excluded_keywords': [],
+    'min_title_length': 5,
+    'max_title_length': 50,
+    'debug_mode': False,
+    'base_url': SITE_URL + '/forum/',
+}
+
+# 优先查找的标题链接选择器
+TITLE_SELECTORS = [
+    'a[class*="title"]',
+    'a[class*="subject"]',
+    'a[class*="topic"]',
+    'h1 a', 'h2 a', 'h3 a', 'h4 a',
+    '.title a', '.subject a', '.topic a',
+]
+
+TIME_SELECTOR = '[class*="time"], [class*="date"], time'
+
+NAVIGATION_CONTENT_RE = re.compile(
+    r'^(上一页|下一页|首页|末页|第\s*\d+\s*页|共\s*\d+\s*页|页码|分页)+$'
+    r'|^(发帖|我要发帖|新建|添加|创建|登录|注册|搜索|筛选|排序)+$'
+    r'|^(加载中|loading|暂无数据|没有更多|到底了)+$',
+    re.I,
+)
+
+# 单页应用特征及对应的框架，按优先级排列
+SPA_INDICATORS = {
+    '__nuxt_data__': 'nuxt',
+    'data-nuxt-': 'nuxt',
+    'nuxt': 'nuxt',
+    'reactroot': 'react',
+    'react': 'react',
+    'ng-app': 'angular',
+    'angular': 'angular',
+    'vue': 'vue',
+}
+SPA_INDICATOR_RE = re.compile('|'.join(re.escape(indicator) for indicator in SPA_INDICATORS), re.I)
+
+# 帖子列表区域的类名特征
+POSTS_REGION_CLASS_RE = re.compile(r'(posts?[-_]?(list|container|wrapper)|forum[-_]?posts?|topic[-_]?list)', re.I)
+
+REGION_TAGS = ('div', 'ul', 'section')
+
+_REGION_OPEN_RE = re.compile(
+    r'<(div|ul|section)\b[^>]*?\bclass\s*=\s*(?:"([^"]*)"|\'([^\']*)\')[^>]*>', re.I)
+_TAG_BOUNDARY_RES = {
+    tag: re.compile(rf'<(/?){tag}\b[^>]*?(/?)>', re.I) for tag in REGION_TAGS
+}
+
+
+class ContainerRule(NamedTuple):
+    """帖子容器规则，selector 为等价的CSS选择器，仅用于展示"""
+    selector: str
+    matches: Callable[[str, str, str, Dict], bool]
+
+
+def _class_rule(keyword: str, *excluded: str) -> Callable:
+    def matches(name, classes, element_id, attrs):
+        return keyword in classes and not any(word in classes for word in excluded)
+    return matches
+
+
+def _attr_rule(attr: str) -> Callable:
+    def matches(name, classes, element_id, attrs):
+        return attr in attrs
+    return matches
+
+
+def _id_rule(tag: str, keyword: str) -> Callable:
+    def matches(name, classes, element_id, attrs):
+        return name == tag and keyword in element_id
+    return matches
+
+
+# 按优先级排列的帖子容器规则
+CONTAINER_RULES: List[ContainerRule] = [
+    # 基于类名的规则
+    ContainerRule('[class*="post"]:not([class*="button"]):not([class*="btn"])', _class_rule('post', 'button', 'btn')),
+    ContainerRule('[class*="topic"]:not([class*="button"]):not([class*="btn"])', _class_rule('topic', 'button', 'btn')),
+    ContainerRule('[class*="thread"]:not([class*="button"]):not([class*="btn"])', _class_rule('thread', 'button', 'btn')),
+    ContainerRule('[class*="article"]:not([class*="button"]):not([class*="btn"])', _class_rule('article', 'button', 'btn')),
+    ContainerRule('[class*="item"]:not([class*="nav"]):not([class*="menu"])', _class_rule('item', 'nav', 'menu')),
+    # 基于数据属性的规则
+    ContainerRule('[data-post-id]', _attr_rule('data-post-id')),
+    ContainerRule('[data-topic-id]', _attr_rule('data-topic-id')),
+    ContainerRule('[data-thread-id]', _attr_rule('data-thread-id')),
+    # 结构化规则
+    ContainerRule('article[id*="post"]', _id_rule('article', 'post')),
+    ContainerRule('div[id*="post"]', _id_rule('div', 'post')),
+    ContainerRule('li[id*="post"]', _id_rule('li', 'post')),
+]
+
+
+def find_post_containers(soup, limit: int = 10) -> Tuple[List, Dict[str, int]]:
+    """单次遍历DOM查找帖子容器
+
+    与逐条执行选择器的行为一致：按规则优先级累加命中的元素，
+    累计数量达到 limit 后不再采用后续规则。返回按文档顺序去重后的
+    容器列表，以及每条规则的命中数。
+    """
+    rule_matches: List[List[int]] = [[] for _ in CONTAINER_RULES]
+    elements = soup.find_all(True)
+
+    for position, element in enumerate(elements):
+        attrs = element.attrs
+        classes = attrs.get('class', '')
+        if not isinstance(classes, str):
+            classes = ' '.join(classes)
+        element_id = attrs.get('id', '')
+        if not isinstance(element_id, str):
+            element_id = ' '.join(element_id)
+
+        for rule_index, rule in enumerate(CONTAINER_RULES):
+            if rule.matches(element.name, classes, element_id, attrs):
+                rule_matches[rule_index].append(position)
+
+    hits = {rule.selector: len(matched) for rule, matched in zip(CONTAINER_RULES, rule_matches)}
+
+    selected = set()
+    total = 0
+    for matched in rule_matches:
+        if not matched:
+            continue
+        selected.update(matched)
+        total += len(matched)
+        if total >= limit:
+            break
+
+    return [elements[position] for position in sorted(selected)], hits
+
+
+def _region_end(html: str, tag: str, start: int) -> int:
+    """从开始标签之后查找与之配对的结束标签位置"""
+    depth = 1
+    for boundary in _TAG_BOUNDARY_RES[tag].finditer(html, start):
+        if boundary.group(1):
+            depth -= 1
+            if depth == 0:
+                return boundary.end()
+        elif not boundary.group(2):
+            depth += 1
+    return len(html)
+
+
+def slice_posts_region(html: str) -> Optional[str]:
+    """从原始HTML中截取所有帖子列表区域
+
+    只截取最外层的区域，嵌套在已截取区域中的匹配会被跳过。
+    页面中没有帖子列表区域时返回 None。
+    """
+    regions = []
+    position = 0
+    for match in _REGION_OPEN_RE.finditer(html):
+        if match.start() < position:
+            continue
+        classes = match.group(2) if match.group(2) is not None else match.group(3)
+        if not POSTS_REGION_CLASS_RE.search(classes):
+            continue
+        end = _region_end(html, match.group(1).lower(), match.end())
+        regions.append(html[match.start():end])
+        position = end
+    return '\n'.join(regions) if regions else None
+
+
+def parse_measured(backend, html: str) -> Tuple[object, int, int]:
+    """解析HTML并返回 (文档, DOM元素数, 解析过程中的内存峰值字节数)"""
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    try:
+        document = backend.parse(html)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+
+    if backend.builds_tree:
+        nodes = len(document.find_all(True))
+    else:
+        nodes = len(backend.links(document))
+    return document, nodes, peak - baseline
+
+
+def measure_parse(backend, html: str) -> Tuple[int, int]:
+    """解析HTML并返回 (DOM元素数, 解析过程中的内存峰值字节数)"""
+    _, nodes, used = parse_measured(backend, html)
+    return nodes, used
+
+
+_filter_engines: Dict[Tuple[str, ...], FilterEngine] = {}
+
+
+def get_filter_engine(excluded_keywords: Sequence[str] = ()) -> FilterEngine:
+    """获取过滤引擎，同一组排除关键词在每个进程中只编译一次"""
+    key = tuple(str(k) for k in excluded_keywords or ())
+    engine = _filter_engines.get(key)
+    if engine is None:
+        # 关键词变化后旧引擎不会再用到，只保留当前版本
+        _filter_engines.clear()
+        engine = _filter_engines[key] = FilterEngine(key)
+    return engine
+
+
+def normalize_url(href: str, base_url: str = SITE_URL + '/forum/') -> str:
+    """把相对链接补全为完整URL"""
+    if href.startswith('http'):
+        return href
+    return urljoin(base_url, href)
+
+
+def detect_spa(html: str) -> str:
+    """在原始HTML上用单个正则检测单页应用框架
+
+    检测到 Nuxt 特征时立即返回 ``'nuxt'``；其他框架返回最先出现的框架名，
+    不是单页应用时返回空字符串。
+    """
+    framework = ''
+    for match in SPA_INDICATOR_RE.finditer(html):
+        found = SPA_INDICATORS[match.group(0).lower()]
+        if found == 'nuxt':
+            return found
+        framework = framework or found
+    return framework
+
+
+def is_only_navigation_content(text: str) -> bool:
+    """检查文本是否只包含导航/按钮内容"""
+    return bool(NAVIGATION_CONTENT_RE.search(re.sub(r'\s+', '', text)))
+
+
+def is_posts_container_empty(soup) -> bool:
+    """检查帖子容器是否为空"""
+    posts_containers = soup.find_all(list(REGION_TAGS), class_=POSTS_REGION_CLASS_RE)
+    if not posts_containers:
+        return True
+
+    for container in posts_containers:
+        # 获取容器内的文本内容（排除HTML标签）
+        text_content = container.get_text(strip=True)
+
+        # 如果容器有意义的文本内容，说明不为空，但要排除只包含导航/按钮文字的情况
+        if text_content and len(text_content) > 10 and not is_only_navigation_content(text_content):
+            return False
+
+    return True
+
+
+def looks_like_post_link(link, engine: FilterEngine) -> bool:
+    """判断链接是否看起来像帖子链接"""
+    href = link.get('href', '')
+    title = link.get_text(strip=True)
+
+    return bool(
+        POST_URL_RE.search(href)
+        and title
+        and 5 < len(title) < 200
+        and not engine.is_button_text(title)
+    )
+
+
+def extract_post_from_container(container, engine: FilterEngine,
+                                base_url: str = SITE_URL + '/forum/') -> Optional[Dict]:
+    """从容器中提取帖子信息"""
+    # 优先查找明确的标题链接
+    title_link = None
+    for selector in TITLE_SELECTORS:
+        link = container.select_one(selector)
+        if link and link.get('href'):
+            title_link = link
+            break
+
+    # 如果没找到，查找第一个有效链接
+    if not title_link:
+        for link in container.find_all('a', href=True):
+            if looks_like_post_link(link, engine):
+                title_link = link
+                break
+
+    if not title_link:
+        return None
+
+    href = normalize_url(title_link.get('href'), base_url)
+    post_data = {
+        'title': title_link.get_text(strip=True),
+        'url': href,
+        'id': href,
+        'container_class': container.get('class', []),
+        'container_id': container.get('id', ''),
+    }
+
+    # 尝试提取发布时间
+    time_element = container.select_one(TIME_SELECTOR)
+    if time_element:
+        post_data['timestamp'] = time_element.get_text(strip=True)
+
+    return post_data
+
+
+def extract_posts_from_links(links, engine: FilterEngine, base_url: str = SITE_URL + '/forum/') -> List[Dict]:
+    """从链接列表中提取疑似帖子"""
+    posts = []
+    for link in links:
+        if looks_like_post_link(link, engine):
+            href = normalize_url(link.get('href'), base_url)
+            posts.append({
+                'title': link.get_text(strip=True),
+                'url': href,
+                'id': href,
+                'link_class': link.get('class', []),
+                'parent_class': link.parent.get('class', []) if link.parent else [],
+            })
+    return posts
+
+
+def is_valid_post(post_data: Dict, min_length: int = 5, max_length: int = 200) -> bool:
+    """验证是否为有效帖子"""
+    if not post_data:
+        return False
+
+    title = post_data.get('title', '')
+    url = post_data.get('url', '')
+
+    return bool(title and url
+                and min_length <= len(title) <= max_length
+                and url.startswith('http'))
+
+
+def deduplicate_posts(posts: List[Dict]) -> List[Dict]:
+    """按URL和标题去重"""
+    seen_urls = set()
+    seen_titles = set()
+    unique_posts = []
+
+    for post in posts:
+        url = post['url']
+        # 基于标题去重（处理相同标题不同URL的情况）
+        title_normalized = post['title'].lower().strip()
+        if url in seen_urls or title_normalized in seen_titles:
+            continue
+
+        seen_urls.add(url)
+        seen_titles.add(title_normalized)
+        unique_posts.append(post)
+
+    return unique_posts
+
+
+def filter_posts(posts: List[Dict], engine: FilterEngine, min_length: int, max_length: int) -> List[Dict]:
+    """过滤、验证并去重帖子"""
+    verdicts = engine.classify([post.get('title', '') for post in posts])
+    filtered_posts = [
+        post for post, verdict in zip(posts, verdicts)
+        if is_valid_post(post, min_length, max_length) and not verdict.is_excluded
+    ]
+    return deduplicate_posts(filtered_posts)
+
+
+def extract_forum_posts(html: str, options: Optional[Dict] = None, spa_framework: Optional[str] = None) -> Dict:
+    """把论坛页面HTML转换为过滤去重后的帖子列表
+
+    options 的键与插件配置项同名，缺省值见 DEFAULT_OPTIONS。spa_framework 为
+    :func:`detect_spa` 的结果，用于选择提取方式：已知不是 Nuxt 页面时跳过负载
+    解析；为 None 表示未检测，按 extraction_mode 依次尝试。返回
+    ``{'posts': [...], 'stats': {...}}``，stats 记录提取来源、使用的解析后端、
+    容器规则命中数等信息，由调用方负责输出日志。
+    """
+    started = time.perf_counter()
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    engine = get_filter_engine(options['excluded_keywords'])
+    min_length = options['min_title_length']
+    # 用于验证的最大长度比显示长度更长
+    max_length = options['max_title_length'] * 4
+    stats: Dict = {'source': None, 'backend': None, 'spa': spa_framework}
+
+    def finish(posts: List[Dict]) -> Dict:
+        stats['candidates'] = len(posts)
+        posts = filter_posts(posts, engine, min_length, max_length)
+        stats['posts'] = len(posts)
+        stats['elapsed_ms'] = (time.perf_counter() - started) * 1000
+        return {'posts': posts, 'stats': stats}
+
+    # 优先直接解析Nuxt负载，无需构建DOM
+    mode = options['extraction_mode']
+    if mode == 'nuxt' or (mode == 'auto' and spa_framework in (None, 'nuxt')):
+        payload_posts = nuxt_payload.extract_posts(html, options['nuxt_post_url_template'],
+                                                   options['base_url'])
+        stats['nuxt_payload'] = payload_posts is not None
+        if payload_posts:
+            stats['source'] = 'nuxt'
+            return finish(payload_posts)
+        if mode == 'nuxt':
+            return finish([])
+
+    backend = get_backend(options['html_parser'])
+    stats['backend'] = backend.name
+
+    # 只为帖子列表区域构建DOM，跳过脚本、样式和导航等无关内容
+    region_html = slice_posts_region(html) if options['partial_parse'] else None
+    stats['partial'] = region_html is not None
+    if options['debug_mode']:
+        # 调试模式下实际解析整页作对比，统计真实的DOM元素数和解析内存峰值
+        document, region_nodes, region_bytes = parse_measured(
+            backend, region_html if region_html is not None else html)
+        full_nodes, full_bytes = (measure_parse(backend, html) if region_html is not None
+                                  else (region_nodes, region_bytes))
+        stats['partial_parse'] = {
+            'full_chars': len(html),
+            'region_chars': len(region_html if region_html is not None else html),
+            'full_nodes': full_nodes,
+            'region_nodes': region_nodes,
+            'full_bytes': full_bytes,
+            'region_bytes': region_bytes,
+        }
+    else:
+        document = backend.parse(region_html if region_html is not None else html)
+
+    # 不构建DOM的轻量后端只能使用通用链接提取
+    if not backend.builds_tree:
+        stats['source'] = 'links'
+        return finish(extract_posts_from_links(backend.links(document), engine, options['base_url']))
+
+    soup = document
+
+    # 首先检查帖子容器是否为空
+    if is_posts_container_empty(soup):
+        stats['empty_container'] = True
+        return finish([])
+
+    # 1. 尝试查找明确的帖子容器
+    containers, stats['rule_hits'] = find_post_containers(soup)
+    stats['containers'] = len(containers)
+    posts = []
+    for container in containers:
+        post_data = extract_post_from_container(container, engine, options['base_url'])
+        if post_data and is_valid_post(post_data, min_length, max_length):
+            posts.append(post_data)
+    stats['source'] = 'containers'
+
+    # 2. 如果没有找到明确的容器，使用通用方法
+    if not posts:
+        stats['source'] = 'generic'
+        posts = extract_posts_from_links(backend.links(soup), engine, options['base_url'])
+
+    return finish(posts)
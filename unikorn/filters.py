@@ -0,0 +1,148 @@
+"""帖子标题过滤引擎
+
+把按钮文本识别和排除规则预编译成少量正则：所有精确匹配模式合并为一个
+锚定的分支表达式，默认的英文按钮关键词合并为一个按整词匹配的正则，其余
+关键词构建为一个 Aho-Corasick 关键词索引。引擎只依赖用户配置的排除关键词，
+关键词不变时可以一直复用。
+"""
+
+import re
+from typing import List, NamedTuple, Sequence, Tuple
+
+from .keyword_index import KeywordIndex
+
+# 精确匹配的按钮文本（完全匹配，不含锚点）
+BUTTON_EXACT_PATTERNS = [
+    # 发帖相关
+    r'我要发帖', r'发布帖子', r'新建帖子', r'创建帖子', r'写帖子', r'发帖',
+    # 用户操作
+    r'登录', r'注册', r'退出', r'登出', r'注销',
+    # 导航按钮
+    r'首页', r'主页', r'返回', r'上一页', r'下一页', r'末页', r'尾页',
+    # 分页相关
+    r'第\s*\d+\s*页', r'共\s*\d+\s*页', r'页码\s*\d+',
+    # 功能按钮
+    r'搜索', r'查找', r'筛选', r'过滤', r'排序', r'切换',
+    r'展开', r'收起', r'更多', r'详情', r'查看',
+    # 表单按钮
+    r'提交', r'确定', r'取消', r'重置', r'保存', r'删除',
+    r'编辑', r'修改', r'添加', r'新增',
+    # 英文按钮
+    r'post', r'new post', r'create', r'login', r'register',
+    r'search', r'more', r'next', r'prev', r'home',
+]
+
+# 默认包含关键词（更保守的策略，避免误判正常帖子）
+DEFAULT_BUTTON_KEYWORDS = [
+    '回复', '编辑', '删除', '举报', '点赞', '收藏',
+    '提交', '确定', '取消', '关闭',
+    'reply', 'edit', 'delete', 'report', 'like', 'save',
+    'submit', 'ok', 'cancel', 'close',
+]
+
+# 英文按钮关键词按整个单词匹配，避免 "Looking" 中的 "ok" 这类误判；
+# 中文没有词边界，仍按子串匹配
+BUTTON_WORD_RE = re.compile(
+    r'(?<![a-z])(?:' + '|'.join(re.escape(k) for k in DEFAULT_BUTTON_KEYWORDS if k.isascii()) + r')(?![a-z])',
+    re.IGNORECASE)
+
+# 严格匹配的排除模式（避免误判正常帖子）
+STRICT_EXCLUSION_PATTERNS = [
+    # 导航类（完全匹配）
+    r'^(首页|主页|上一页|下一页|末页|尾页)$',
+    # 分页类
+    r'^(第\s*\d+\s*页|共\s*\d+\s*页|页码).*$',
+    # 功能类（完全匹配）
+    r'^(登录|注册|搜索|筛选|排序|设置|帮助|关于我们|联系我们)$',
+    r'^(排序方式|筛选条件|搜索结果).*$',
+    # 菜单类
+    r'^(菜单|导航|面包屑).*$',
+]
+
+# 帖子链接的URL特征
+POST_URL_RE = re.compile(
+    r'/post/|/topic/|/thread/|/discussion/|/p/|/t/|/d/|/forum/|/\d+/|id=\d+|tid=\d+|pid=\d+')
+
+# 纯数字、符号或单字符
+TRIVIAL_TEXT_RE = re.compile(r'^[\d\s\-_\+\.]+$|^.$')
+
+
+class TitleVerdict(NamedTuple):
+    """单个标题的过滤结果"""
+    is_button: bool
+    is_excluded: bool
+
+
+# 关键词索引中的标签：所有关键词都用于识别按钮，用户关键词同时用于排除内容
+TAG_BUTTON = 1
+TAG_EXCLUDED = 2
+
+
+class FilterEngine:
+    """预编译的标题过滤引擎"""
+
+    def __init__(self, excluded_keywords: Sequence[str] = ()):
+        self.excluded_keywords: Tuple[str, ...] = tuple(str(k) for k in excluded_keywords)
+
+        self._button_exact = re.compile(
+            '^(?:' + '|'.join(BUTTON_EXACT_PATTERNS) + ')$', re.IGNORECASE)
+        self._strict_exclusion = re.compile(
+            '|'.join(f'(?:{p})' for p in STRICT_EXCLUSION_PATTERNS), re.IGNORECASE)
+        self._keywords = KeywordIndex()
+        for keyword in DEFAULT_BUTTON_KEYWORDS:
+            if not keyword.isascii():
+                self._keywords.add(keyword, TAG_BUTTON)
+        for keyword in self.excluded_keywords:
+            self._keywords.add(keyword, TAG_BUTTON | TAG_EXCLUDED)
+        self._keywords.build()
+
+    def is_button_text(self, text: str) -> bool:
+        """判断文本是否为按钮文本"""
+        if not text:
+            return True
+        text_clean = text.strip()
+        if len(text_clean) < 2:
+            return True
+
+        if self._button_exact.match(text_clean):
+            return True
+        if self._keywords.match_tags(text_clean, stop_on=TAG_BUTTON):
+            return True
+        if BUTTON_WORD_RE.search(text_clean):
+            return True
+        return bool(TRIVIAL_TEXT_RE.match(text_clean))
+
+    def is_excluded_content(self, text: str) -> bool:
+        """检查内容是否应被排除"""
+        if not text:
+            return True
+        text_clean = text.strip()
+
+        if self._strict_exclusion.search(text_clean):
+            return True
+        return bool(self._keywords.match_tags(text_clean, stop_on=TAG_EXCLUDED))
+
+    def classify(self, titles: Sequence[str]) -> List[TitleVerdict]:
+        """一次性判定整页标题，返回与输入顺序一致的结果
+
+        每个标题只扫描一遍关键词索引，同时得到按钮和排除两类结果。
+        """
+        verdicts = []
+        for title in titles:
+            if not title:
+                verdicts.append(TitleVerdict(True, True))
+                continue
+            text_clean = title.strip()
+            if not text_clean:
+                verdicts.append(TitleVerdict(True, False))
+                continue
+
+            tags = self._keywords.match_tags(text_clean)
+            is_button = (len(text_clean) < 2
+                         or bool(self._button_exact.match(text_clean))
+                         or bool(tags & TAG_BUTTON)
+                         or bool(BUTTON_WORD_RE.search(text_clean))
+                         or bool(TRIVIAL_TEXT_RE.match(text_clean)))
+            is_excluded = bool(self._strict_exclusion.search(text_clean)) or bool(tags & TAG_EXCLUDED)
+            verdicts.append(TitleVerdict(is_button, is_excluded))
+        return verdicts
@@ -0,0 +1,270 @@
+"""内存映射的已知帖子哈希表
+
+每个帖子只保存其规范化ID的64位哈希，按哈希排序后写入二进制文件，并以只读
+方式内存映射；成员查询在映射的数组上二分查找，只会访问到少量页面。启动时不
+需要解析JSON，常驻内存从每个URL字符串数百字节降到每个帖子8字节。
+
+新增的帖子先放在内存中的增量表里，保存时追加到增量日志文件，写入量只与新帖子
+数量有关；增量达到阈值时再合并进主文件，合并时按数量上限和保留时长
+淘汰旧记录。每个哈希另有一个32位时间戳，只在淘汰和 lru 刷新时读取；fifo 模式
+下帖子再次出现的时间只记录在内存中，合并时最近仍在页面上的帖子暂不淘汰。
+
+主文件格式（小端序）::
+
+    magic(4) version(u32) count(u64) hashes(u64 * count) timestamps(u32 * count)
+
+增量日志由 ``hash(u64) timestamp(u32)`` 记录依次追加而成。
+"""
+
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, Optional
+
+from .seen_store import EVICTION_POLICIES, SeenStore, post_hash
+
+MAGIC = b'UKSH'
+VERSION = 1
+HEADER = struct.Struct('<4sIQ')
+DELTA_RECORD = struct.Struct('<QI')
+
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+class HashSeenStore:
+    """排序哈希数组（内存映射）加内存增量表的已知帖子存储"""
+
+    def __init__(self, path: str, max_size: int = 5000, max_age: float = 0, policy: str = "lru",
+                 refresh_interval: float = 3600, merge_threshold: int = 1000):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"未知的淘汰策略: {policy}")
+        self.path = path
+        self.delta_path = path + '.delta'
+        self.max_size = max(0, int(max_size))
+        self.max_age = max(0, max_age)
+        self.policy = policy
+        self.refresh_interval = refresh_interval
+        self.merge_threshold = merge_threshold
+        self.evicted = 0
+        self.merges = 0
+        self._opened = False
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._hashes = ()
+        self._stamps = ()
+        # 哈希 -> 时间戳；包括新帖子和 lru 刷新
+        self._delta: Dict[int, int] = {}
+        # 尚未追加到增量日志的记录
+        self._unlogged: Dict[int, int] = {}
+        # fifo 模式下帖子最近一次出现在页面上的时间
+        self._last_seen: Dict[int, int] = {}
+
+    def _open(self):
+        """映射主文件并读取增量日志，首次访问时执行"""
+        if self._opened:
+            return
+        self._opened = True
+        self._map_main()
+        if os.path.exists(self.delta_path):
+            with open(self.delta_path, 'rb') as f:
+                data = f.read()
+            # 忽略写入中断留下的不完整记录
+            usable = len(data) - len(data) % DELTA_RECORD.size
+            for value, stamp in DELTA_RECORD.iter_unpack(data[:usable]):
+                self._delta[value] = stamp
+
+    def _map_main(self):
+        self._unmap()
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER.size:
+            return
+        self._file = open(self.path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._unmap()
+            raise ValueError(f"无法识别的哈希文件: {self.path}")
+        view = memoryview(self._mmap)
+        hashes_end = HEADER.size + count * 8
+        if sys.byteorder == 'little':
+            self._hashes = view[HEADER.size:hashes_end].cast('Q')
+            self._stamps = view[hashes_end:hashes_end + count * 4].cast('I')
+        else:
+            self._hashes = _little_endian(array('Q', view[HEADER.size:hashes_end]))
+            self._stamps = _little_endian(array('I', view[hashes_end:hashes_end + count * 4]))
+
+    def _unmap(self):
+        if isinstance(self._hashes, memoryview):
+            self._hashes.release()
+            self._stamps.release()
+        self._hashes = ()
+        self._stamps = ()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _index(self, value: int) -> int:
+        """在主文件中二分查找哈希，不存在时返回 -1"""
+        index = bisect_left(self._hashes, value)
+        if index < len(self._hashes) and self._hashes[index] == value:
+            return index
+        return -1
+
+    def _stamp(self, value: int) -> Optional[int]:
+        if value in self._delta:
+            return self._delta[value]
+        index = self._index(value)
+        return self._stamps[index] if index >= 0 else None
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._unlogged)
+
+    @property
+    def pending(self) -> int:
+        """尚未合并进主文件的记录数"""
+        return len(self._delta)
+
+    def __contains__(self, post_id: str) -> bool:
+        self._open()
+        value = post_hash(post_id)
+        return value in self._delta or self._index(value) >= 0
+
+    def __len__(self) -> int:
+        self._open()
+        return len(self._hashes) + sum(1 for value in self._delta if self._index(value) < 0)
+
+    def first_seen(self, post_id: str) -> Optional[float]:
+        self._open()
+        return self._stamp(post_hash(post_id))
+
+    def add(self, post_id: str, now: Optional[float] = None, record: Optional[Dict] = None) -> bool:
+        """记录新帖子，返回是否为新记录；已存在时等同于 :meth:`touch`"""
+        if post_id in self:
+            self.touch(post_id, now)
+            return False
+        value = post_hash(post_id)
+        stamp = int(time.time() if now is None else now)
+        self._delta[value] = self._unlogged[value] = stamp
+        return True
+
+    def touch(self, post_id: str, now: Optional[float] = None):
+        """帖子再次出现在页面上；lru 模式下刷新其时间戳，fifo 模式下只记录出现时间"""
+        self._open()
+        value = post_hash(post_id)
+        stamp = self._stamp(value)
+        now = int(time.time() if now is None else now)
+        if stamp is None:
+            return
+        if self.policy == "fifo":
+            self._last_seen[value] = now
+        elif now - stamp >= self.refresh_interval:
+            self._delta[value] = self._unlogged[value] = now
+
+    def hashes(self) -> Iterator[int]:
+        """返回所有帖子ID的64位哈希"""
+        self._open()
+        yield from (value for value in self._hashes if value not in self._delta)
+        yield from list(self._delta)
+
+    def mark_notified(self, post_id: str, groups: Iterable[str]):
+        """记录帖子已推送到的群；本存储只保存哈希，不保存推送历史"""
+
+    def flush(self) -> int:
+        """把新记录追加到增量日志，增量达到阈值时合并进主文件；返回写入的记录数"""
+        self._open()
+        written = len(self._unlogged)
+        if self._unlogged:
+            with open(self.delta_path, 'ab') as f:
+                f.write(b''.join(DELTA_RECORD.pack(value, stamp) for value, stamp in self._unlogged.items()))
+                f.flush()
+                os.fsync(f.fileno())
+            self._unlogged.clear()
+        if len(self._delta) >= self.merge_threshold:
+            self.merge()
+        return written
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """淘汰需要重写主文件，在 :meth:`flush` 合并增量时进行；这里不写入，返回 0"""
+        return 0
+
+    def merge(self, now: Optional[float] = None) -> int:
+        """把增量合并进主文件并淘汰旧记录，返回淘汰的数量"""
+        self._open()
+        entries = dict(zip(self._hashes, self._stamps))
+        entries.update(self._delta)
+        total = len(entries)
+
+        now = time.time() if now is None else now
+        # 最近仍在页面上的帖子（只在 fifo 模式下记录）暂不淘汰
+        recent = now - 2 * self.refresh_interval
+        self._last_seen = {value: stamp for value, stamp in self._last_seen.items()
+                           if value in entries and stamp >= recent}
+        if self.max_age:
+            deadline = now - self.max_age
+            entries = {value: stamp for value, stamp in entries.items()
+                       if stamp >= deadline or value in self._last_seen}
+        if self.max_size and len(entries) > self.max_size:
+            newest = sorted(entries.items(), key=lambda entry: (entry[0] in self._last_seen, entry[1]))
+            entries = dict(newest[-self.max_size:])
+
+        ordered = sorted(entries.items())
+        hashes = _little_endian(array('Q', (value for value, _ in ordered)))
+        stamps = _little_endian(array('I', (stamp for _, stamp in ordered)))
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(ordered)))
+            f.write(hashes.tobytes())
+            f.write(stamps.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self._unmap()
+        os.replace(temp_path, self.path)
+        # 未写入日志的记录已包含在主文件中
+        self._delta.clear()
+        self._unlogged.clear()
+        if os.path.exists(self.delta_path):
+            os.remove(self.delta_path)
+        self._map_main()
+
+        removed = total - len(ordered)
+        self.evicted += removed
+        self.merges += 1
+        return removed
+
+    def needs_json_import(self) -> bool:
+        """主文件和增量日志都为空时才需要导入JSON数据文件，调用方据此决定是否读取该文件"""
+        self._open()
+        return self._mmap is None and not self._delta
+
+    def import_json_data(self, data: Dict, now: Optional[float] = None) -> int:
+        """主文件不存在时导入JSON数据文件中的记录，返回导入的记录数"""
+        if not self.needs_json_import():
+            return 0
+        legacy = SeenStore(max_size=0, policy=self.policy)
+        legacy.load_json_data(data, now)
+        for post_id, stamp in legacy.items():
+            self._delta[post_hash(post_id)] = int(stamp)
+        imported = len(self._delta)
+        self.merge(now)
+        return imported
+
+    def close(self):
+        """写入增量日志并释放内存映射"""
+        if not self._opened:
+            return
+        self.flush()
+        self._unmap()
+        self._delta.clear()
+        self._opened = False
@@ -0,0 +1,100 @@
+"""Aho-Corasick 关键词索引
+
+把任意数量的关键词构建成一个自动机，对文本只扫描一遍即可找出命中的关键词，
+匹配耗时只与文本长度有关，不随关键词数量增长。关键词和文本都先做
+casefold，按Unicode码点逐字匹配，中文等CJK文本无需分词。
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+class KeywordIndex:
+    """带标签的多关键词匹配自动机
+
+    每个关键词携带一个整数位掩码标签，匹配时返回文本中所有命中关键词的
+    标签按位或的结果，调用方可以据此区分不同来源的关键词。
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[int] = [0]
+        self._built = True
+        self.all_tags = 0
+        self.size = 0
+
+    def add(self, keyword: str, tag: int = 1):
+        """添加关键词，空关键词会被忽略"""
+        keyword = keyword.casefold()
+        if not keyword:
+            return
+
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(0)
+                self._goto[state][char] = next_state
+            state = next_state
+
+        if not self._out[state]:
+            self.size += 1
+        self._out[state] |= tag
+        self.all_tags |= tag
+        self._built = False
+
+    def build(self):
+        """按广度优先计算失败指针，并把输出标签沿失败指针合并"""
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._out[next_state] |= self._out[self._fail[next_state]]
+                queue.append(next_state)
+
+        self._built = True
+
+    def match_tags(self, text: str, stop_on: Optional[int] = None) -> int:
+        """返回文本中命中关键词的标签并集，没有命中时为0
+
+        stop_on 指定后，一旦命中其中任一标签立即停止扫描；
+        否则在所有标签都已命中时停止。
+        """
+        if not self._built:
+            self.build()
+
+        goto, fail, out = self._goto, self._fail, self._out
+        all_tags = self.all_tags
+        state = 0
+        found = 0
+        for char in text.casefold():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found |= out[state]
+                if (found & stop_on) if stop_on else found == all_tags:
+                    break
+        return found
+
+    def __contains__(self, text: str) -> bool:
+        return bool(self.match_tags(text, stop_on=self.all_tags))
+
+    @classmethod
+    def from_keywords(cls, keywords: Iterable[str], tag: int = 1) -> "KeywordIndex":
+        index = cls()
+        for keyword in keywords:
+            index.add(keyword, tag)
+        index.build()
+        return index
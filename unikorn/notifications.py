@@ -0,0 +1,151 @@
+"""新帖子通知消息的构造
+
+每轮检查发现的新帖子按群生成推送计划：
+
+- ``individual``: 每个帖子一条消息
+- ``digest``: 所有新帖子合并为一条摘要消息，帖子数或长度超出上限时拆分为多条，
+  消息条数超出上限时，剩余的帖子只在最后一条消息中注明数量
+
+推送模式可以按群单独配置，格式为 ``群号:模式``。一个群本轮的新帖子达到
+``forward_threshold`` 个时，不论推送模式，都改为合并转发消息，每个帖子是其中
+的一个节点；不支持合并转发时发送消息的 ``text``。
+
+消息标题中的论坛名称和摘要中的论坛链接由 ``forum_name`` 和 ``forum_url`` 指定，
+额外的监控来源使用各自的名称和页面链接。
+"""
+
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+NOTIFICATION_MODES = ("individual", "digest")
+FORUM_NAME = "Unikorn论坛"
+FORUM_URL = "https://unikorn.axfff.com/forum"
+
+
+class Notification(NamedTuple):
+    """一条待发送的消息及其包含的帖子
+
+    nodes 不为空时是合并转发消息，每个元素是一个节点的内容；text 是不支持
+    合并转发时发送的完整摘要。
+    """
+    text: str
+    posts: List[Dict]
+    nodes: Optional[List[str]] = None
+
+    @property
+    def is_forward(self) -> bool:
+        return bool(self.nodes)
+
+
+def shorten_title(title: str, max_length: int) -> str:
+    if len(title) > max_length:
+        return title[:max_length] + "..."
+    return title
+
+
+def format_individual(post: Dict, max_title_length: int = 50, forum_name: str = FORUM_NAME) -> str:
+    """单个帖子的通知消息"""
+    return f"🆕 {forum_name}新帖子\n\n📝 {shorten_title(post['title'], max_title_length)}\n🔗 {post['url']}"
+
+
+def _digest_entry(index: int, post: Dict, max_title_length: int) -> str:
+    return f"{index}. 📝 {shorten_title(post['title'], max_title_length)}\n🔗 {post['url']}"
+
+
+def build_digest(posts: List[Dict], max_title_length: int = 50, max_posts: int = 10,
+                 max_length: int = 1500, max_messages: int = 3, forum_name: str = FORUM_NAME,
+                 forum_url: str = FORUM_URL) -> List[Notification]:
+    """把新帖子合并为摘要消息
+
+    每条消息最多 max_posts 个帖子、约 max_length 个字符（单个帖子超长时仍单独
+    成条）；最多 max_messages 条，超出的帖子不展开，只在最后一条消息中注明数量，
+    这些帖子同样计入最后一条消息的 posts。
+    """
+    max_posts = max(1, max_posts)
+    max_messages = max(1, max_messages)
+    total = len(posts)
+
+    # 先按帖子数和长度分组
+    batches: List[List[str]] = []
+    batch_posts: List[List[Dict]] = []
+    length = 0
+    for index, post in enumerate(posts, 1):
+        entry = _digest_entry(index, post, max_title_length)
+        if (not batches or len(batch_posts[-1]) >= max_posts
+                or (length + len(entry) + 2 > max_length and batch_posts[-1])):
+            if len(batches) == max_messages:
+                batch_posts[-1].extend(posts[index - 1:])
+                break
+            batches.append([])
+            batch_posts.append([])
+            length = 0
+        batches[-1].append(entry)
+        batch_posts[-1].append(post)
+        length += len(entry) + 2
+
+    notifications = []
+    for number, (entries, included) in enumerate(zip(batches, batch_posts), 1):
+        header = f"🆕 {forum_name}新帖子（共 {total} 个）"
+        if len(batches) > 1:
+            header += f" {number}/{len(batches)}"
+        body = "\n\n".join(entries)
+        omitted = len(included) - len(entries)
+        if omitted:
+            body += f"\n\n…还有 {omitted} 个新帖子，请前往论坛查看：{forum_url}"
+        notifications.append(Notification(f"{header}\n\n{body}", included))
+    return notifications
+
+
+def build_forward(posts: List[Dict], max_title_length: int = 50, max_nodes: int = 50,
+                  forum_name: str = FORUM_NAME, forum_url: str = FORUM_URL) -> List[Notification]:
+    """把新帖子合并为转发消息，每个帖子一个节点，每条消息最多 max_nodes 个节点"""
+    max_nodes = max(1, max_nodes)
+    notifications = []
+    for start in range(0, len(posts), max_nodes):
+        chunk = posts[start:start + max_nodes]
+        nodes = [format_individual(post, max_title_length, forum_name) for post in chunk]
+        # 退回普通消息时不限制长度，保证每个帖子都出现在消息中
+        text = build_digest(chunk, max_title_length, max_posts=len(chunk), max_length=sys.maxsize,
+                            max_messages=1, forum_name=forum_name, forum_url=forum_url)[0].text
+        notifications.append(Notification(text, chunk, nodes))
+    return notifications
+
+
+def parse_group_modes(entries: Iterable[str]) -> Dict[str, str]:
+    """解析 ``群号:模式`` 形式的按群配置，忽略格式错误的项"""
+    modes = {}
+    for entry in entries or []:
+        group_id, _, mode = str(entry).partition(':')
+        group_id, mode = group_id.strip(), mode.strip().lower()
+        if group_id and mode in NOTIFICATION_MODES:
+            modes[group_id] = mode
+    return modes
+
+
+def plan_notifications(posts: List[Dict], groups: Iterable, default_mode: str = "individual",
+                       group_modes: Optional[Dict[str, str]] = None, max_title_length: int = 50,
+                       digest_max_posts: int = 10, digest_max_length: int = 1500,
+                       digest_max_messages: int = 3, forward_threshold: int = 0,
+                       forward_max_nodes: int = 50, forum_name: str = FORUM_NAME,
+                       forum_url: str = FORUM_URL) -> Dict[str, List[Notification]]:
+    """为每个群生成本轮要发送的消息；forward_threshold 为0时不使用合并转发"""
+    group_modes = group_modes or {}
+    individual = None
+    digest = None
+    plan = {}
+    if 0 < forward_threshold <= len(posts):
+        forward = build_forward(posts, max_title_length, forward_max_nodes, forum_name, forum_url)
+        return {group_id: forward for group_id in groups}
+    for group_id in groups:
+        mode = group_modes.get(str(group_id), default_mode)
+        if mode == "digest":
+            if digest is None:
+                digest = build_digest(posts, max_title_length, digest_max_posts, digest_max_length,
+                                      digest_max_messages, forum_name, forum_url)
+            plan[group_id] = digest
+        else:
+            if individual is None:
+                individual = [Notification(format_individual(post, max_title_length, forum_name), [post])
+                              for post in posts]
+            plan[group_id] = individual
+    return plan
@@ -0,0 +1,255 @@
+"""Nuxt ``__NUXT_DATA__`` 负载解析
+
+Nuxt 3 使用 devalue 格式把服务端数据序列化进页面：整个负载是一个扁平的
+JSON数组，第0项为根节点，对象和数组中的值都是指向数组下标的整数引用。
+这里直接把负载还原成Python对象并从中提取帖子记录，不需要构建DOM。
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+from .filters import POST_URL_RE
+
+NUXT_DATA_RE = re.compile(
+    r'<script\b[^>]*\bid=["\']__NUXT_DATA__["\'][^>]*>(.*?)</script\s*>',
+    re.I | re.S,
+)
+
+# devalue 用负数表示的特殊值
+_UNDEFINED = -1
+_HOLE = -2
+_SPECIAL_NUMBERS = {
+    -3: float('nan'),
+    -4: float('inf'),
+    -5: float('-inf'),
+    -6: -0.0,
+}
+
+# Vue 响应式包装，还原时直接取内部的值
+_WRAPPER_TYPES = {'Reactive', 'ShallowReactive', 'Ref', 'ShallowRef'}
+
+ID_FIELDS = ('id', 'post_id', 'postId', '_id', 'pid', 'tid')
+TITLE_FIELDS = ('title', 'subject', 'topic_title', 'topicTitle')
+AUTHOR_FIELDS = ('author', 'user', 'creator', 'poster', 'author_name', 'authorName', 'username', 'nickname')
+AUTHOR_NAME_FIELDS = ('username', 'nickname', 'name', 'display_name', 'displayName')
+TIME_FIELDS = ('created_at', 'createdAt', 'create_time', 'createTime',
+               'published_at', 'publishedAt', 'publish_time', 'time', 'date')
+
+URL_FIELDS = ('url', 'href', 'link', 'path', 'permalink')
+
+DEFAULT_URL_TEMPLATE = "https://unikorn.axfff.com/forum/post/{id}"
+DEFAULT_BASE_URL = "https://unikorn.axfff.com/forum/"
+
+HREF_RE = re.compile(r'<a\b[^>]*?\bhref\s*=\s*["\']([^"\']+)["\']', re.I)
+# 链接末尾的数字帖子编号，如 /forum/post/1200、/thread/12/、?tid=12
+POST_NUMBER_RE = re.compile(r'(?:/|id=)(\d+)/?(?:[?#&]|$)')
+
+
+class NuxtPayloadError(ValueError):
+    """负载格式不符合 devalue 规范"""
+
+
+def find_nuxt_data(html: str) -> Optional[str]:
+    """从原始HTML中截取 ``__NUXT_DATA__`` 脚本内容"""
+    match = NUXT_DATA_RE.search(html)
+    if not match:
+        return None
+    content = match.group(1).strip()
+    return content or None
+
+
+def decode_devalue(payload: List) -> Any:
+    """把 devalue 扁平数组还原为Python对象"""
+    if not isinstance(payload, list) or not payload:
+        raise NuxtPayloadError("负载必须是非空数组")
+
+    revived: Dict[int, Any] = {}
+
+    def revive(index: int) -> Any:
+        if index == _UNDEFINED or index == _HOLE:
+            return None
+        if index in _SPECIAL_NUMBERS:
+            return _SPECIAL_NUMBERS[index]
+        if index in revived:
+            return revived[index]
+        if not isinstance(index, int) or not 0 <= index < len(payload):
+            raise NuxtPayloadError(f"无效的引用: {index}")
+
+        value = payload[index]
+
+        if isinstance(value, dict):
+            result = {}
+            revived[index] = result
+            for key, ref in value.items():
+                result[key] = revive(ref)
+            return result
+
+        if isinstance(value, list):
+            if value and isinstance(value[0], str):
+                return revive_tagged(index, value)
+            result = []
+            revived[index] = result
+            result.extend(revive(ref) for ref in value)
+            return result
+
+        revived[index] = value
+        return value
+
+    def revive_tagged(index: int, value: List) -> Any:
+        tag = value[0]
+        if tag in _WRAPPER_TYPES:
+            result = revive(value[1])
+        elif tag in ('EmptyRef', 'EmptyShallowRef'):
+            result = None
+        elif tag in ('Date', 'BigInt', 'RegExp'):
+            # 保留原始字符串，调用方按需转换
+            result = value[1]
+        elif tag == 'Set':
+            result = []
+            revived[index] = result
+            result.extend(revive(ref) for ref in value[1:])
+        elif tag in ('Map', 'null'):
+            result = {}
+            revived[index] = result
+            for i in range(1, len(value) - 1, 2):
+                key = revive(value[i]) if tag == 'Map' else value[i]
+                result[key if isinstance(key, (str, int, float)) else str(key)] = revive(value[i + 1])
+        elif tag == 'Object':
+            result = value[1]
+        else:
+            # 自定义的 reducer（如 NuxtError、Island），取其负载
+            result = revive(value[1]) if len(value) > 1 and isinstance(value[1], int) else None
+        revived[index] = result
+        return result
+
+    return revive(0)
+
+
+def parse_nuxt_data(raw: str) -> Any:
+    """解析 ``__NUXT_DATA__`` 文本"""
+    try:
+        payload = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise NuxtPayloadError(f"负载不是有效的JSON: {e}") from e
+    return decode_devalue(payload)
+
+
+def _first_field(record: Dict, fields) -> Any:
+    for field in fields:
+        value = record.get(field)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _looks_like_post(record: Any) -> bool:
+    return (isinstance(record, dict)
+            and _first_field(record, ID_FIELDS) is not None
+            and isinstance(_first_field(record, TITLE_FIELDS), str))
+
+
+def _find_post_lists(data: Any) -> List[List[Dict]]:
+    """按文档顺序查找所有由帖子记录组成的列表"""
+    found = []
+    stack = [data]
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+
+        if isinstance(node, dict):
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            posts = [item for item in node if _looks_like_post(item)]
+            if posts:
+                found.append(posts)
+            stack.extend(reversed([item for item in node if isinstance(item, (dict, list))]))
+    return found
+
+
+def _author_name(record: Dict) -> str:
+    author = _first_field(record, AUTHOR_FIELDS)
+    if isinstance(author, dict):
+        author = _first_field(author, AUTHOR_NAME_FIELDS)
+    return str(author) if author is not None else ''
+
+
+def post_number(url: str) -> Optional[str]:
+    """链接中的数字帖子编号"""
+    match = POST_URL_RE.search(url) and POST_NUMBER_RE.search(url)
+    return match.group(1) if match else None
+
+
+def post_links(html: str, base_url: str = DEFAULT_BASE_URL) -> Dict[str, str]:
+    """页面中帖子链接按数字编号的索引，与DOM提取得到的链接相同"""
+    links = {}
+    for match in HREF_RE.finditer(html):
+        href = match.group(1)
+        number = post_number(href)
+        if number is not None and number not in links:
+            links[number] = urljoin(base_url, href)
+    return links
+
+
+def _record_url(record: Dict, base_url: str) -> str:
+    for field in URL_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str) and value.strip():
+            return urljoin(base_url, value.strip())
+    return ''
+
+
+def posts_from_data(data: Any, url_template: str = DEFAULT_URL_TEMPLATE,
+                    base_url: str = DEFAULT_BASE_URL, links: Optional[Dict[str, str]] = None) -> List[Dict]:
+    """从还原后的负载中提取帖子记录
+
+    负载中可能包含多个帖子列表（如置顶帖、推荐帖），取最长的一个。
+    帖子的 ``id`` 字段与DOM提取保持一致，使用帖子URL：优先取记录自身的链接，
+    其次取 links 中编号相同的页面链接，都没有时才按 url_template 生成，
+    避免两种提取方式得到不同的ID而重复推送。
+    """
+    post_lists = _find_post_lists(data)
+    if not post_lists:
+        return []
+
+    records = max(post_lists, key=len)
+    posts = []
+    for record in records:
+        post_id = _first_field(record, ID_FIELDS)
+        url = _record_url(record, base_url)
+        if not url:
+            url = (links or {}).get(str(post_id)) or url_template.format(id=post_id)
+
+        post = {
+            'title': _first_field(record, TITLE_FIELDS).strip(),
+            'url': url,
+            'id': url,
+            'post_id': str(post_id),
+            'author': _author_name(record),
+        }
+        created = _first_field(record, TIME_FIELDS)
+        if created is not None:
+            post['timestamp'] = str(created)
+        posts.append(post)
+    return posts
+
+
+def extract_posts(html: str, url_template: str = DEFAULT_URL_TEMPLATE,
+                  base_url: str = DEFAULT_BASE_URL) -> Optional[List[Dict]]:
+    """直接从页面的Nuxt负载提取帖子
+
+    页面不含 ``__NUXT_DATA__`` 或负载无法解析时返回 None，
+    由调用方回退到DOM提取。
+    """
+    raw = find_nuxt_data(html)
+    if raw is None:
+        return None
+    try:
+        data = parse_nuxt_data(raw)
+    except (NuxtPayloadError, RecursionError):
+        return None
+    return posts_from_data(data, url_template, base_url, post_links(html, base_url))
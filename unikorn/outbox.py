@@ -0,0 +1,155 @@
+"""持久化的推送发件箱
+
+每个待推送的 (帖子, 群) 是发件箱中的一条记录，推送成功后移入已送达记录；
+失败的记录按指数退避加随机抖动安排重试，超过最大次数后放弃。发件箱保存在
+JSON文件中，重启后继续推送。
+
+为保证同一个帖子不会向同一个群推送两次：
+
+- 已送达的 (帖子, 群) 会被记住，之后不会再次入队
+- 每条消息取得发送令牌、即将发送时才把对应的记录标记为发送中并保存；重启时
+  仍处于发送中的记录无法确定是否已经送达，按已送达处理，不再重发
+- 尚未开始发送的记录保持待发送，关闭插件后下次启动时继续推送
+"""
+
+import random
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+PENDING = "pending"
+SENDING = "sending"
+FORMAT_VERSION = 1
+
+Key = Tuple[str, str]
+
+
+class Outbox:
+    """按 (帖子ID, 群号) 记录待推送消息的发件箱"""
+
+    def __init__(self, max_attempts: int = 8, base_delay: float = 30, max_delay: float = 3600,
+                 delivered_limit: int = 2000, rng: Callable[[], float] = random.random):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.delivered_limit = delivered_limit
+        self._rng = rng
+        self._entries: Dict[Key, Dict] = {}
+        # 已送达的 (帖子ID, 群号) -> 送达时间，按送达顺序保留最近的记录
+        self._delivered: "OrderedDict[Key, float]" = OrderedDict()
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entries(self) -> List[Dict]:
+        return list(self._entries.values())
+
+    def is_delivered(self, post_id: str, group_id) -> bool:
+        return (post_id, str(group_id)) in self._delivered
+
+    def enqueue(self, posts: Iterable[Dict], groups: Iterable, now: Optional[float] = None) -> int:
+        """把新帖子加入每个群的发送队列，返回新增的记录数；重复的记录被忽略"""
+        now = time.time() if now is None else now
+        added = 0
+        for post in posts:
+            for group_id in groups:
+                key = (post['id'], str(group_id))
+                if key in self._entries or key in self._delivered:
+                    continue
+                self._entries[key] = {
+                    'post': post,
+                    'group_id': key[1],
+                    'attempts': 0,
+                    'next_attempt': now,
+                    'last_error': None,
+                    'state': PENDING,
+                }
+                added += 1
+        if added:
+            self.dirty = True
+        return added
+
+    def due(self, now: Optional[float] = None) -> List[Dict]:
+        """返回已到发送时间的记录，按入队顺序排列"""
+        now = time.time() if now is None else now
+        return [entry for entry in self._entries.values()
+                if entry['state'] == PENDING and entry['next_attempt'] <= now]
+
+    def next_due(self) -> Optional[float]:
+        """最早一条待发送记录的发送时间"""
+        times = [entry['next_attempt'] for entry in self._entries.values() if entry['state'] == PENDING]
+        return min(times) if times else None
+
+    def begin(self, entries: Iterable[Dict]):
+        """发送前把记录标记为发送中"""
+        for entry in entries:
+            entry['state'] = SENDING
+            entry['attempts'] += 1
+        self.dirty = True
+
+    def abort(self, keys: Iterable[Key]):
+        """标记为发送中后没能开始发送（保存失败或被取消），恢复为待发送"""
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None and entry['state'] == SENDING:
+                entry['state'] = PENDING
+                entry['attempts'] = max(0, entry['attempts'] - 1)
+        self.dirty = True
+
+    def succeeded(self, keys: Iterable[Key], now: Optional[float] = None):
+        """记录送达"""
+        now = time.time() if now is None else now
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self._delivered[key] = now
+                self._delivered.move_to_end(key)
+        while len(self._delivered) > self.delivered_limit:
+            self._delivered.popitem(last=False)
+        self.dirty = True
+
+    def retry_delay(self, attempts: int) -> float:
+        """第 attempts 次失败后的重试间隔：指数退避，随机取上限的一半到全部"""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return ceiling * (0.5 + 0.5 * self._rng())
+
+    def failed(self, keys: Iterable[Key], error: str, now: Optional[float] = None) -> List[Dict]:
+        """记录发送失败并安排重试，返回超过最大次数而放弃的记录"""
+        now = time.time() if now is None else now
+        dropped = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            entry['last_error'] = error
+            if entry['attempts'] >= self.max_attempts:
+                dropped.append(self._entries.pop(key))
+                continue
+            entry['state'] = PENDING
+            entry['next_attempt'] = now + self.retry_delay(entry['attempts'])
+        self.dirty = True
+        return dropped
+
+    def to_json_data(self) -> Dict:
+        return {
+            'version': FORMAT_VERSION,
+            'entries': [dict(entry) for entry in self._entries.values()],
+            'delivered': [[post_id, group_id, stamp] for (post_id, group_id), stamp in self._delivered.items()],
+        }
+
+    def load_json_data(self, data: Dict, now: Optional[float] = None) -> int:
+        """从JSON数据恢复发件箱，返回因状态不确定而按已送达处理的记录数"""
+        now = time.time() if now is None else now
+        self._entries.clear()
+        self._delivered.clear()
+        for post_id, group_id, stamp in data.get('delivered', []):
+            self._delivered[(post_id, str(group_id))] = stamp
+        uncertain = []
+        for entry in data.get('entries', []):
+            key = (entry['post']['id'], str(entry['group_id']))
+            if entry.get('state') == SENDING:
+                uncertain.append(key)
+            self._entries[key] = entry
+        self.succeeded(uncertain, now)
+        self.dirty = bool(uncertain)
+        return len(uncertain)
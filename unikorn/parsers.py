@@ -0,0 +1,145 @@
+"""HTML解析后端
+
+统一封装插件可用的解析后端，按配置选择并在依赖缺失时自动回退：
+
+- ``lxml``: BeautifulSoup + lxml 构建器，速度最快
+- ``html.parser``: BeautifulSoup + 标准库解析器，无额外依赖
+- ``linkscan``: 不构建DOM的轻量链接扫描，只提取 ``<a>`` 标签
+"""
+
+import importlib
+import re
+from html import unescape
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+DEFAULT_BACKEND = "lxml"
+
+# 回退顺序，html.parser 为标准库实现，始终可用
+FALLBACK_ORDER = ["lxml", "html.parser"]
+
+
+class ParserBackend:
+    """解析后端基类"""
+
+    name = ""
+    # 是否构建完整的DOM树；不构建的后端只能走通用链接提取
+    builds_tree = True
+
+    def available(self) -> bool:
+        return True
+
+    def parse(self, html: str):
+        raise NotImplementedError
+
+    def links(self, document) -> List:
+        """返回文档中所有带 href 的链接"""
+        raise NotImplementedError
+
+
+class SoupBackend(ParserBackend):
+    """基于 BeautifulSoup 的解析后端"""
+
+    def __init__(self, name: str, features: str, module: Optional[str] = None):
+        self.name = name
+        self.features = features
+        self.module = module
+        self._available: Optional[bool] = None
+
+    def available(self) -> bool:
+        if self._available is None:
+            if self.module is None:
+                self._available = True
+            else:
+                try:
+                    importlib.import_module(self.module)
+                    self._available = True
+                except ImportError:
+                    self._available = False
+        return self._available
+
+    def parse(self, html: str):
+        return BeautifulSoup(html, self.features)
+
+    def links(self, document) -> List:
+        return document.find_all('a', href=True)
+
+
+class ScannedLink:
+    """链接扫描结果，提供与 bs4 Tag 相同的 get/get_text 接口"""
+
+    __slots__ = ('attrs', 'text', 'parent')
+
+    def __init__(self, attrs: Dict, text: str):
+        self.attrs = attrs
+        self.text = text
+        self.parent = None
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    def get_text(self, strip: bool = False) -> str:
+        return self.text.strip() if strip else self.text
+
+
+class LinkScanBackend(ParserBackend):
+    """轻量链接扫描后端
+
+    直接用预编译的正则扫描原始HTML中的 ``<a>`` 标签，不构建DOM，
+    适合只需要通用链接提取的场景。
+    """
+
+    name = "linkscan"
+    builds_tree = False
+
+    _SKIP_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.I | re.S)
+    _LINK_RE = re.compile(r'<a\b([^>]*)>(.*?)</a\s*>', re.I | re.S)
+    _ATTR_RE = re.compile(r'([^\s=/>]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+    _TAG_RE = re.compile(r'<[^>]+>')
+
+    def parse(self, html: str) -> List[ScannedLink]:
+        html = self._SKIP_RE.sub('', html)
+        links = []
+        for match in self._LINK_RE.finditer(html):
+            attrs = {}
+            for attr in self._ATTR_RE.finditer(match.group(1)):
+                name = attr.group(1).lower()
+                value = unescape(next(v for v in attr.group(2, 3, 4) if v is not None))
+                attrs[name] = value.split() if name == 'class' else value
+            if 'href' not in attrs:
+                continue
+            text = unescape(self._TAG_RE.sub('', match.group(2)))
+            links.append(ScannedLink(attrs, text))
+        return links
+
+    def links(self, document) -> List[ScannedLink]:
+        return document
+
+
+BACKENDS: Dict[str, ParserBackend] = {
+    "lxml": SoupBackend("lxml", "lxml", module="lxml"),
+    "html.parser": SoupBackend("html.parser", "html.parser"),
+    "linkscan": LinkScanBackend(),
+}
+
+
+def available_backends() -> List[str]:
+    """返回当前环境中可用的后端名称"""
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+
+def get_backend(name: Optional[str] = None, require_tree: bool = False) -> ParserBackend:
+    """按名称获取解析后端
+
+    请求的后端不存在、依赖导入失败，或需要DOM树而该后端不构建DOM时，
+    按 FALLBACK_ORDER 回退到第一个可用的后端。
+    """
+    backend = BACKENDS.get(name or DEFAULT_BACKEND)
+    if backend and backend.available() and (backend.builds_tree or not require_tree):
+        return backend
+
+    for fallback in FALLBACK_ORDER:
+        if BACKENDS[fallback].available():
+            return BACKENDS[fallback]
+    return BACKENDS["html.parser"]
@@ -0,0 +1,139 @@
+"""异步、原子、合并写入的状态持久化
+
+- :func:`atomic_write` 先写入同目录下的临时文件并 fsync，再用 ``os.replace``
+  原子替换目标文件，写入中途崩溃不会留下损坏的文件
+- :class:`DebouncedWriter` 合并短时间内的多次改动：第一次标记改动后等待
+  ``delay`` 秒再写入，期间的改动一并保存；积累的改动达到 ``max_pending`` 时
+  立即写入。:meth:`DebouncedWriter.close` 在限定时间内完成最后一次写入
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+from typing import Any, Awaitable, Callable, Optional
+
+
+def atomic_write(path: str, data: bytes):
+    """原子地把数据写入文件"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    # 同步目录项，确保重命名本身落盘
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def atomic_write_json(path: str, data: Any):
+    """把数据序列化为JSON后原子写入文件"""
+    atomic_write(path, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+
+class DebouncedWriter:
+    """合并改动并延迟写入
+
+    write 是执行实际保存的协程函数，由调用方负责在其中获取数据快照并把
+    耗时的序列化和文件写入放到线程中执行。写入失败时改动保留到下一次写入，
+    异常交给 on_error 处理。
+    """
+
+    def __init__(self, write: Callable[[], Awaitable[None]], delay: float = 5.0, max_pending: int = 20,
+                 on_error: Optional[Callable[[BaseException], None]] = None):
+        self._write = write
+        self.delay = delay
+        self.max_pending = max(1, max_pending)
+        self.on_error = on_error
+        self.pending = 0
+        self.writes = 0
+        self.failures = 0
+        self._timer: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._closed = False
+
+    @property
+    def dirty(self) -> bool:
+        return self.pending > 0
+
+    def mark_dirty(self, changes: int = 1):
+        """记录改动，按延迟或积累量安排写入"""
+        self.pending += max(1, changes)
+        if self._closed:
+            return
+        if self.pending >= self.max_pending or self.delay <= 0:
+            self._schedule(0)
+        elif self._timer is None or self._timer.done():
+            self._schedule(self.delay)
+
+    def _schedule(self, delay: float):
+        if self._timer is not None and not self._timer.done():
+            if delay > 0:
+                return
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().create_task(self._flush_later(delay))
+
+    async def _flush_later(self, delay: float):
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # 开始写入后不再作为定时器，期间的新改动会安排下一次写入
+        if self._timer is asyncio.current_task():
+            self._timer = None
+        # 写入不随定时器取消而中断，避免两次写入同时进行
+        await asyncio.shield(self.flush())
+
+    async def flush(self) -> bool:
+        """立即写入积累的改动，返回是否成功"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self.pending:
+                return True
+            pending, self.pending = self.pending, 0
+            try:
+                await self._write()
+            except BaseException as e:
+                self.pending += pending
+                if not isinstance(e, Exception):
+                    raise
+                self.failures += 1
+                if self.on_error is not None:
+                    self.on_error(e)
+                if not self._closed:
+                    self._schedule(self.delay)
+                return False
+            self.writes += 1
+            return True
+
+    async def close(self, timeout: float) -> bool:
+        """停止延迟写入，并在 timeout 秒内完成最后一次写入；返回是否按时完成"""
+        self._closed = True
+        timer, self._timer = self._timer, None
+        if timer is not None and not timer.done():
+            timer.cancel()
+            try:
+                await timer
+            except asyncio.CancelledError:
+                pass
+        if not self.pending and not (self._lock is not None and self._lock.locked()):
+            # 没有需要写入的改动，剩余时间为0时也算按时完成
+            return True
+        try:
+            # 正在进行的写入持有锁，这里会等待它完成后再写入剩余的改动
+            return await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            return False
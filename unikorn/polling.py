@@ -0,0 +1,146 @@
+"""根据新帖子到达速度自适应调整检查间隔
+
+:class:`AdaptivePollingPolicy` 从每次检查发现的新帖子数估计到达速度（个/小时）：
+
+- 近期速度：不规则时间间隔的指数加权移动平均（EWMA），对突发的发帖高峰反应快
+- 历史速度：按“星期几 + 小时”划分的168个桶，分别累计新帖子数和观测时长，
+  反映每周固定的活跃时段；某个桶的观测时长超过上限后新旧数据各减半，
+  使统计逐渐跟上论坛的变化
+
+取两者中较大的速度，使每次检查平均发现 ``target_posts`` 个新帖子，间隔限制在
+``min_interval`` 和 ``max_interval`` 之间，再加上随机抖动。
+"""
+
+import math
+import random
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+HOURS_PER_WEEK = 24 * 7
+WEEKDAY_NAMES = ("周一", "周二", "周三", "周四", "周五", "周六", "周日")
+FORMAT_VERSION = 1
+
+
+class PollingDecision(NamedTuple):
+    """一次间隔计算的结果"""
+    interval: float
+    base_interval: float
+    rate: Optional[float]
+    reason: str
+
+
+def hour_of_week(timestamp: float) -> int:
+    """本地时间所在的“星期几 + 小时”桶，周一0时为0"""
+    moment = datetime.fromtimestamp(timestamp)
+    return moment.weekday() * 24 + moment.hour
+
+
+def describe_bucket(bucket: int) -> str:
+    return f"{WEEKDAY_NAMES[bucket // 24]} {bucket % 24} 时"
+
+
+class AdaptivePollingPolicy:
+    """估计新帖子的到达速度并给出下一次检查的间隔（秒）"""
+
+    def __init__(self, default_interval: float, min_interval: float, max_interval: float,
+                 target_posts: float = 0.5, jitter: float = 0.1, half_life: float = 2 * 3600,
+                 bucket_min_hours: float = 1.0, bucket_max_hours: float = 8.0,
+                 rng: Callable[[], float] = random.random):
+        self.min_interval = max(1.0, min(min_interval, max_interval))
+        self.max_interval = max(self.min_interval, max_interval)
+        self.default_interval = min(self.max_interval, max(self.min_interval, default_interval))
+        self.target_posts = max(0.01, target_posts)
+        self.jitter = min(0.5, max(0.0, jitter))
+        self.half_life = half_life
+        self.bucket_min_hours = bucket_min_hours
+        self.bucket_max_hours = bucket_max_hours
+        self._rng = rng
+        self.ewma_rate: Optional[float] = None
+        self.last_observed: Optional[float] = None
+        self.counts: List[float] = [0.0] * HOURS_PER_WEEK
+        self.hours: List[float] = [0.0] * HOURS_PER_WEEK
+        self.dirty = False
+
+    def observe(self, new_posts: int, now: Optional[float] = None):
+        """记录一次成功的检查及其发现的新帖子数"""
+        now = time.time() if now is None else now
+        if self.last_observed is None:
+            # 第一次检查无法确定这些帖子是多长时间内发布的，只作为起点
+            self.last_observed = now
+            self.dirty = True
+            return
+        # 插件停止期间的时长不计入观测
+        elapsed = min(max(0.0, now - self.last_observed), 2 * self.max_interval)
+        self.last_observed = now
+        if elapsed <= 0:
+            return
+
+        instant = new_posts / (elapsed / 3600)
+        if self.ewma_rate is None:
+            self.ewma_rate = instant
+        else:
+            alpha = 1 - math.exp(-elapsed * math.log(2) / self.half_life)
+            self.ewma_rate += alpha * (instant - self.ewma_rate)
+
+        bucket = hour_of_week(now)
+        self.counts[bucket] += new_posts
+        self.hours[bucket] += elapsed / 3600
+        if self.hours[bucket] > self.bucket_max_hours:
+            self.counts[bucket] /= 2
+            self.hours[bucket] /= 2
+        self.dirty = True
+
+    def bucket_rate(self, bucket: int) -> Optional[float]:
+        """某个时段的历史速度，观测时长不足时返回None"""
+        if self.hours[bucket] < self.bucket_min_hours:
+            return None
+        return self.counts[bucket] / self.hours[bucket]
+
+    def decide(self, now: Optional[float] = None) -> PollingDecision:
+        """计算下一次检查的间隔"""
+        now = time.time() if now is None else now
+        bucket = hour_of_week(now)
+        historical = self.bucket_rate(bucket)
+        parts = []
+        if self.ewma_rate is not None:
+            parts.append(f"近期 {self.ewma_rate:.2f} 个/小时")
+        if historical is not None:
+            parts.append(f"{describe_bucket(bucket)}历史 {historical:.2f} 个/小时")
+        rates = [rate for rate in (self.ewma_rate, historical) if rate is not None]
+
+        if not rates:
+            base = self.default_interval
+            rate = None
+            reason = "数据不足，使用配置的检查间隔"
+        else:
+            rate = max(rates)
+            base = self.max_interval if rate <= 0 else self.target_posts / rate * 3600
+            base = min(self.max_interval, max(self.min_interval, base))
+            reason = "，".join(parts) + f"；按 {rate:.2f} 个/小时、每次约 {self.target_posts:g} 个新帖子计算"
+            if base == self.min_interval:
+                reason += "，已达下限"
+            elif base == self.max_interval:
+                reason += "，已达上限"
+
+        interval = base * (1 + self.jitter * (2 * self._rng() - 1))
+        return PollingDecision(interval, base, rate, reason)
+
+    def to_json_data(self) -> Dict:
+        return {
+            'version': FORMAT_VERSION,
+            'ewma_rate': self.ewma_rate,
+            'last_observed': self.last_observed,
+            'counts': self.counts,
+            'hours': self.hours,
+        }
+
+    def load_json_data(self, data: Dict):
+        counts = data.get('counts', [])
+        hours = data.get('hours', [])
+        if len(counts) == HOURS_PER_WEEK and len(hours) == HOURS_PER_WEEK:
+            self.counts = [float(value) for value in counts]
+            self.hours = [float(value) for value in hours]
+        self.ewma_rate = data.get('ewma_rate')
+        self.last_observed = data.get('last_observed')
+        self.dirty = False
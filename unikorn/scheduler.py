@@ -0,0 +1,188 @@
+"""按固定截止时间触发的定时检查
+
+:class:`DeadlineScheduler` 使用事件循环的单调时钟，每次检查的截止时间都在上一个
+截止时间的基础上加一个间隔，检查本身的耗时不会累积为漂移：
+
+- 检查耗时超过间隔时，错过的截止时间直接跳过，不会连续补做多次检查
+- 每次触发时记录实际开始时间比截止时间晚了多久，用于观察事件循环是否繁忙
+- :meth:`DeadlineScheduler.trigger` 立即触发一次检查，之后从这次检查开始
+  重新计算截止时间
+
+一个调度器可以管理多个来源，每个来源有各自的间隔和截止时间，由同一个循环
+按截止时间先后触发；同一个来源的上一次检查完成前不会再次触发。
+"""
+
+import asyncio
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional
+
+DEFAULT_SOURCE = "default"
+
+
+class Tick(NamedTuple):
+    """一次触发"""
+    number: int
+    deadline: float
+    started: float
+    lateness: float
+    triggered: bool
+    source: str = DEFAULT_SOURCE
+
+
+def next_deadline(previous: float, interval: float, now: float):
+    """上一个截止时间之后的下一个截止时间，跳过已经错过的；返回 (截止时间, 跳过数)"""
+    deadline = previous + interval
+    skipped = 0
+    if deadline <= now:
+        skipped = int((now - deadline) // interval) + 1
+        deadline += skipped * interval
+    return deadline, skipped
+
+
+class DeadlineScheduler:
+    """基于单调时钟、对齐截止时间的调度器"""
+
+    def __init__(self, interval: float, clock: Callable[[], float] = None, history: int = 200,
+                 source: str = DEFAULT_SOURCE):
+        self._clock = clock or (lambda: asyncio.get_running_loop().time())
+        self.default_source = source
+        self._intervals: Dict[str, float] = {source: max(0.001, interval)}
+        # 空闲来源的下一个截止时间；正在检查的来源不在其中
+        self._deadlines: Dict[str, Optional[float]] = {source: None}
+        self._running: Dict[str, float] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        # 被手动触发的来源，以及等待触发完成的调用方
+        self._triggered: Dict[str, List[asyncio.Future]] = {}
+        self._active_waiters: Dict[str, List[asyncio.Future]] = {}
+        # 最近的触发延迟（秒）
+        self.lateness: Deque[float] = deque(maxlen=history)
+        self.ticks = 0
+        self.triggered = 0
+        self.skipped = 0
+
+    def _wake(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._intervals)
+
+    @property
+    def interval(self) -> float:
+        return self._intervals[self.default_source]
+
+    @property
+    def deadline(self) -> Optional[float]:
+        return self._deadlines.get(self.default_source, self._running.get(self.default_source))
+
+    def add(self, source: str, interval: float, delay: float = 0.0):
+        """加入一个来源，delay 秒后第一次触发"""
+        self._intervals[source] = max(0.001, interval)
+        self._deadlines[source] = self._clock() + delay
+        self._wake()
+
+    def remove(self, source: str):
+        self._intervals.pop(source, None)
+        self._deadlines.pop(source, None)
+        for future in self._triggered.pop(source, []):
+            if not future.done():
+                future.set_exception(RuntimeError("调度已停止"))
+
+    def time_until_next(self, source: Optional[str] = None) -> Optional[float]:
+        """距离某个来源下一个截止时间的秒数"""
+        deadline = self._deadlines.get(source or self.default_source)
+        if deadline is None:
+            return None
+        return max(0.0, deadline - self._clock())
+
+    def trigger(self, source: Optional[str] = None) -> asyncio.Future:
+        """立即触发某个来源的检查，返回在这次检查完成时得到结果的 Future"""
+        future = asyncio.get_running_loop().create_future()
+        self._triggered.setdefault(source or self.default_source, []).append(future)
+        self._wake()
+        return future
+
+    def _start(self, source: str, deadline: float, triggered: bool) -> Tick:
+        started = self._clock()
+        self.ticks += 1
+        self._deadlines.pop(source, None)
+        self._running[source] = deadline
+        if triggered:
+            self.triggered += 1
+            self._active_waiters[source] = self._triggered.pop(source, [])
+            return Tick(self.ticks, started, started, 0.0, True, source)
+        lateness = started - deadline
+        self.lateness.append(lateness)
+        return Tick(self.ticks, deadline, started, lateness, False, source)
+
+    async def wait(self) -> Tick:
+        """等待到下一个截止时间或被手动触发，返回最先到期的来源"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        now = self._clock()
+        for source, deadline in self._deadlines.items():
+            if deadline is None:
+                self._deadlines[source] = now
+        while True:
+            self._wakeup.clear()
+            for source in self._triggered:
+                if source in self._deadlines:
+                    return self._start(source, self._clock(), True)
+            idle = [(deadline, source) for source, deadline in self._deadlines.items()]
+            timeout = None
+            if idle:
+                deadline, source = min(idle)
+                timeout = deadline - self._clock()
+                if timeout <= 0:
+                    return self._start(source, deadline, False)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def finish(self, tick: Tick, interval: Optional[float] = None, result=None) -> int:
+        """一次检查完成后安排这个来源的下一个截止时间，返回跳过的截止时间数"""
+        source = tick.source
+        self._running.pop(source, None)
+        waiters = self._active_waiters.pop(source, [])
+        if source in self._intervals:
+            if interval is not None:
+                self._intervals[source] = max(0.001, interval)
+            deadline, skipped = next_deadline(tick.deadline, self._intervals[source], self._clock())
+            self._deadlines[source] = deadline
+            self.skipped += skipped
+        else:
+            skipped = 0
+        self._wake()
+
+        for future in waiters:
+            if not future.done():
+                future.set_result(result)
+        return skipped
+
+    def close(self):
+        """停止调度，等待中的手动触发以 RuntimeError 结束"""
+        waiters = [future for futures in self._triggered.values() for future in futures]
+        waiters += [future for futures in self._active_waiters.values() for future in futures]
+        for future in waiters:
+            if not future.done():
+                future.set_exception(RuntimeError("调度已停止"))
+        self._triggered = {}
+        self._active_waiters = {}
+        self._running = {}
+        for source in self._deadlines:
+            self._deadlines[source] = None
+
+    def lateness_stats(self) -> Dict[str, float]:
+        """最近触发延迟的统计（毫秒）"""
+        if not self.lateness:
+            return {}
+        ordered = sorted(self.lateness)
+        return {
+            'count': len(ordered),
+            'avg_ms': sum(ordered) / len(ordered) * 1000,
+            'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            'max_ms': ordered[-1] * 1000,
+        }
@@ -0,0 +1,187 @@
+"""有界的已知帖子存储
+
+论坛首页只会展示最近的几页帖子，更早的帖子不会再出现，没有必要永久记住。
+:class:`SeenStore` 为每个帖子ID记录时间戳，并按数量上限和保留时长淘汰最旧的
+记录：
+
+- ``lru``: 帖子再次出现在页面上时刷新时间戳，仍在页面上的帖子不会被淘汰
+- ``fifo``: 时间戳始终是首次发现的时间，按发现顺序淘汰；另外记录帖子最近一次
+  出现在页面上的时间，最近仍在页面上的帖子（如置顶帖）暂不淘汰
+
+数据以JSON保存，兼容旧版 ``unikorn_news_data.json`` 中的 ``known_posts`` 列表。
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+EVICTION_POLICIES = ("lru", "fifo")
+FORMAT_VERSION = 2
+
+_TRAILING_NUMBER_RE = re.compile(r'(\d+)\D*$')
+
+
+def canonical_post_id(post_id: str) -> str:
+    """规范化帖子ID：去掉首尾空白、URL片段和末尾的斜杠"""
+    return post_id.strip().split('#', 1)[0].rstrip('/')
+
+
+def post_hash(post_id: str) -> int:
+    """帖子ID的64位哈希，用于哈希存储和布隆过滤器"""
+    digest = hashlib.blake2b(canonical_post_id(post_id).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class SeenStore:
+    """按插入（或最近出现）顺序保存帖子ID及时间戳，超出上限时淘汰最旧的记录"""
+
+    def __init__(self, max_size: int = 5000, max_age: float = 0, policy: str = "lru",
+                 refresh_interval: float = 3600):
+        """
+        max_size 和 max_age（秒）为 0 时表示不限制。refresh_interval 是 lru 模式下
+        刷新时间戳的最小间隔，避免每轮检查都改写全部记录。
+        """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"未知的淘汰策略: {policy}")
+        self.max_size = max(0, int(max_size))
+        self.max_age = max(0, max_age)
+        self.policy = policy
+        self.refresh_interval = refresh_interval
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        # fifo 模式下帖子最近一次出现在页面上的时间，只记录发现之后再次出现的帖子
+        self._last_seen: Dict[str, float] = {}
+        self.evicted = 0
+        # 自上次保存以来是否有改动
+        self.dirty = False
+
+    def __contains__(self, post_id: str) -> bool:
+        return post_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def items(self) -> Iterator[Tuple[str, float]]:
+        """按时间戳先后返回 (帖子ID, 时间戳)"""
+        return iter(self._entries.items())
+
+    def hashes(self) -> Iterator[int]:
+        """返回所有帖子ID的64位哈希"""
+        return (post_hash(post_id) for post_id in self._entries)
+
+    def first_seen(self, post_id: str) -> Optional[float]:
+        """返回记录的时间戳，不存在时返回 None"""
+        return self._entries.get(post_id)
+
+    def add(self, post_id: str, now: Optional[float] = None, record: Optional[Dict] = None) -> bool:
+        """记录新帖子，返回是否为新记录；已存在时等同于 :meth:`touch`
+
+        record 是帖子的完整信息，只有保存历史记录的存储会使用。
+        """
+        if post_id in self._entries:
+            self.touch(post_id, now)
+            return False
+        self._entries[post_id] = time.time() if now is None else now
+        self.dirty = True
+        self.prune(now)
+        return True
+
+    def touch(self, post_id: str, now: Optional[float] = None):
+        """帖子再次出现在页面上；lru 模式下刷新其时间戳和位置，fifo 模式下只记录出现时间"""
+        if post_id not in self._entries:
+            return
+        now = time.time() if now is None else now
+        if self.policy == "lru":
+            if now - self._entries[post_id] >= self.refresh_interval:
+                self._entries[post_id] = now
+                self._entries.move_to_end(post_id)
+                self.dirty = True
+        elif now - self._last_seen.get(post_id, self._entries[post_id]) >= self.refresh_interval:
+            self._last_seen[post_id] = now
+            self.dirty = True
+
+    def _recently_seen(self, stamp: float, now: float) -> bool:
+        """最近一次出现的时间是否说明帖子仍在页面上
+
+        出现时间按 refresh_interval 的粒度刷新，留出两倍的余量。
+        """
+        return stamp >= now - 2 * self.refresh_interval
+
+    def mark_notified(self, post_id: str, groups: Iterable[str]):
+        """记录帖子已推送到的群；本存储不保存推送历史"""
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """淘汰过期和超出数量上限的记录，返回淘汰的数量"""
+        now = time.time() if now is None else now
+        deadline = now - self.max_age if self.max_age else None
+        removed = 0
+        # 最近仍在页面上的记录暂时移出，检查完再放回头部
+        kept = []
+        # 记录按时间戳先后排列，只需从头部检查
+        while self._entries:
+            post_id, stamp = next(iter(self._entries.items()))
+            expired = deadline is not None and stamp < deadline
+            overflow = self.max_size and len(self._entries) + len(kept) > self.max_size
+            if not (expired or overflow):
+                break
+            del self._entries[post_id]
+            last_seen = self._last_seen.get(post_id)
+            if last_seen is not None and self._recently_seen(last_seen, now):
+                kept.append((post_id, stamp))
+                continue
+            self._last_seen.pop(post_id, None)
+            removed += 1
+        for post_id, stamp in reversed(kept):
+            self._entries[post_id] = stamp
+            self._entries.move_to_end(post_id, last=False)
+        if removed:
+            self.evicted += removed
+            self.dirty = True
+        return removed
+
+    def to_json_data(self) -> Dict:
+        """转换为可写入JSON的字典"""
+        return {
+            'version': FORMAT_VERSION,
+            'policy': self.policy,
+            'seen_posts': [[post_id, stamp, self._last_seen[post_id]] if post_id in self._last_seen
+                           else [post_id, stamp] for post_id, stamp in self._entries.items()],
+            'last_update': datetime.now().isoformat(),
+        }
+
+    def load_json_data(self, data: Dict, now: Optional[float] = None) -> bool:
+        """从JSON数据恢复记录，返回是否从旧格式迁移
+
+        旧格式只有无序的 ``known_posts`` 列表，迁移时所有帖子都以当前时间作为
+        时间戳（若使用旧文件的保存时间，长期未运行后迁移会把仍在页面上的帖子
+        全部判为过期并重新推送），并按帖子URL末尾的编号排序，超出数量上限时
+        优先淘汰编号较小的旧帖子。
+        """
+        self._entries.clear()
+        self._last_seen.clear()
+        migrated = 'seen_posts' not in data
+        if migrated:
+            stamp = time.time() if now is None else now
+            for post_id in sorted(data.get('known_posts', []), key=_post_number):
+                self._entries[post_id] = stamp
+        else:
+            entries = sorted(((str(entry[0]), float(entry[1])) for entry in data['seen_posts']),
+                             key=lambda entry: entry[1])
+            self._entries.update(entries)
+            if self.policy == "fifo":
+                self._last_seen.update((str(entry[0]), float(entry[2]))
+                                       for entry in data['seen_posts'] if len(entry) > 2)
+        self.dirty = migrated
+        self.prune(now)
+        return migrated
+
+
+def _post_number(post_id: str):
+    match = _TRAILING_NUMBER_RE.search(post_id)
+    return (int(match.group(1)) if match else -1, post_id)
+
@@ -0,0 +1,133 @@
+"""额外监控来源的注册表
+
+除了Unikorn论坛首页，还可以在配置的 ``sources`` 中登记其他页面（特定版块、
+标签页、其他论坛），每一项是一个JSON对象::
+
+    {"name": "ai-board", "url": "https://unikorn.axfff.com/forum?board=ai",
+     "interval": 10, "groups": ["123456"], "profile": {"min_title_length": 4}}
+
+- ``name``: 来源名称，只能包含字母、数字、``-`` 和 ``_``，用于日志和数据文件名
+- ``interval``: 检查间隔（分钟），省略时使用全局的检查间隔
+- ``groups``: 推送的群，省略时使用全局的目标群
+- ``profile``: 覆盖帖子提取配置（``extraction_mode``、``html_parser``、
+  ``min_title_length`` 等），适配页面结构不同的站点；相对链接默认按来源的
+  ``url`` 补全，可用 ``base_url`` 指定
+
+每个来源的已知帖子单独保存在一个小的 :class:`~unikorn.seen_store.SeenStore` 中，
+检查一个来源只需要查询和保存它自己的记录。
+"""
+
+import json
+import re
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .seen_store import SeenStore
+
+PRIMARY_SOURCE = "unikorn"
+SOURCE_NAME_RE = re.compile(r'^[A-Za-z0-9_-]{1,32}$')
+PROFILE_KEYS = ("extraction_mode", "nuxt_post_url_template", "html_parser", "partial_parse",
+                "excluded_keywords", "min_title_length", "max_title_length", "base_url")
+FORMAT_VERSION = 1
+
+
+class SourceConfig(NamedTuple):
+    """一个监控来源的配置"""
+    name: str
+    url: str
+    interval: float
+    groups: Optional[List[str]]
+    profile: Dict
+
+
+def parse_sources(entries: Iterable, default_interval: float) -> Tuple[List[SourceConfig], List[str]]:
+    """解析来源配置，返回有效的来源和每个无效项的错误说明
+
+    default_interval 和返回的间隔单位都是秒。
+    """
+    sources = []
+    errors = []
+    names = {PRIMARY_SOURCE}
+    for index, entry in enumerate(entries or [], 1):
+        try:
+            data = json.loads(entry) if isinstance(entry, str) else dict(entry)
+            name = str(data.get('name', '')).strip()
+            url = str(data.get('url', '')).strip()
+            if not SOURCE_NAME_RE.match(name):
+                raise ValueError(f"名称无效: {name!r}")
+            if name in names:
+                raise ValueError(f"名称重复: {name}")
+            if not url.startswith(('http://', 'https://')):
+                raise ValueError(f"链接无效: {url!r}")
+            interval = float(data.get('interval') or 0) * 60 or default_interval
+            groups = data.get('groups')
+            if groups is not None:
+                groups = [str(group) for group in groups]
+            profile = dict(data.get('profile') or {})
+            unknown = sorted(set(profile) - set(PROFILE_KEYS))
+            if unknown:
+                raise ValueError(f"不支持的提取配置: {', '.join(unknown)}")
+        except Exception as e:
+            errors.append(f"第 {index} 项: {e}")
+            continue
+        names.add(name)
+        sources.append(SourceConfig(name, url, max(60.0, interval), groups, profile))
+    return sources, errors
+
+
+class SourceState:
+    """一个来源的运行状态：已知帖子、缓存验证器和检查统计"""
+
+    def __init__(self, config: SourceConfig, store: SeenStore):
+        self.config = config
+        self.known_posts = store
+        self.validators: Dict[str, str] = {}
+        # 第一次成功检查时只记录现有帖子，不推送
+        self.seeded = False
+        self.checks = 0
+        self.last_checked: Optional[float] = None
+        self.last_new = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+    def record(self, posts: List[Dict], now: Optional[float] = None) -> List[Dict]:
+        """记录一次检查到的帖子，返回需要推送的新帖子"""
+        now = time.time() if now is None else now
+        new_posts = []
+        # 先刷新仍在页面上的帖子，添加新帖子时的淘汰不会误删它们
+        for post in posts:
+            if post['id'] in self.known_posts:
+                self.known_posts.touch(post['id'], now)
+            else:
+                new_posts.append(post)
+        for post in new_posts:
+            self.known_posts.add(post['id'], now, record=post)
+        self.known_posts.prune(now)
+        self.checks += 1
+        self.last_checked = now
+        self.last_error = None
+        if not self.seeded:
+            self.seeded = True
+            self.known_posts.dirty = True
+            new_posts = []
+        self.last_new = len(new_posts)
+        return new_posts
+
+    def to_json_data(self) -> Dict:
+        return {
+            'version': FORMAT_VERSION,
+            'url': self.config.url,
+            'seeded': self.seeded,
+            'validators': self.validators,
+            'seen': self.known_posts.to_json_data(),
+        }
+
+    def load_json_data(self, data: Dict, now: Optional[float] = None):
+        self.seeded = bool(data.get('seeded'))
+        # 链接改变后缓存验证器不再有效
+        if data.get('url') == self.config.url:
+            self.validators = dict(data.get('validators') or {})
+        self.known_posts.load_json_data(data.get('seen', {}), now)
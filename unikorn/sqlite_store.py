@@ -0,0 +1,233 @@
+"""基于 SQLite 的已知帖子存储
+
+与 :class:`~unikorn.seen_store.SeenStore` 接口相同，但每个帖子对应数据库中的
+一行（帖子ID、标题、链接、首次发现时间、推送过的群），不需要把全部记录
+载入内存：
+
+- 数据库使用 WAL 模式，首次查询时才建立连接
+- 新增、刷新和推送记录先缓存在内存中，:meth:`SQLiteSeenStore.flush` 在一个
+  事务中批量写入，写入量只与新增的帖子数量有关
+- 首次使用时可以导入旧的JSON数据文件
+"""
+
+import json
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from .seen_store import EVICTION_POLICIES, SeenStore, post_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    url TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    notified_groups TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_posts_first_seen ON posts(first_seen);
+CREATE INDEX IF NOT EXISTS idx_posts_last_seen ON posts(last_seen);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SQLiteSeenStore:
+    """一行一个帖子的已知帖子存储，写入按批提交"""
+
+    def __init__(self, path: str, max_size: int = 5000, max_age: float = 0, policy: str = "lru",
+                 refresh_interval: float = 3600):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"未知的淘汰策略: {policy}")
+        self.path = path
+        self.max_size = max(0, int(max_size))
+        self.max_age = max(0, max_age)
+        self.policy = policy
+        self.refresh_interval = refresh_interval
+        self.evicted = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        # 尚未写入数据库的新帖子、刷新时间和推送记录
+        self._pending_inserts: Dict[str, Dict] = {}
+        self._pending_touches: Dict[str, float] = {}
+        self._pending_notified: Dict[str, Set[str]] = {}
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """数据库连接，首次访问时打开并初始化表结构"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending_inserts or self._pending_touches or self._pending_notified)
+
+    def __contains__(self, post_id: str) -> bool:
+        if post_id in self._pending_inserts:
+            return True
+        row = self.connection.execute("SELECT 1 FROM posts WHERE id = ?", (post_id,)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        count = self.connection.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+        return count + len(self._pending_inserts)
+
+    def __iter__(self) -> Iterator[str]:
+        return (post_id for post_id, _ in self.items())
+
+    def _order_column(self) -> str:
+        return "last_seen" if self.policy == "lru" else "first_seen"
+
+    def items(self) -> Iterator[Tuple[str, float]]:
+        """按时间戳先后返回 (帖子ID, 时间戳)，包括尚未写入的记录"""
+        column = self._order_column()
+        for post_id, stamp in self.connection.execute(f"SELECT id, {column} FROM posts ORDER BY {column}, rowid"):
+            yield post_id, self._pending_touches.get(post_id, stamp)
+        for post_id, row in list(self._pending_inserts.items()):
+            yield post_id, row['first_seen']
+
+    def hashes(self) -> Iterator[int]:
+        """返回所有帖子ID的64位哈希"""
+        for (post_id,) in self.connection.execute("SELECT id FROM posts"):
+            yield post_hash(post_id)
+        for post_id in list(self._pending_inserts):
+            yield post_hash(post_id)
+
+    def first_seen(self, post_id: str) -> Optional[float]:
+        if post_id in self._pending_inserts:
+            return self._pending_inserts[post_id]['first_seen']
+        row = self.connection.execute("SELECT first_seen FROM posts WHERE id = ?", (post_id,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, post_id: str, now: Optional[float] = None, record: Optional[Dict] = None) -> bool:
+        """记录新帖子，返回是否为新记录；已存在时等同于 :meth:`touch`"""
+        if post_id in self:
+            self.touch(post_id, now)
+            return False
+        now = time.time() if now is None else now
+        record = record or {}
+        self._pending_inserts[post_id] = {
+            'title': record.get('title'),
+            'url': record.get('url'),
+            'first_seen': now,
+        }
+        return True
+
+    def touch(self, post_id: str, now: Optional[float] = None):
+        """帖子再次出现在页面上，刷新最近出现的时间；fifo 模式下淘汰顺序不变"""
+        if post_id in self._pending_inserts:
+            return
+        now = time.time() if now is None else now
+        row = self.connection.execute("SELECT last_seen FROM posts WHERE id = ?", (post_id,)).fetchone()
+        if row is not None and now - self._pending_touches.get(post_id, row[0]) >= self.refresh_interval:
+            self._pending_touches[post_id] = now
+
+    def mark_notified(self, post_id: str, groups: Iterable[str]):
+        """记录帖子已推送到的群"""
+        groups = {str(group) for group in groups}
+        if groups:
+            self._pending_notified.setdefault(post_id, set()).update(groups)
+
+    def notified_groups(self, post_id: str) -> Set[str]:
+        """返回帖子已推送到的群，包括尚未写入的记录"""
+        groups = set(self._pending_notified.get(post_id, ()))
+        row = self.connection.execute("SELECT notified_groups FROM posts WHERE id = ?", (post_id,)).fetchone()
+        if row:
+            groups.update(json.loads(row[0]))
+        return groups
+
+    def flush(self) -> int:
+        """在一个事务中写入缓存的改动，返回写入的记录数"""
+        if not self.dirty:
+            return 0
+        inserts = [
+            (post_id, row['title'], row['url'], row['first_seen'], row['first_seen'],
+             json.dumps(sorted(self._pending_notified.pop(post_id, ())), ensure_ascii=False))
+            for post_id, row in self._pending_inserts.items()
+        ]
+        touches = [(stamp, post_id) for post_id, stamp in self._pending_touches.items()]
+        conn = self.connection
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO posts (id, title, url, first_seen, last_seen, notified_groups) "
+                "VALUES (?, ?, ?, ?, ?, ?)", inserts)
+            conn.executemany("UPDATE posts SET last_seen = ? WHERE id = ?", touches)
+            for post_id, groups in self._pending_notified.items():
+                row = conn.execute("SELECT notified_groups FROM posts WHERE id = ?", (post_id,)).fetchone()
+                if row is not None:
+                    merged = sorted(set(json.loads(row[0])) | groups)
+                    conn.execute("UPDATE posts SET notified_groups = ? WHERE id = ?",
+                                 (json.dumps(merged, ensure_ascii=False), post_id))
+        written = len(inserts) + len(touches) + len(self._pending_notified)
+        self._pending_inserts.clear()
+        self._pending_touches.clear()
+        self._pending_notified.clear()
+        return written
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """淘汰已写入数据库的过期和超出数量上限的记录，返回淘汰的数量
+
+        缓存中的新记录在下一次 :meth:`flush` 之后才参与淘汰，这里不写入它们，
+        保证新帖子只在调用方保存时落盘。
+        """
+        conn = self.connection
+        column = self._order_column()
+        now = time.time() if now is None else now
+        # fifo 模式下最近仍在页面上的帖子暂不淘汰，与 SeenStore 一致
+        recent = now - 2 * self.refresh_interval if self.policy == "fifo" else float('inf')
+        deadline = now - self.max_age
+        # 先用索引确认有需要淘汰的记录，大多数检查不需要开启写事务
+        expired = self.max_age and conn.execute(
+            f"SELECT 1 FROM posts WHERE {column} < ? AND last_seen < ? LIMIT 1", (deadline, recent)).fetchone()
+        overflow = self.max_size and conn.execute(
+            "SELECT 1 FROM posts LIMIT 1 OFFSET ?", (self.max_size,)).fetchone()
+        if not (expired or overflow):
+            return 0
+        removed = 0
+        with conn:
+            if expired:
+                removed += conn.execute(f"DELETE FROM posts WHERE {column} < ? AND last_seen < ?",
+                                        (deadline, recent)).rowcount
+            if overflow:
+                removed += conn.execute(
+                    f"DELETE FROM posts WHERE id IN (SELECT id FROM posts "
+                    f"ORDER BY last_seen >= ? DESC, {column} DESC, rowid DESC LIMIT -1 OFFSET ?)",
+                    (recent, self.max_size)).rowcount
+        self.evicted += removed
+        return removed
+
+    def needs_json_import(self) -> bool:
+        """是否还没有导入过JSON数据文件，调用方据此决定是否读取该文件"""
+        return not self.connection.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone()
+
+    def import_json_data(self, data: Dict, now: Optional[float] = None) -> int:
+        """导入JSON数据文件中的记录，只在首次使用时执行一次
+
+        返回导入的记录数；已经导入过时返回 0。
+        """
+        if not self.needs_json_import():
+            return 0
+        conn = self.connection
+        legacy = SeenStore(max_size=0, policy=self.policy)
+        legacy.load_json_data(data, now)
+        rows = [(post_id, stamp, stamp) for post_id, stamp in legacy.items()]
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO posts (id, first_seen, last_seen) VALUES (?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)",
+                         (str(time.time() if now is None else now),))
+        return len(rows)
+
+    def close(self):
+        """写入缓存的改动并关闭连接"""
+        if self._conn is None:
+            return
+        self.flush()
+        self._conn.close()
+        self._conn = None
@@ -0,0 +1,166 @@
+"""流式增量解析
+
+边接收响应边解析：把收到的数据块增量送入 HTML 解析器，每当一个帖子链接
+的 ``</a>`` 结束时立即产出帖子记录。论坛按从新到旧排列帖子，调用方遇到
+已知帖子后即可停止读取剩余的响应。
+
+流式模式不构建DOM，也不解析Nuxt负载，但记录当前打开的元素，与DOM提取
+使用相同的容器和标题链接规则：帖子容器（:data:`~.extraction.CONTAINER_RULES`）
+中的标题链接（与 :data:`~.extraction.TITLE_SELECTORS` 对应）直接作为帖子，
+不做按钮文本判断；其余链接使用通用链接提取规则。
+"""
+
+import codecs
+from collections import deque
+from html.parser import HTMLParser
+from typing import AsyncIterator, Deque, Dict, List, NamedTuple, Optional
+
+from .extraction import (
+    CONTAINER_RULES, DEFAULT_OPTIONS, extract_posts_from_links, get_filter_engine, is_valid_post, normalize_url,
+)
+from .parsers import ScannedLink
+
+# 与 TITLE_SELECTORS 对应：a[class*="title"]、h1 a、.title a 等
+TITLE_LINK_CLASS_KEYWORDS = ('title', 'subject', 'topic')
+TITLE_PARENT_TAGS = frozenset(('h1', 'h2', 'h3', 'h4'))
+TITLE_PARENT_CLASSES = frozenset(TITLE_LINK_CLASS_KEYWORDS)
+
+# 没有结束标签的元素不入栈
+VOID_TAGS = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                       'link', 'meta', 'param', 'source', 'track', 'wbr'))
+
+
+class OpenElement(NamedTuple):
+    """当前打开的元素"""
+    tag: str
+    classes: List[str]
+    is_container: bool
+
+
+class StreamingPostParser(HTMLParser):
+    """增量解析HTML，在每个帖子链接结束时生成帖子记录"""
+
+    def __init__(self, options: Optional[Dict] = None):
+        super().__init__(convert_charrefs=True)
+        options = {**DEFAULT_OPTIONS, **(options or {})}
+        self.engine = get_filter_engine(options['excluded_keywords'])
+        self.min_length = options['min_title_length']
+        # 与 extract_forum_posts 一致，验证用的最大长度比显示长度更长
+        self.max_length = options['max_title_length'] * 4
+        self.base_url = options['base_url']
+        self.links_seen = 0
+        self._ready: Deque[Dict] = deque()
+        self._link_attrs: Optional[Dict] = None
+        self._link_text: List[str] = []
+        self._open: List[OpenElement] = []
+        # 已经产出标题链接帖子的容器在 _open 中的位置
+        self._container_done: set = set()
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or '' for name, value in attrs}
+        if tag != 'a':
+            if tag not in VOID_TAGS:
+                classes = attrs.get('class', '')
+                element_id = attrs.get('id', '')
+                is_container = any(rule.matches(tag, classes, element_id, attrs) for rule in CONTAINER_RULES)
+                self._open.append(OpenElement(tag, classes.split(), is_container))
+            return
+        # 未闭合的链接遇到新链接时视为结束
+        if self._link_attrs is not None:
+            self._finish_link()
+        if 'href' in attrs:
+            if 'class' in attrs:
+                attrs['class'] = attrs['class'].split()
+            self._link_attrs = attrs
+            self._link_text = []
+
+    def handle_startendtag(self, tag, attrs):
+        if tag != 'a':
+            return
+        self.handle_starttag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_data(self, data):
+        if self._link_attrs is not None:
+            self._link_text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'a':
+            if self._link_attrs is not None:
+                self._finish_link()
+            return
+        # 与浏览器一致，结束标签同时关闭其中未闭合的元素；找不到对应的开始标签时忽略
+        for index in range(len(self._open) - 1, -1, -1):
+            if self._open[index].tag == tag:
+                del self._open[index:]
+                self._container_done = {position for position in self._container_done if position < index}
+                break
+
+    def _is_title_link(self, link_classes: List[str], container: int) -> bool:
+        """链接是否匹配 TITLE_SELECTORS 中的某个选择器（只看容器内的祖先元素）"""
+        if any(keyword in ' '.join(link_classes) for keyword in TITLE_LINK_CLASS_KEYWORDS):
+            return True
+        return any(element.tag in TITLE_PARENT_TAGS or TITLE_PARENT_CLASSES.intersection(element.classes)
+                   for element in self._open[container + 1:])
+
+    def _finish_link(self):
+        link = ScannedLink(self._link_attrs, ''.join(self._link_text))
+        self._link_attrs = None
+        self._link_text = []
+        self.links_seen += 1
+
+        # 最内层的帖子容器
+        container = next((index for index in range(len(self._open) - 1, -1, -1)
+                          if self._open[index].is_container), None)
+        if container is not None and self._is_title_link(link.get('class', []), container):
+            # 与 extract_post_from_container 一致，容器中的标题链接不做按钮文本判断
+            href = normalize_url(link.get('href'), self.base_url)
+            posts = [{'title': link.get_text(strip=True), 'url': href, 'id': href}]
+            # 外层容器也包含这个链接，同样视为已经产出帖子
+            self._container_done.update(index for index, element in enumerate(self._open[:container + 1])
+                                        if element.is_container)
+        elif container is not None and container in self._container_done:
+            # 容器已经有标题链接，其余链接不再作为帖子
+            posts = []
+        else:
+            posts = extract_posts_from_links([link], self.engine, self.base_url)
+
+        for post in posts:
+            if (is_valid_post(post, self.min_length, self.max_length)
+                    and not self.engine.is_excluded_content(post['title'])):
+                self._ready.append(post)
+
+    def pop_posts(self) -> List[Dict]:
+        """取出目前已经完整解析的帖子"""
+        posts = list(self._ready)
+        self._ready.clear()
+        return posts
+
+
+async def iter_streamed_posts(chunks: AsyncIterator[bytes], encoding: str = 'utf-8',
+                              options: Optional[Dict] = None, stats: Optional[Dict] = None):
+    """从响应数据块中逐个产出帖子记录
+
+    stats 字典会被更新为已读取的字节数和链接数。调用方停止迭代后，
+    剩余的数据块不会再被读取。
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    except LookupError:
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    parser = StreamingPostParser(options)
+    stats = stats if stats is not None else {}
+    stats.setdefault('bytes_read', 0)
+
+    async for chunk in chunks:
+        stats['bytes_read'] += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        stats['links'] = parser.links_seen
+        for post in parser.pop_posts():
+            yield post
+
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    stats['links'] = parser.links_seen
+    for post in parser.pop_posts():
+        yield post
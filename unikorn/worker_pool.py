@@ -0,0 +1,148 @@
+"""可回收的解析进程池
+
+在子进程中执行CPU密集的解析任务，避免阻塞事件循环。每个工作进程执行
+一定数量的任务后会被替换以限制内存增长；单个任务超时时整个进程池被
+强制终止并在下次使用时重建。
+
+同时提交的任务数不超过工作进程数，超时只计算任务实际执行的时间，
+不包括等待空闲工作进程的时间。进程池因其他任务超时被终止时，
+正在执行的正常任务会在新的进程池中重新执行一次。
+
+进程池连续 ``max_failures`` 次无法完成任务（进程池损坏、无法启动子进程等，
+不包括超时）后暂停使用 ``cooldown`` 秒，期间 :meth:`ParsePool.available`
+返回 False，由调用方直接在当前进程解析，避免每轮检查都重建进程池再失败。
+"""
+
+import asyncio
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+
+class ParseTimeoutError(TimeoutError):
+    """解析任务超时，对应的工作进程已被终止"""
+
+
+class ParsePool:
+    """异步接口的解析进程池"""
+
+    def __init__(self, workers: int = 1, max_tasks_per_worker: int = 50, timeout: float = 30,
+                 max_failures: int = 3, cooldown: float = 600, clock: Callable[[], float] = time.monotonic):
+        self.workers = max(1, workers)
+        self.max_tasks_per_worker = max(1, max_tasks_per_worker)
+        self.timeout = timeout
+        self.max_failures = max(1, max_failures)
+        self.cooldown = cooldown
+        self._clock = clock
+        # 连续失败的次数和暂停使用的截止时间
+        self._failures = 0
+        self.disabled_until: Optional[float] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._submitted = 0
+        # 空闲工作进程，首次使用时在事件循环中创建
+        self._slots: Optional[asyncio.Semaphore] = None
+        # 进程池被终止的次数，用于区分任务是否被其他任务的超时波及
+        self._generation = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.recycles = 0
+        self.trips = 0
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # spawn 启动的子进程不会继承事件循环和其他线程的状态
+        kwargs = {'max_workers': self.workers, 'mp_context': multiprocessing.get_context('spawn')}
+        if sys.version_info >= (3, 11):
+            kwargs['max_tasks_per_child'] = self.max_tasks_per_worker
+        return ProcessPoolExecutor(**kwargs)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # 低版本Python不支持 max_tasks_per_child，按整个进程池的任务数回收
+        if (self._executor is not None and sys.version_info < (3, 11)
+                and self._submitted >= self.workers * self.max_tasks_per_worker):
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self.recycles += 1
+
+        if self._executor is None:
+            self._executor = self._create_executor()
+            self._submitted = 0
+        return self._executor
+
+    def available(self) -> bool:
+        """进程池是否可用；连续失败后暂停使用，冷却结束后重新尝试"""
+        if self.disabled_until is None:
+            return True
+        if self._clock() < self.disabled_until:
+            return False
+        self.disabled_until = None
+        self._failures = 0
+        return True
+
+    def _record_failure(self):
+        self._failures += 1
+        if self._failures >= self.max_failures and self.disabled_until is None:
+            self.disabled_until = self._clock() + self.cooldown
+            self.trips += 1
+            self.shutdown()
+
+    async def run(self, func: Callable, *args):
+        """在工作进程中执行 func(*args)，超时则终止进程池并抛出 ParseTimeoutError"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        async with self._slots:
+            for attempt in range(2):
+                generation = self._generation
+                try:
+                    result = await self._run_once(func, args)
+                except BrokenProcessPool:
+                    # 进程池被其他任务的超时终止，在新的进程池中重新执行
+                    if attempt or generation == self._generation:
+                        if generation == self._generation:
+                            # 进程池自身损坏，丢弃后下次使用时重建
+                            self.kill()
+                        self._record_failure()
+                        raise
+                    continue
+                except ParseTimeoutError:
+                    raise
+                except Exception:
+                    self._record_failure()
+                    raise
+                self._failures = 0
+                self.completed += 1
+                return result
+
+    async def _run_once(self, func: Callable, args):
+        # 持有空闲工作进程后才提交，计时从任务开始执行算起
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        self._submitted += 1
+        future = loop.run_in_executor(executor, func, *args)
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.kill()
+            raise ParseTimeoutError(f"解析任务超过 {self.timeout} 秒未完成")
+
+    def kill(self):
+        """立即终止所有工作进程"""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        self._generation += 1
+        # ProcessPoolExecutor 没有公开的强制终止接口
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            if process.is_alive():
+                process.kill()
+        # 其余任务以 BrokenProcessPool 结束，由 run 重新执行
+        executor.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = False):
+        """关闭进程池，取消尚未开始的任务"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)